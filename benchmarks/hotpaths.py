@@ -0,0 +1,323 @@
+"""Micro-benchmarks for sttcli hot paths.
+
+    python benchmarks/hotpaths.py run                      # time + allocations, print a table
+    python benchmarks/hotpaths.py run -o results.json      # ... and save them
+    python benchmarks/hotpaths.py compare results.json     # against benchmarks/baseline.json
+    python benchmarks/hotpaths.py run --save-baseline      # refresh the committed baseline
+
+Fixtures are synthetic and generated on the fly: an hour of voiced PCM, a
+100k-segment transcript and 1M provider words. --scale shrinks them for a
+quick run; results are only compared at the same scale.
+
+Each case is timed over --repeat runs (median reported) and then run once
+more under tracemalloc for its peak allocation. Timings are machine
+specific, so refresh the baseline on the machine that runs compare.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sttcli.models import Segment, TranscriptResult  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_THRESHOLD = 0.20
+
+SAMPLE_RATE = 16000
+PCM_SECONDS = 3600
+N_SEGMENTS = 100_000
+N_WORDS = 1_000_000
+N_TIMESTAMPS = 100_000
+
+_VOCABULARY = (
+    "the of and to a in that is was he for it with as his on be at by I this had not are but from or "
+    "have an they which one you were her all she there would their we him been has when who will more"
+).split()
+
+
+# ── Fixtures ──
+
+@lru_cache(maxsize=None)
+def hour_pcm(scale: float) -> np.ndarray:
+    """Voiced speech-like PCM: two harmonics gliding between 90 and 260 Hz, with pauses and noise."""
+    rng = np.random.default_rng(0)
+    n = int(PCM_SECONDS * scale * SAMPLE_RATE)
+    out = np.empty(n, dtype=np.float32)
+    phase = 0.0
+    block = 2 * SAMPLE_RATE
+    for lo in range(0, n, block):
+        hi = min(n, lo + block)
+        f0 = np.linspace(rng.uniform(90, 260), rng.uniform(90, 260), hi - lo)
+        ph = phase + 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+        phase = float(ph[-1])
+        voiced = 0.0 if rng.random() < 0.15 else 0.5
+        out[lo:hi] = voiced * (np.sin(ph) + 0.4 * np.sin(2 * ph)) + 0.02 * rng.standard_normal(hi - lo)
+    return out
+
+
+@lru_cache(maxsize=None)
+def big_transcript(scale: float) -> TranscriptResult:
+    rng = random.Random(0)
+    n = int(N_SEGMENTS * scale)
+    segments = []
+    t = 0.0
+    for i in range(n):
+        length = rng.uniform(1.0, 6.0)
+        text = " ".join(rng.choice(_VOCABULARY) for _ in range(rng.randint(4, 16)))
+        segments.append(Segment(
+            start=t, end=t + length, text=text.capitalize() + ".",
+            speaker=f"speaker_{i % 3}", gender=("male", "female")[i % 3 == 1],
+        ))
+        t += length + rng.uniform(0.0, 0.8)
+    return TranscriptResult(
+        segments=segments, language="en", duration=t,
+        provider="bench", model="synthetic", source_file="synthetic.wav",
+    )
+
+
+@lru_cache(maxsize=None)
+def provider_words(scale: float) -> list:
+    """ElevenLabs-shaped word objects (text/start/end/type/speaker_id)."""
+    rng = random.Random(1)
+    words = []
+    t = 0.0
+    speaker = "speaker_0"
+    for i in range(int(N_WORDS * scale)):
+        text = rng.choice(_VOCABULARY)
+        if rng.random() < 0.08:
+            text += "."
+        if rng.random() < 0.01:
+            speaker = f"speaker_{rng.randrange(3)}"
+        length = rng.uniform(0.1, 0.5)
+        words.append(SimpleNamespace(
+            text=text, start=t, end=t + length, type="word", speaker_id=speaker, logprob=-0.1,
+        ))
+        t += length + (rng.uniform(1.0, 2.0) if rng.random() < 0.02 else rng.uniform(0.0, 0.2))
+    return words
+
+
+@lru_cache(maxsize=None)
+def timestamps(scale: float) -> list[str]:
+    rng = random.Random(2)
+    out = []
+    for _ in range(int(N_TIMESTAMPS * scale)):
+        s = rng.uniform(0, 3 * 3600)
+        if rng.random() < 0.5:
+            out.append(f"{int(s) // 60:02d}:{int(s) % 60:02d}")
+        else:
+            out.append(f"{int(s) // 3600}:{int(s) // 60 % 60:02d}:{s % 60:06.3f}")
+    return out
+
+
+@lru_cache(maxsize=None)
+def benchmark_entries(scale: float) -> list:
+    from sttcli.benchmark import BenchmarkEntry
+
+    base = big_transcript(scale)
+    shifted = TranscriptResult(
+        segments=[Segment(s.start + 0.1, s.end + 0.1, s.text, s.speaker, s.gender) for s in base.segments],
+        language=base.language, duration=base.duration, provider="bench2", model="synthetic",
+        source_file=base.source_file,
+    )
+    return [
+        BenchmarkEntry(provider="bench", label="bench", result=base, error=None, diarized=True),
+        BenchmarkEntry(provider="bench2", label="bench2", result=shifted, error=None, diarized=True),
+        BenchmarkEntry(provider="failed", label="failed", result=None, error="boom", diarized=False),
+    ]
+
+
+# ── Cases ──
+
+@dataclass
+class Case:
+    name: str
+    setup: Callable[[float], object]          # builds the fixture (not measured)
+    run: Callable[[object], object]
+
+
+def _estimate_f0(pcm):
+    from sttcli.gender import _estimate_f0 as estimate
+
+    return estimate(pcm)
+
+
+def _group_words(words, diarize: bool):
+    from sttcli.providers.elevenlabs import _to_word
+    from sttcli.segmenting import group_words
+
+    # Called the way ElevenLabsProvider.transcribe calls it
+    return group_words(words, diarize=diarize, to_word=_to_word)
+
+
+def _parse_timestamps(stamps):
+    from sttcli.providers.gemini import _mmss_to_seconds
+
+    return [_mmss_to_seconds(s) for s in stamps]
+
+
+def _format(fmt: str):
+    from sttcli.formatters import get_formatter
+
+    formatter = get_formatter(fmt)()
+    return lambda result: formatter.format(result)
+
+
+def _comparison_html(entries):
+    from sttcli.formatters.html_compare import generate_comparison_html
+
+    return generate_comparison_html("synthetic.wav", entries)
+
+
+CASES = [
+    Case("gender._estimate_f0[1h pcm]", hour_pcm, _estimate_f0),
+    Case("segmenting.group_words[1M words]", provider_words, lambda w: _group_words(w, False)),
+    Case("segmenting.group_words[1M words, diarize]", provider_words, lambda w: _group_words(w, True)),
+    Case("gemini._mmss_to_seconds[100k]", timestamps, _parse_timestamps),
+    *[Case(f"formatters.{fmt}[100k segments]", big_transcript, _format(fmt))
+      for fmt in ("markdown", "srt", "json", "text")],
+    Case("html_compare.generate_comparison_html[2x100k]", benchmark_entries, _comparison_html),
+]
+
+
+# ── Measurement ──
+
+def measure(case: Case, scale: float, repeat: int) -> dict:
+    fixture = case.setup(scale)
+    case.run(fixture)      # warm imports and caches
+
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        case.run(fixture)
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = case.run(fixture)
+        _, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "median_seconds": statistics.median(times),
+        "min_seconds": min(times),
+        "peak_alloc_bytes": max(0, peak - before),
+    }
+
+
+def run(scale: float, repeat: int, pattern: str | None) -> dict:
+    results = {}
+    for case in CASES:
+        if pattern and pattern not in case.name:
+            continue
+        print(f"  {case.name} ...", end="", file=sys.stderr, flush=True)
+        results[case.name] = measure(case, scale, repeat)
+        print(f" {results[case.name]['median_seconds']:.3f}s", file=sys.stderr)
+    return {
+        "scale": scale,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": f"{platform.system()} {platform.machine()}",
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print a comparison table; return the names of regressed cases."""
+    if current.get("scale") != baseline.get("scale"):
+        raise SystemExit(f"Scale mismatch: results at {current.get('scale')}, baseline at {baseline.get('scale')}.")
+    regressed = []
+    print(f"{'case':<48} {'baseline':>10} {'current':>10} {'time':>8} {'alloc':>8}")
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<48} {'-':>10} {cur['median_seconds']:>9.3f}s {'new':>8}")
+            continue
+        t_ratio = cur["median_seconds"] / max(base["median_seconds"], 1e-9)
+        m_ratio = cur["peak_alloc_bytes"] / max(base["peak_alloc_bytes"], 1)
+        flag = t_ratio > 1 + threshold or m_ratio > 1 + threshold
+        if flag:
+            regressed.append(name)
+        print(
+            f"{name:<48} {base['median_seconds']:>9.3f}s {cur['median_seconds']:>9.3f}s "
+            f"{t_ratio:>7.2f}× {m_ratio:>7.2f}×{'  REGRESSION' if flag else ''}"
+        )
+    return regressed
+
+
+def _print_table(report: dict) -> None:
+    print(f"{'case':<48} {'median':>10} {'min':>10} {'peak alloc':>12}")
+    for name, r in report["results"].items():
+        print(
+            f"{name:<48} {r['median_seconds']:>9.3f}s {r['min_seconds']:>9.3f}s "
+            f"{r['peak_alloc_bytes'] / 1e6:>9.1f} MB"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="Run the benchmarks.")
+    run_p.add_argument("-k", "--filter", default=None, help="Only cases whose name contains this.")
+    run_p.add_argument("--scale", type=float, default=1.0, help="Fixture size factor (default: 1.0).")
+    run_p.add_argument("--repeat", type=int, default=5, help="Timed runs per case (default: 5).")
+    run_p.add_argument("-o", "--output", type=Path, default=None, help="Write results JSON here.")
+    run_p.add_argument("--save-baseline", action="store_true", help=f"Overwrite {BASELINE_PATH.name}.")
+    run_p.add_argument("--compare", action="store_true", help="Compare against the baseline afterwards.")
+    run_p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    cmp_p = sub.add_parser("compare", help="Compare saved results against the baseline.")
+    cmp_p.add_argument("results", type=Path)
+    cmp_p.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    cmp_p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                       help="Allowed slowdown or allocation growth (default: 0.20 = 20%%).")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run(args.scale, args.repeat, args.filter)
+        _print_table(report)
+        if args.output:
+            args.output.write_text(json.dumps(report, indent=2) + "\n")
+        if args.save_baseline:
+            BASELINE_PATH.write_text(json.dumps(report, indent=2) + "\n")
+            print(f"Baseline saved to {BASELINE_PATH}", file=sys.stderr)
+        if not args.compare:
+            return 0
+        current, baseline = report, json.loads(BASELINE_PATH.read_text())
+    else:
+        current, baseline = json.loads(args.results.read_text()), json.loads(args.baseline.read_text())
+
+    regressed = compare(current, baseline, args.threshold)
+    if regressed:
+        print(f"\n{len(regressed)} case(s) regressed by more than {args.threshold:.0%}.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import heapq
+import re
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+
+from sttcli.models import Segment
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Windows are cut at gaps where no provider has speech, or at the next segment
+# start once a window grows this long (continuous speech never leaves a gap).
+MAX_WINDOW_SECONDS = 20.0
+
+# Agreed words shown on each side of a disagreement
+CONTEXT_WORDS = 3
+
+
+@dataclass
+class TimedWord:
+    start: float
+    end: float
+    text: str       # as transcribed
+    norm: str       # lowercased, punctuation stripped; used for comparison
+    confidence: float | None = None
+
+
+@dataclass
+class DisagreementSpan:
+    start: float
+    end: float
+    texts: dict[str, str]       # provider label → its words in the span ("" if none)
+    before: str = ""            # agreed context preceding the span
+    after: str = ""             # agreed context following the span
+
+    def to_dict(self) -> dict:
+        return {
+            "start": round(self.start, 3),
+            "end": round(self.end, 3),
+            "texts": self.texts,
+            "before": self.before,
+            "after": self.after,
+        }
+
+
+def normalize_word(token: str) -> str:
+    return "".join(_WORD_RE.findall(token.lower()))
+
+
+def timed_words(segments: list[Segment]) -> list[TimedWord]:
+    """Split segments into timed words.
+
+    Provider word timings (Segment.words) are used when present; otherwise
+    segment time is spread evenly across the segment's tokens.
+    """
+    words: list[TimedWord] = []
+    for seg in sorted(segments, key=lambda s: s.start):
+        if seg.words:
+            for w in seg.words:
+                norm = normalize_word(w.text)
+                if norm:
+                    words.append(TimedWord(w.start, w.end, w.text.strip(), norm, w.confidence))
+            continue
+        tokens = seg.text.split()
+        if not tokens:
+            continue
+        step = max(0.0, seg.end - seg.start) / len(tokens)
+        for k, token in enumerate(tokens):
+            norm = normalize_word(token)
+            if norm:
+                t = seg.start + k * step
+                words.append(TimedWord(t, t + step, token, norm))
+    return words
+
+
+def sweep_windows(tracks: list[list[Segment]], max_window: float = MAX_WINDOW_SECONDS) -> list[float]:
+    """Return window end times covering every track's segments.
+
+    One interval sweep over all tracks merged by start time: a window closes
+    at a gap no segment spans, or at the next segment start once it exceeds
+    max_window seconds.
+    """
+    ends: list[float] = []
+    merged = heapq.merge(*(sorted(t, key=lambda s: s.start) for t in tracks), key=lambda s: s.start)
+    win_start: float | None = None
+    reach = float("-inf")
+    for seg in merged:
+        if win_start is None:
+            win_start, reach = seg.start, seg.end
+            continue
+        if seg.start > reach:
+            ends.append(reach)
+            win_start = seg.start
+        elif seg.start - win_start >= max_window:
+            ends.append(seg.start)
+            win_start = seg.start
+        reach = max(reach, seg.end)
+    if win_start is not None:
+        ends.append(reach)
+    return ends
+
+
+def bucket_words(words: list[TimedWord], ends: list[float]) -> list[list[TimedWord]]:
+    """Assign words to windows by midpoint with a single two-pointer pass."""
+    buckets: list[list[TimedWord]] = [[] for _ in ends]
+    w = 0
+    last = len(ends) - 1
+    for word in words:
+        mid = (word.start + word.end) / 2
+        while w < last and mid >= ends[w]:
+            w += 1
+        buckets[w].append(word)
+    return buckets
+
+
+def _hyp_range(opcodes, a: int, b: int) -> tuple[int, int]:
+    """Map reference word range [a, b) to the aligned hypothesis word range."""
+    lo: int | None = None
+    hi: int | None = None
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            o1, o2 = max(a, i1), min(b, i2)
+            if o1 >= o2:
+                continue
+            s, e = j1 + (o1 - i1), j1 + (o2 - i1)
+        elif i1 == i2:
+            # Insertion: belongs to the range if it sits inside or on its edge.
+            if not a <= i1 <= b:
+                continue
+            s, e = j1, j2
+        else:
+            if not (i1 < b and i2 > a):
+                continue
+            s, e = j1, j2
+        lo = s if lo is None else min(lo, s)
+        hi = e if hi is None else max(hi, e)
+    if lo is None:
+        return 0, 0
+    return lo, hi
+
+
+def _diff_window(words: dict[str, list[TimedWord]]) -> list[DisagreementSpan]:
+    """Word-align every provider against the window's longest hypothesis."""
+    labels = list(words)
+    norms = {label: [w.norm for w in ws] for label, ws in words.items()}
+    ref_label = max(labels, key=lambda label: len(norms[label]))
+    ref = norms[ref_label]
+    if all(norms[label] == ref for label in labels):
+        return []
+
+    # Reference ranges where any provider deviates, merged across providers.
+    opcodes: dict[str, list] = {}
+    ranges: list[tuple[int, int]] = []
+    for label in labels:
+        if label == ref_label:
+            continue
+        ops = SequenceMatcher(None, ref, norms[label], autojunk=False).get_opcodes()
+        opcodes[label] = ops
+        ranges.extend((i1, i2) for tag, i1, i2, _, _ in ops if tag != "equal")
+    ranges.sort()
+    merged: list[list[int]] = []
+    for i1, i2 in ranges:
+        if merged and i1 <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], i2)
+        else:
+            merged.append([i1, i2])
+
+    ref_words = words[ref_label]
+    spans = []
+    for a, b in merged:
+        texts = {ref_label: " ".join(w.text for w in ref_words[a:b])}
+        times: list[float] = [w.start for w in ref_words[a:b]] + [w.end for w in ref_words[a:b]]
+        for label, ops in opcodes.items():
+            j1, j2 = _hyp_range(ops, a, b)
+            hyp = words[label][j1:j2]
+            texts[label] = " ".join(w.text for w in hyp)
+            times += [w.start for w in hyp] + [w.end for w in hyp]
+        if not times:
+            continue
+        spans.append(DisagreementSpan(
+            start=min(times),
+            end=max(times),
+            texts={label: texts.get(label, "") for label in labels},
+            before=" ".join(w.text for w in ref_words[max(0, a - CONTEXT_WORDS):a]),
+            after=" ".join(w.text for w in ref_words[b:b + CONTEXT_WORDS]),
+        ))
+    return spans
+
+
+def find_disagreements(
+    tracks: dict[str, list[Segment]],
+    max_window: float = MAX_WINDOW_SECONDS,
+) -> list[DisagreementSpan]:
+    """Align every provider's segments on a shared timeline and return spans where they differ."""
+    if len(tracks) < 2:
+        return []
+    ends = sweep_windows(list(tracks.values()), max_window)
+    if not ends:
+        return []
+
+    buckets = {label: bucket_words(timed_words(segs), ends) for label, segs in tracks.items()}
+    spans: list[DisagreementSpan] = []
+    for w in range(len(ends)):
+        spans.extend(_diff_window({label: b[w] for label, b in buckets.items()}))
+    return spans
+
+
+def agreement_ratio(tracks: dict[str, list[Segment]], spans: list[DisagreementSpan]) -> float:
+    """Fraction of the longest transcript's words that fall outside any disagreement."""
+    total = max((len(timed_words(segs)) for segs in tracks.values()), default=0)
+    if total == 0:
+        return 1.0
+    disputed = sum(max(len(t.split()) for t in span.texts.values()) for span in spans)
+    return max(0.0, 1.0 - disputed / total)
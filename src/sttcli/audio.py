@@ -1,3 +1,4 @@
+import hashlib
 import tempfile
 from pathlib import Path
 
@@ -7,20 +8,71 @@ import ffmpeg
 AUDIO_EXTENSIONS = {".mp3", ".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".opus"}
 VIDEO_EXTENSIONS = {".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".ts", ".m2ts"}
 
+# Containers each audio codec can be stream-copied into, most preferred first
+COPY_CONTAINERS = {
+    "aac": ("m4a", "aac"),
+    "mp3": ("mp3",),
+    "opus": ("ogg",),
+    "vorbis": ("ogg",),
+    "flac": ("flac",),
+}
+
 
 def is_video(path: Path) -> bool:
     return path.suffix.lower() in VIDEO_EXTENSIONS
 
 
-def extract_audio(input_path: Path, progress_callback=None) -> tuple[Path, bool]:
+def audio_codec(path: Path) -> str | None:
+    """Return the codec name of the first audio stream (e.g. "aac", "opus"), if any."""
+    try:
+        probe = ffmpeg.probe(str(path))
+    except ffmpeg.Error:
+        return None
+    for stream in probe.get("streams", []):
+        if stream.get("codec_type") == "audio":
+            return stream.get("codec_name")
+    return None
+
+
+def _copy_audio(input_path: Path, container: str) -> Path | None:
+    """Stream-copy the audio track into a temp file of the given container, or None on failure."""
+    tmp = tempfile.NamedTemporaryFile(suffix=f".{container}", delete=False)
+    tmp.close()
+    tmp_path = Path(tmp.name)
+    try:
+        (
+            ffmpeg
+            .input(str(input_path))
+            .output(str(tmp_path), acodec="copy", vn=None)
+            .overwrite_output()
+            .run(quiet=True)
+        )
+    except ffmpeg.Error:
+        tmp_path.unlink(missing_ok=True)
+        return None
+    return tmp_path
+
+
+def extract_audio(input_path: Path, progress_callback=None, copy_formats=()) -> tuple[Path, bool]:
     """Extract audio from video file. Returns (audio_path, is_temp).
 
     If input is already audio, returns (input_path, False).
-    If input is video, extracts to temp WAV and returns (temp_path, True).
+    If input is video, extracts to a temp file and returns (temp_path, True):
+    the audio track is stream-copied without re-encoding when its codec fits
+    one of copy_formats (containers such as "m4a" or "ogg"), and decoded to
+    16 kHz WAV otherwise.
     """
     if not is_video(input_path):
         return input_path, False
 
+    if copy_formats:
+        for container in COPY_CONTAINERS.get(audio_codec(input_path), ()):
+            if container in copy_formats:
+                copied = _copy_audio(input_path, container)
+                if copied is not None:
+                    return copied, True
+                break
+
     tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
     tmp.close()
     tmp_path = Path(tmp.name)
@@ -47,9 +99,55 @@ def extract_audio(input_path: Path, progress_callback=None) -> tuple[Path, bool]
     return tmp_path, True
 
 
+def channel_count(path: Path) -> int:
+    """Return the channel count of the first audio stream, or 0 if there is none."""
+    try:
+        probe = ffmpeg.probe(str(path))
+    except ffmpeg.Error:
+        return 0
+    for stream in probe.get("streams", []):
+        if stream.get("codec_type") == "audio":
+            return int(stream.get("channels", 0))
+    return 0
+
+
+def extract_channel(input_path: Path, channel: int) -> Path:
+    """Extract one channel (0-based) of any audio or video file to a temp 16 kHz mono WAV."""
+    tmp = tempfile.NamedTemporaryFile(suffix=f".ch{channel}.wav", delete=False)
+    tmp.close()
+    tmp_path = Path(tmp.name)
+
+    try:
+        (
+            ffmpeg
+            .input(str(input_path))
+            .audio
+            .filter("pan", f"mono|c0=c{channel}")
+            .output(str(tmp_path), acodec="pcm_s16le", ar=16000)
+            .overwrite_output()
+            .run(quiet=True)
+        )
+    except ffmpeg.Error as e:
+        tmp_path.unlink(missing_ok=True)
+        stderr = e.stderr.decode() if e.stderr else str(e)
+        raise RuntimeError(f"ffmpeg channel extraction failed: {stderr}") from e
+
+    return tmp_path
+
+
 def get_duration(path: Path) -> float:
     try:
         probe = ffmpeg.probe(str(path))
         return float(probe["format"]["duration"])
     except Exception:
         return 0.0
+
+
+def content_hash(path: Path, block_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import math
+import statistics
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
 
-from sttcli.audio import extract_audio, is_video
-from sttcli.config import resolve_api_key
+from sttcli.audio import extract_audio, get_duration, is_video
+from sttcli.config import resolve_api_key, resolve_base_url
 from sttcli.models import TranscriptResult
-from sttcli.progress import StepProgress, make_progress
+from sttcli.progress import StepProgress, Throughput, make_progress
 from sttcli.providers import get_provider
 
-# Providers that support native diarization
+# Providers that support native diarization (the rest are diarized locally)
 DIARIZE_SUPPORTED = {"elevenlabs", "gemini"}
 
 # Providers that require an API key
@@ -18,6 +21,101 @@ API_KEY_REQUIRED = {"openai", "gemini", "elevenlabs"}
 # Default provider list for benchmark (uses each provider's default model)
 ALL_PROVIDERS = ["elevenlabs", "gemini", "openai", "whisper"]
 
+# Confidence level of the interval reported around the steady-state median
+CONFIDENCE = 0.95
+
+
+def _nearest_rank(ordered: list[float], q: float) -> float:
+    n = len(ordered)
+    return ordered[min(n - 1, max(0, math.ceil(q * n / 100) - 1))]
+
+
+def median_interval(values: list[float], confidence: float = CONFIDENCE) -> tuple[float, float] | None:
+    """Distribution-free confidence interval for the median, from binomial order statistics.
+
+    Latencies are skewed by the occasional slow response, so no normal
+    approximation is assumed. Returns None below 6 samples, too few for 95%.
+    """
+    ordered = sorted(values)
+    n = len(ordered)
+    tail = (1 - confidence) / 2
+    cdf, j = 0.0, 0
+    for k in range(n):
+        cdf += math.comb(n, k) / 2**n       # P(fewer than k + 1 samples below the median)
+        if cdf > tail:
+            break
+        j = k + 1
+    if j == 0:
+        return None
+    return ordered[j - 1], ordered[n - j]
+
+
+@dataclass
+class RunTimings:
+    """Wall-clock seconds of repeated runs of one provider on one file.
+
+    The first call pays for cold start (model load, client creation, first
+    connection) and is reported on its own. Warm-up calls, the cold one
+    among them, are left out of the steady-state statistics; with no
+    warm-up the cold call is measured too.
+    """
+
+    audio_seconds: float
+    warmup: int = 0
+    cold_seconds: float | None = None
+    seconds: list[float] = field(default_factory=list)     # measured (steady-state) runs
+    errors: list[str] = field(default_factory=list)
+
+    def summary(self, values: list[float]) -> dict[str, float | None]:
+        if not values:
+            return {"median": None, "p90": None, "p99": None, "mean": None, "ci_low": None, "ci_high": None}
+        ordered = sorted(values)
+        interval = median_interval(ordered) or (None, None)
+        stats = {
+            "median": statistics.median(ordered),
+            "p90": _nearest_rank(ordered, 90),
+            "p99": _nearest_rank(ordered, 99),
+            "mean": statistics.fmean(ordered),
+            "ci_low": interval[0],
+            "ci_high": interval[1],
+        }
+        return {k: round(v, 4) if v is not None else None for k, v in stats.items()}
+
+    @property
+    def latency(self) -> dict[str, float | None]:
+        return self.summary(self.seconds)
+
+    @property
+    def rtf(self) -> dict[str, float | None]:
+        if not self.audio_seconds:
+            return self.summary([])
+        return self.summary([s / self.audio_seconds for s in self.seconds])
+
+    @property
+    def cold_overhead(self) -> float | None:
+        """Cold-start seconds beyond a steady-state run."""
+        median = self.latency["median"]
+        if self.cold_seconds is None or median is None:
+            return None
+        return self.cold_seconds - median
+
+    def to_dict(self) -> dict:
+        overhead = self.cold_overhead
+        return {
+            "audio_seconds": round(self.audio_seconds, 3),
+            "warmup": self.warmup,
+            "runs": len(self.seconds),
+            "failures": len(self.errors),
+            "cold_seconds": round(self.cold_seconds, 4) if self.cold_seconds is not None else None,
+            "cold_overhead_seconds": round(overhead, 4) if overhead is not None else None,
+            "cold_included": self.warmup == 0 and self.cold_seconds is not None,
+            "confidence": CONFIDENCE,
+            "latency_seconds": self.latency,
+            "rtf": self.rtf,
+            "seconds": [round(s, 4) for s in self.seconds],
+            "errors": self.errors,
+        }
+
 
 @dataclass
 class BenchmarkEntry:
@@ -26,6 +124,7 @@ class BenchmarkEntry:
     result: TranscriptResult | None
     error: str | None
     diarized: bool
+    timings: RunTimings | None = None
 
 
 def parse_provider_spec(spec: str) -> tuple[str, str | None]:
@@ -46,12 +145,16 @@ def run_benchmark(
     num_speakers: int | None = None,
     config_file: Path | None = None,
     device: str = "cpu",
+    repeat: int = 1,
+    warmup: int = 0,
 ) -> tuple[Path, list[BenchmarkEntry]]:
     """
     Run each provider spec on input_path and return (audio_path_used, results).
     Audio extraction (video→wav) is done once and reused across providers.
 
     provider_specs may include "provider" or "provider:model" entries.
+    Each provider is called warmup + repeat times (see RunTimings); the
+    transcript of the last successful call is kept for comparison.
     """
     import click
 
@@ -63,74 +166,123 @@ def run_benchmark(
         audio_path, is_temp = extract_audio(input_path)
     else:
         audio_path = input_path
+    audio_duration = get_duration(audio_path)
 
     entries: list[BenchmarkEntry] = []
 
     try:
-        for spec in provider_specs:
-            provider_name, explicit_model = parse_provider_spec(spec)
-            label = spec  # e.g. "elevenlabs:scribe_v1" or "elevenlabs"
+        with make_progress() as progress:
+            overall = StepProgress(progress, "Benchmark", total=100)
+            throughput = Throughput(len(provider_specs), "providers")
+            overall.advance_to(0, throughput.describe())
+            for spec in provider_specs:
+                provider_name, explicit_model = parse_provider_spec(spec)
+                label = spec  # e.g. "elevenlabs:scribe_v1" or "elevenlabs"
 
-            api_key = resolve_api_key(provider_name, None, config_file)
+                api_key = resolve_api_key(provider_name, None, config_file)
 
-            if provider_name in API_KEY_REQUIRED and not api_key:
-                click.echo(
-                    f"  ⚠  [{label}] API key not configured — skipped.", err=True
-                )
-                entries.append(BenchmarkEntry(
-                    provider=provider_name,
-                    label=label,
-                    result=None,
-                    error="API key not configured",
-                    diarized=False,
-                ))
-                continue
-
-            use_diarize = diarize and provider_name in DIARIZE_SUPPORTED
-
-            click.echo(
-                f"  ▶  [{label}] transcribing"
-                f"{' (diarize)' if use_diarize else ''}...",
-                err=True,
-            )
-
-            try:
-                ProviderClass = get_provider(provider_name)
-                provider = ProviderClass(
-                    model=explicit_model,  # None → provider uses its own default
-                    api_key=api_key,
-                    device=device,
-                    diarize=use_diarize,
-                    num_speakers=num_speakers,
-                )
-                with make_progress() as progress:
-                    step = StepProgress(
-                        progress, f"[{label}] Transcribing...", total=100
+                if provider_name in API_KEY_REQUIRED and not api_key:
+                    click.echo(
+                        f"  ⚠  [{label}] API key not configured — skipped.", err=True
                     )
-                    result = provider.transcribe(audio_path, step)
-
-                entries.append(BenchmarkEntry(
-                    provider=provider_name,
-                    label=label,
-                    result=result,
-                    error=None,
-                    diarized=use_diarize,
-                ))
+                    entries.append(BenchmarkEntry(
+                        provider=provider_name,
+                        label=label,
+                        result=None,
+                        error="API key not configured",
+                        diarized=False,
+                    ))
+                    throughput.add(1)
+                    overall.advance_to(throughput.percent, throughput.describe())
+                    continue
+
+                use_diarize = diarize
+
+                runs = warmup + repeat
                 click.echo(
-                    f"  ✓  [{label}] done "
-                    f"({len(result.segments)} segments, {result.language})",
+                    f"  ▶  [{label}] transcribing"
+                    f"{' (diarize)' if use_diarize else ''}"
+                    f"{f', {warmup} warm-up + {repeat} runs' if runs > 1 else ''}...",
                     err=True,
                 )
 
-            except Exception as exc:
-                click.echo(f"  ✗  [{label}] error: {exc}", err=True)
-                entries.append(BenchmarkEntry(
-                    provider=provider_name,
-                    label=label,
-                    result=None,
-                    error=str(exc),
-                    diarized=use_diarize,
-                ))
+                audio_seconds = 0.0
+                timings = RunTimings(audio_seconds=audio_duration, warmup=warmup)
+                result = None
+                try:
+                    ProviderClass = get_provider(provider_name)
+                    provider = ProviderClass(
+                        model=explicit_model,  # None → provider uses its own default
+                        api_key=api_key,
+                        device=device,
+                        diarize=use_diarize,
+                        num_speakers=num_speakers,
+                        base_url=resolve_base_url(provider_name, None, config_file),
+                    )
+                    for run in range(runs):
+                        description = f"[{label}] Transcribing..."
+                        if runs > 1:
+                            description = f"[{label}] Run {run + 1}/{runs}..."
+                        step = StepProgress(progress, description, total=100)
+                        try:
+                            start = time.perf_counter()
+                            run_result = provider.transcribe(audio_path, step)
+                            if use_diarize and provider_name not in DIARIZE_SUPPORTED:
+                                from sttcli.diarize import diarize_segments
+
+                                step.advance_to(100, f"[{label}] Diarizing locally...")
+                                diarize_segments(str(audio_path), run_result.segments, num_speakers)
+                            elapsed = time.perf_counter() - start
+                        except Exception as exc:
+                            # One failed call in a repeated run is a data point, not the verdict.
+                            if runs == 1:
+                                raise
+                            timings.errors.append(str(exc))
+                            continue
+                        finally:
+                            progress.remove_task(step.task_id)
+                        if run == 0:
+                            timings.cold_seconds = elapsed
+                        if run >= warmup:
+                            timings.seconds.append(elapsed)
+                        result = run_result
+                    if result is None:
+                        raise RuntimeError(f"all {runs} runs failed: {timings.errors[-1]}")
+                    if not timings.audio_seconds:
+                        timings.audio_seconds = result.duration
+
+                    entries.append(BenchmarkEntry(
+                        provider=provider_name,
+                        label=label,
+                        result=result,
+                        error=None,
+                        diarized=use_diarize,
+                        timings=timings,
+                    ))
+                    audio_seconds = result.duration * runs
+                    details = [f"{len(result.segments)} segments", result.language]
+                    median = timings.latency["median"]
+                    if runs > 1 and median is not None:
+                        details.append(f"median {median:.2f}s")
+                    if runs > 1 and timings.cold_seconds is not None:
+                        details.append(f"cold {timings.cold_seconds:.2f}s")
+                    if timings.errors:
+                        details.append(f"{len(timings.errors)} failed")
+                    click.echo(f"  ✓  [{label}] done ({', '.join(details)})", err=True)
+
+                except Exception as exc:
+                    click.echo(f"  ✗  [{label}] error: {exc}", err=True)
+                    entries.append(BenchmarkEntry(
+                        provider=provider_name,
+                        label=label,
+                        result=None,
+                        error=str(exc),
+                        diarized=use_diarize,
+                        timings=timings if timings.errors else None,
+                    ))
+
+                throughput.add(1, audio_seconds)
+                overall.advance_to(throughput.percent, throughput.describe())
     finally:
         if is_temp and audio_path.exists():
             audio_path.unlink()
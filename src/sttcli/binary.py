@@ -0,0 +1,327 @@
+"""Compact binary transcript format (.stt).
+
+Layout (all integers little-endian)::
+
+    header   b"STT" version:u8 flags:u8 reserved:3
+    block*   kind:u8 codec:u8 reserved:u16 raw_len:u32 stored_len:u32 payload
+    end      block with kind 0
+
+A META block carries the result fields as UTF-8 JSON. Each SEGMENTS block
+holds up to BLOCK_SEGMENTS segments stored column by column: a u32 segment
+count followed by length-prefixed columns (start and end times as float64,
+UTF-8 strings as a u32 length column plus one blob, speaker and gender as
+indexes into a per-block string table, and the same layout for word
+timings). Blocks are compressed with zstd when the zstandard package is
+installed, so a reader or writer only ever holds one block in memory.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+import numpy as np
+
+from sttcli.models import Segment, TranscriptResult, Word
+
+MAGIC = b"STT"
+VERSION = 1
+
+KIND_END = 0
+KIND_META = 1
+KIND_SEGMENTS = 2
+
+CODEC_RAW = 0
+CODEC_ZSTD = 1
+
+BLOCK_SEGMENTS = 8192
+ZSTD_LEVEL = 3
+
+_HEADER = struct.Struct("<3sBB3x")
+_BLOCK = struct.Struct("<BBxxII")
+_U32 = struct.Struct("<I")
+
+META_FIELDS = ("provider", "model", "language", "duration", "source_file")
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def is_stt_file(path: Path) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+# ── Column encoding ──
+
+def _pack_strings(strings: list[str]) -> list[bytes]:
+    """Encode strings as a u32 byte-length column plus one NUL-terminated blob."""
+    encoded = [s.encode("utf-8") for s in strings]
+    lengths = np.fromiter(map(len, encoded), dtype="<u4", count=len(encoded))
+    return [lengths.tobytes(), b"\0".join(encoded) + b"\0" if encoded else b""]
+
+
+def _unpack_strings(lengths: np.ndarray, blob: bytes) -> list[str]:
+    if not len(lengths):
+        return []
+    # Fast path: one decode and one split. The length column is authoritative
+    # and only needed when a string itself contains NUL.
+    parts = blob[:-1].decode("utf-8").split("\0")
+    if len(parts) == len(lengths):
+        return parts
+    bounds = np.concatenate(([0], np.cumsum(lengths.astype(np.int64) + 1))).tolist()
+    return [blob[a:b - 1].decode("utf-8") for a, b in zip(bounds, bounds[1:])]
+
+
+def _encode_segments(segments: list[Segment]) -> bytes:
+    table: dict[str, int] = {}
+
+    def ref(value: str | None) -> int:
+        if value is None:
+            return -1
+        return table.setdefault(value, len(table))
+
+    words = [w for seg in segments if seg.words for w in seg.words]
+    columns = [
+        np.array([s.start for s in segments], dtype="<f8").tobytes(),
+        np.array([s.end for s in segments], dtype="<f8").tobytes(),
+        *_pack_strings([s.text for s in segments]),
+        np.array([ref(s.speaker) for s in segments], dtype="<i4").tobytes(),
+        np.array([ref(s.gender) for s in segments], dtype="<i4").tobytes(),
+        np.array([-1 if s.words is None else len(s.words) for s in segments], dtype="<i4").tobytes(),
+        np.array([w.start for w in words], dtype="<f8").tobytes(),
+        np.array([w.end for w in words], dtype="<f8").tobytes(),
+        np.array([np.nan if w.confidence is None else w.confidence for w in words], dtype="<f8").tobytes(),
+        *_pack_strings([w.text for w in words]),
+        *_pack_strings(list(table)),
+    ]
+    parts = [_U32.pack(len(segments))]
+    for col in columns:
+        parts.append(_U32.pack(len(col)))
+        parts.append(col)
+    return b"".join(parts)
+
+
+def _decode_segments(payload: bytes) -> list[Segment]:
+    view = memoryview(payload)
+    (n,) = _U32.unpack_from(view, 0)
+    pos = _U32.size
+    cols: list[memoryview] = []
+    while pos < len(view):
+        (size,) = _U32.unpack_from(view, pos)
+        pos += _U32.size
+        cols.append(view[pos:pos + size])
+        pos += size
+    (starts, ends, text_len, text_blob, speakers, genders, word_counts,
+     w_starts, w_ends, w_conf, w_len, w_blob, table_len, table_blob) = cols
+
+    table = _unpack_strings(np.frombuffer(table_len, dtype="<u4"), bytes(table_blob))
+    lookup = [None, *table]     # index -1 → None
+    texts = _unpack_strings(np.frombuffer(text_len, dtype="<u4"), bytes(text_blob))
+    speaker_names = list(map(lookup.__getitem__, (np.frombuffer(speakers, dtype="<i4") + 1).tolist()))
+    gender_names = list(map(lookup.__getitem__, (np.frombuffer(genders, dtype="<i4") + 1).tolist()))
+    counts = np.frombuffer(word_counts, dtype="<i4")
+
+    seg_words: list[list[Word] | None] = [None] * n
+    if len(w_starts):
+        conf = np.frombuffer(w_conf, dtype="<f8")
+        confs = conf.tolist()
+        if np.isnan(conf).any():
+            confs = [None if c != c else c for c in confs]     # NaN → None
+        all_words = list(map(
+            Word,
+            np.frombuffer(w_starts, dtype="<f8").tolist(),
+            np.frombuffer(w_ends, dtype="<f8").tolist(),
+            _unpack_strings(np.frombuffer(w_len, dtype="<u4"), bytes(w_blob)),
+            confs,
+        ))
+        bounds = np.concatenate(([0], np.cumsum(np.maximum(counts, 0)))).tolist()
+        seg_words = [
+            all_words[a:b] if c >= 0 else None
+            for a, b, c in zip(bounds, bounds[1:], counts.tolist())
+        ]
+    elif (counts >= 0).any():
+        seg_words = [[] if c >= 0 else None for c in counts.tolist()]
+
+    return list(map(
+        Segment,
+        np.frombuffer(starts, dtype="<f8").tolist(),
+        np.frombuffer(ends, dtype="<f8").tolist(),
+        texts,
+        speaker_names,
+        gender_names,
+        seg_words,
+    ))
+
+
+# ── Streaming writer / reader ──
+
+class TranscriptWriter:
+    """Write a transcript incrementally; segments are flushed in columnar blocks.
+
+    compress=None compresses when zstandard is installed.
+    """
+
+    def __init__(
+        self,
+        fh: BinaryIO,
+        meta: dict,
+        compress: bool | None = None,
+        block_segments: int = BLOCK_SEGMENTS,
+    ):
+        zstd = _zstd()
+        if compress and zstd is None:
+            raise RuntimeError("zstd compression needs the zstandard package (pip install zstandard).")
+        self._fh = fh
+        self._compressor = zstd.ZstdCompressor(level=ZSTD_LEVEL) if (zstd and compress is not False) else None
+        self._block_segments = block_segments
+        self._pending: list[Segment] = []
+        self._closed = False
+        fh.write(_HEADER.pack(MAGIC, VERSION, 0))
+        self._write_block(KIND_META, json.dumps({k: meta.get(k) for k in META_FIELDS}).encode("utf-8"))
+
+    def _write_block(self, kind: int, raw: bytes) -> None:
+        codec, stored = CODEC_RAW, raw
+        if self._compressor is not None and raw:
+            codec, stored = CODEC_ZSTD, self._compressor.compress(raw)
+        self._fh.write(_BLOCK.pack(kind, codec, len(raw), len(stored)))
+        self._fh.write(stored)
+
+    def write(self, segment: Segment) -> None:
+        self._pending.append(segment)
+        if len(self._pending) >= self._block_segments:
+            self.flush()
+
+    def write_all(self, segments: Iterable[Segment]) -> None:
+        for seg in segments:
+            self.write(seg)
+
+    def flush(self) -> None:
+        if self._pending:
+            self._write_block(KIND_SEGMENTS, _encode_segments(self._pending))
+            self._pending = []
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        self._fh.write(_BLOCK.pack(KIND_END, CODEC_RAW, 0, 0))
+        self._closed = True
+
+    def __enter__(self) -> "TranscriptWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+
+
+class TranscriptReader:
+    """Read a .stt stream block by block; iterate to get segments lazily."""
+
+    def __init__(self, fh: BinaryIO):
+        self._fh = fh
+        header = fh.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError("Not an sttcli binary transcript (file too short).")
+        magic, version, _ = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("Not an sttcli binary transcript.")
+        if version > VERSION:
+            raise ValueError(f"Unsupported .stt version {version} (this sttcli reads up to {VERSION}).")
+        self._decompressor = None
+        self._first: tuple[int, bytes] | None = self._read_block()
+        self.meta: dict = {}
+        if self._first is not None and self._first[0] == KIND_META:
+            self.meta = json.loads(self._first[1])
+            self._first = None
+
+    def _read_block(self) -> tuple[int, bytes] | None:
+        head = self._fh.read(_BLOCK.size)
+        if len(head) < _BLOCK.size:
+            raise ValueError("Truncated .stt file.")
+        kind, codec, raw_len, stored_len = _BLOCK.unpack(head)
+        if kind == KIND_END:
+            return None
+        stored = self._fh.read(stored_len)
+        if len(stored) < stored_len:
+            raise ValueError("Truncated .stt file.")
+        if codec == CODEC_ZSTD:
+            if self._decompressor is None:
+                zstd = _zstd()
+                if zstd is None:
+                    raise RuntimeError("This file is zstd-compressed; install the zstandard package to read it.")
+                self._decompressor = zstd.ZstdDecompressor()
+            return kind, self._decompressor.decompress(stored, max_output_size=raw_len)
+        return kind, stored
+
+    def iter_blocks(self) -> Iterator[list[Segment]]:
+        """Yield segments one block at a time."""
+        block = self._first
+        self._first = None
+        if block is None:
+            block = self._read_block()
+        while block is not None:
+            kind, payload = block
+            if kind == KIND_SEGMENTS:
+                yield _decode_segments(payload)
+            elif kind == KIND_META:
+                self.meta = json.loads(payload)
+            block = self._read_block()
+
+    def __iter__(self) -> Iterator[Segment]:
+        for segments in self.iter_blocks():
+            yield from segments
+
+
+# ── Whole-result helpers ──
+
+def dump_result(result: TranscriptResult, fh: BinaryIO, compress: bool | None = None) -> None:
+    meta = {k: getattr(result, k) for k in META_FIELDS}
+    with TranscriptWriter(fh, meta, compress=compress) as writer:
+        writer.write_all(result.segments)
+
+
+def load_result(fh: BinaryIO) -> TranscriptResult:
+    reader = TranscriptReader(fh)
+    segments: list[Segment] = []
+    # Hundreds of thousands of new objects would otherwise trigger repeated
+    # cyclic GC passes that cost more than decoding itself.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for block in reader.iter_blocks():
+            segments.extend(block)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    meta = reader.meta
+    return TranscriptResult(
+        segments=segments,
+        language=meta.get("language") or "",
+        duration=float(meta.get("duration") or 0.0),
+        provider=meta.get("provider") or "",
+        model=meta.get("model") or "",
+        source_file=meta.get("source_file") or "",
+    )
+
+
+def write_result(path: Path, result: TranscriptResult, compress: bool | None = None) -> None:
+    with open(path, "wb") as fh:
+        dump_result(result, fh, compress)
+
+
+def read_result(path: Path) -> TranscriptResult:
+    with open(path, "rb") as fh:
+        return load_result(fh)
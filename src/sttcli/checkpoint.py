@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from sttcli.audio import content_hash
+from sttcli.models import Segment, TranscriptResult, Word
+from sttcli.pcm import open_pcm, write_wav
+from sttcli.progress import NullStepProgress, StepProgress
+from sttcli.providers.base import BaseProvider
+
+DEFAULT_JOB_ROOT = Path.home() / ".cache" / "sttcli" / "jobs"
+
+MANIFEST_NAME = "manifest.json"
+
+
+def provider_spec(provider: BaseProvider) -> dict:
+    """Every provider option that affects a transcript's content."""
+    spec = {
+        "provider": provider.provider_name,
+        "model": provider.model,
+        "language": provider.language,
+        "diarize": provider.diarize,
+        "num_speakers": provider.num_speakers,
+    }
+    if getattr(provider, "engine", None):
+        spec["engine"] = (provider.engine, provider.compute_type)
+    if getattr(provider, "refine_model", None):
+        spec["refine_model"] = provider.refine_model
+    return spec
+
+
+def job_spec(input_path: Path, provider: BaseProvider, chunk_seconds: float) -> dict:
+    """Input content and every option that affects a chunked job's output."""
+    return {"input": content_hash(input_path), **provider_spec(provider), "chunk_seconds": chunk_seconds}
+
+
+def job_key(spec: dict) -> str:
+    """Identify a job by its job_spec."""
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:24]
+
+
+def _write_json_atomic(path: Path, data: dict) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class ChunkCheckpoints:
+    """Per-job directory holding one JSON result file per finished chunk."""
+
+    def __init__(self, job_dir: Path):
+        self.job_dir = job_dir
+
+    def chunk_path(self, index: int) -> Path:
+        return self.job_dir / f"chunk_{index:05d}.json"
+
+    def load(self, index: int) -> tuple[list[Segment], str] | None:
+        """Return (segments, language) for a finished chunk, or None."""
+        path = self.chunk_path(index)
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return [Segment.from_dict(s) for s in data["segments"]], data.get("language", "")
+        except (ValueError, KeyError, TypeError):
+            # A torn or foreign file: treat the chunk as unfinished.
+            return None
+
+    def save(self, index: int, segments: list[Segment], language: str) -> None:
+        _write_json_atomic(
+            self.chunk_path(index),
+            {"language": language, "segments": [s.to_dict() for s in segments]},
+        )
+
+    def read_manifest(self) -> dict | None:
+        try:
+            data = json.loads((self.job_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
+
+    def write_manifest(self, manifest: dict) -> None:
+        _write_json_atomic(self.job_dir / MANIFEST_NAME, manifest)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.job_dir, ignore_errors=True)
+
+
+def transcribe_chunked(
+    provider: BaseProvider,
+    audio_path: Path,
+    chunk_seconds: float,
+    step: StepProgress,
+    job_root: Path | None = None,
+    resume: bool = True,
+    keep: bool = False,
+    source_path: Path | None = None,
+) -> TranscriptResult:
+    """Transcribe audio_path in fixed-length chunks, checkpointing each one.
+
+    Finished chunks are written to a job directory keyed by the input content
+    and provider options, so a re-run after a crash only transcribes the chunks
+    that had not finished. The job directory is removed on success unless
+    keep=True. source_path (the original input, e.g. a video) is hashed for the
+    job key when given, so temporary extracted audio still resumes.
+    """
+    pcm = open_pcm(audio_path)
+    duration = pcm.duration
+    if duration <= 0:
+        raise RuntimeError(f"Could not determine duration of {audio_path}")
+
+    spec = job_spec(source_path or audio_path, provider, chunk_seconds)
+    job_dir = (job_root or DEFAULT_JOB_ROOT) / job_key(spec)
+    checkpoints = ChunkCheckpoints(job_dir)
+    n_chunks = max(1, math.ceil(duration / chunk_seconds))
+    # JSON round-trips tuples as lists; compare the manifest in that form.
+    manifest = json.loads(json.dumps({**spec, "duration": duration, "chunks": n_chunks}))
+    if not resume:
+        checkpoints.clear()
+    else:
+        previous = checkpoints.read_manifest()
+        if previous is not None and {k: v for k, v in previous.items() if k != "source_file"} != manifest:
+            # Chunks were written for a different input, options or decode: start over.
+            checkpoints.clear()
+    job_dir.mkdir(parents=True, exist_ok=True)
+    checkpoints.write_manifest({**manifest, "source_file": str(source_path or audio_path)})
+
+    segments: list[Segment] = []
+    language = ""
+    resumed = 0
+
+    for i in range(n_chunks):
+        start = i * chunk_seconds
+        length = min(chunk_seconds, duration - start)
+        step.advance_to(int(100 * i / n_chunks), f"Transcribing chunk {i + 1}/{n_chunks}...")
+
+        finished = checkpoints.load(i)
+        if finished is not None:
+            chunk_segments, chunk_language = finished
+            resumed += 1
+            language = language or chunk_language
+        else:
+            with tempfile.TemporaryDirectory(prefix="sttcli-chunk-") as tmp:
+                clip = Path(tmp) / f"chunk_{i:05d}.wav"
+                write_wav(clip, pcm.slice(start, start + length))
+                chunk_result = provider.transcribe(clip, NullStepProgress())
+            chunk_segments = [
+                Segment(
+                    start=seg.start + start,
+                    end=seg.end + start,
+                    text=seg.text,
+                    speaker=seg.speaker,
+                    gender=seg.gender,
+                    words=[
+                        Word(start=w.start + start, end=w.end + start, text=w.text, confidence=w.confidence)
+                        for w in seg.words
+                    ] if seg.words is not None else None,
+                )
+                for seg in chunk_result.segments
+            ]
+            checkpoints.save(i, chunk_segments, chunk_result.language)
+            language = language or chunk_result.language
+
+        segments.extend(chunk_segments)
+
+    done_msg = f"Done ({resumed}/{n_chunks} chunks resumed)" if resumed else "Done"
+    step.advance_to(100, done_msg)
+
+    if not keep:
+        checkpoints.clear()
+
+    return TranscriptResult(
+        segments=segments,
+        language=language or provider.language or "",
+        duration=segments[-1].end if segments else 0.0,
+        provider=provider.provider_name,
+        model=provider.model,
+        source_file=str(audio_path),
+    )
@@ -6,12 +6,25 @@ from pathlib import Path
 
 import click
 
-from sttcli.audio import extract_audio, get_duration, is_video
-from sttcli.config import resolve_api_key
-from sttcli.formatters import get_formatter
-from sttcli.gender import detect_gender, detect_genders_per_speaker
+from sttcli.benchmark import DIARIZE_SUPPORTED
+from sttcli.config import resolve_api_key, resolve_base_url
+from sttcli.output import load_transcript, output_paths, parse_formats, render, render_outputs
+from sttcli.pipeline import (
+    transcribe_batch, transcribe_channels, transcribe_ensemble, transcribe_incremental,
+)
 from sttcli.progress import make_progress, StepProgress
 from sttcli.providers import get_provider
+from sttcli.routing import transcribe_auto, transcribe_recorded
+from sttcli.store import auto_index_enabled
+
+
+def _apply_config(ctx, param, value: Path | None) -> Path | None:
+    """--config callback: settings read process-wide (the [cache] section) follow the given file."""
+    if value is not None:
+        from sttcli.pcm import configure_cache
+
+        configure_cache(value)
+    return value
 
 
 # ── Smart default-command group ──────────────────────────────────────────────
@@ -43,109 +56,550 @@ def main(ctx):
 @main.command("transcribe")
 @click.argument("input_file", type=click.Path(exists=True, path_type=Path))
 @click.option("-p", "--provider", "provider_name",
-              type=click.Choice(["whisper", "openai", "gemini", "elevenlabs"]),
+              type=click.Choice(["whisper", "openai", "gemini", "elevenlabs", "auto"]),
               default="whisper", show_default=True,
-              help="STT provider to use.")
+              help="STT provider to use; auto picks the one expected to finish soonest.")
 @click.option("-m", "--model", default=None, help="Provider model name.")
 @click.option("-l", "--language", default=None, help="Language code (e.g. ko, en, ja).")
-@click.option("-f", "--format", "fmt",
-              type=click.Choice(["markdown", "srt", "json", "text"]),
-              default="markdown", show_default=True,
-              help="Output format.")
-@click.option("-o", "--output", type=click.Path(path_type=Path), default=None,
-              help="Output file path (default: stdout).")
+@click.option("-f", "--format", "fmt", default="markdown", show_default=True,
+              help="Output format, or several comma-separated: markdown, srt, json, text, "
+                   "stt (compact binary).")
+@click.option("-o", "--output", default=None,
+              help="Output file path or template such as out/{stem}.{ext} "
+                   "(default: stdout; next to the input for several formats).")
 @click.option("--api-key", default=None, help="API key (overrides env and config).")
 @click.option("--config", "config_file", type=click.Path(path_type=Path), default=None,
-              help="Config file path (default: ~/.sttcli.toml).")
+              callback=_apply_config, help="Config file path (default: ~/.sttcli.toml).")
 @click.option("--device", type=click.Choice(["cpu", "cuda", "mps"]), default="cpu",
               show_default=True, help="Compute device for Whisper.")
 @click.option("--diarize", is_flag=True, default=False,
-              help="Enable speaker diarization (elevenlabs and gemini only).")
+              help="Enable speaker diarization (native for elevenlabs and gemini, "
+                   "local voice clustering for whisper, openai and --ensemble).")
 @click.option("--num-speakers", type=int, default=None,
-              help="Number of speakers hint (optional, used by elevenlabs and gemini).")
+              help="Number of speakers hint (estimated when omitted).")
+@click.option("--chunk-seconds", type=float, default=None,
+              help="Transcribe in checkpointed chunks of this many seconds; "
+                   "an interrupted run resumes from the last finished chunk.")
+@click.option("--job-dir", type=click.Path(path_type=Path), default=None,
+              help="Checkpoint directory for chunked runs (default: ~/.cache/sttcli/jobs).")
+@click.option("--no-resume", is_flag=True, default=False,
+              help="Discard existing checkpoints and start the chunked run over.")
+@click.option("--engine", type=click.Choice(["openai-whisper", "faster-whisper"]),
+              default="openai-whisper", show_default=True,
+              help="Local inference engine for the whisper provider.")
+@click.option("--compute-type",
+              type=click.Choice(["default", "int8", "int8_float32", "int8_float16", "float16", "float32"]),
+              default="default", show_default=True,
+              help="CTranslate2 compute type (faster-whisper only).")
+@click.option("--threads", type=int, default=0,
+              help="CPU threads for local Whisper inference (default: backend default).")
+@click.option("--refine-model", default=None,
+              help="Two-pass Whisper: draft with --model, then re-decode low-confidence "
+                   "segments with this model (e.g. large-v3).")
+@click.option("--ensemble", "ensemble_list", default=None,
+              help="Run these providers concurrently and merge them by word voting "
+                   "instead of using --provider. e.g. whisper,openai,elevenlabs:scribe_v1")
+@click.option("--split-channels", is_flag=True, default=False,
+              help="Transcribe each audio channel separately, in parallel, and label "
+                   "segments by channel instead of diarizing (e.g. call recordings).")
+@click.option("--incremental", is_flag=True, default=False,
+              help="Reuse the transcript of an earlier version of this recording and "
+                   "transcribe only the regions that were edited.")
 def transcribe(
     input_file: Path,
     provider_name: str,
     model: str | None,
     language: str | None,
     fmt: str,
-    output: Path | None,
+    output: str | None,
     api_key: str | None,
     config_file: Path | None,
     device: str,
     diarize: bool,
     num_speakers: int | None,
+    chunk_seconds: float | None,
+    job_dir: Path | None,
+    no_resume: bool,
+    engine: str,
+    compute_type: str,
+    threads: int,
+    refine_model: str | None,
+    ensemble_list: str | None,
+    split_channels: bool,
+    incremental: bool,
 ):
     """Transcribe a single audio or video file."""
 
-    if diarize and provider_name in ("whisper", "openai"):
+    if ensemble_list and chunk_seconds:
+        raise click.UsageError("--ensemble cannot be combined with --chunk-seconds.")
+    if chunk_seconds is not None and chunk_seconds <= 0:
+        raise click.UsageError("--chunk-seconds must be positive.")
+    if chunk_seconds and diarize and provider_name in DIARIZE_SUPPORTED:
+        # Provider speaker labels are assigned per request and would not match
+        # across chunks. Local diarization runs once over the whole file.
         raise click.UsageError(
-            f"--diarize는 {provider_name} 프로바이더에서 지원되지 않습니다. "
-            "elevenlabs 또는 gemini를 사용하세요."
+            f"--chunk-seconds cannot be combined with --diarize for {provider_name}; "
+            "use whisper or openai, which diarize locally."
         )
 
-    resolved_key = resolve_api_key(provider_name, api_key, config_file)
+    if split_channels and (ensemble_list or chunk_seconds or provider_name == "auto"):
+        raise click.UsageError(
+            "--split-channels cannot be combined with --ensemble, --chunk-seconds or --provider auto."
+        )
+    if split_channels and diarize:
+        raise click.UsageError("--split-channels labels speakers by channel; drop --diarize.")
+    if incremental and (ensemble_list or chunk_seconds or provider_name == "auto" or split_channels):
+        raise click.UsageError(
+            "--incremental cannot be combined with --ensemble, --chunk-seconds, --provider auto "
+            "or --split-channels."
+        )
+    if incremental and diarize and provider_name in DIARIZE_SUPPORTED:
+        # Provider speaker labels would not match between reused and new regions.
+        raise click.UsageError(
+            f"--incremental cannot be combined with --diarize for {provider_name}; "
+            "use whisper or openai, which diarize locally."
+        )
 
-    ProviderClass = get_provider(provider_name)
-    provider = ProviderClass(
-        model=model, language=language, api_key=resolved_key,
-        device=device, diarize=diarize, num_speakers=num_speakers,
-    )
+    local_tuning = engine != "openai-whisper" or compute_type != "default" or threads or refine_model
+    if local_tuning and (ensemble_list or provider_name != "whisper"):
+        raise click.UsageError(
+            "--engine, --compute-type, --threads and --refine-model apply to the whisper provider only."
+        )
+    if compute_type != "default" and engine != "faster-whisper":
+        raise click.UsageError("--compute-type requires --engine faster-whisper.")
+    if threads < 0:
+        raise click.UsageError("--threads must not be negative.")
+    if provider_name == "auto" and (model or api_key):
+        raise click.UsageError(
+            "--provider auto picks models and keys from [routing] providers; "
+            "drop --model/--api-key."
+        )
+
+    formats, output = _resolve_output(fmt, output, input_file)
+
+    ensemble = None
+    if ensemble_list:
+        ensemble = _ensemble_providers(ensemble_list, language, device, config_file)
+    elif provider_name != "auto":
+        resolved_key = resolve_api_key(provider_name, api_key, config_file)
+
+        engine_options = {}
+        if provider_name == "whisper":
+            engine_options = {
+                "engine": engine, "compute_type": compute_type, "threads": threads,
+                "refine_model": refine_model,
+            }
+
+        ProviderClass = get_provider(provider_name)
+        provider = ProviderClass(
+            model=model, language=language, api_key=resolved_key,
+            device=device, diarize=diarize, num_speakers=num_speakers,
+            base_url=resolve_base_url(provider_name, None, config_file),
+            **engine_options,
+        )
+
+    with make_progress() as progress:
+        if ensemble:
+            result = transcribe_ensemble(
+                ensemble, input_file, progress, diarize=diarize, num_speakers=num_speakers,
+            )
+        elif provider_name == "auto":
+            def announce(option):
+                progress.console.print(
+                    f"Routing to {option.spec} (expected {option.expected_seconds:.0f}s)", style="dim",
+                )
+
+            try:
+                result = transcribe_auto(
+                    input_file, progress, config_file,
+                    language=language, device=device, diarize=diarize, num_speakers=num_speakers,
+                    on_attempt=announce,
+                    chunk_seconds=chunk_seconds, job_root=job_dir, resume=not no_resume,
+                )
+            except RuntimeError as exc:
+                raise click.ClickException(str(exc)) from exc
+        elif incremental:
+            from sttcli.fingerprint import FingerprintIndex, resolve_index_path
+
+            def announce_plan(plan):
+                progress.console.print(
+                    f"Reusing {plan.source}: transcribing {plan.transcribe_seconds:.0f}s "
+                    f"of {plan.duration:.0f}s in {len(plan.gaps)} region(s)", style="dim",
+                )
+
+            with FingerprintIndex(resolve_index_path(config_file)) as fingerprints:
+                result = transcribe_incremental(provider, input_file, fingerprints, progress, on_plan=announce_plan)
+        elif split_channels:
+            try:
+                result = transcribe_channels(provider, input_file, progress)
+            except (ValueError, RuntimeError) as exc:
+                raise click.ClickException(str(exc)) from exc
+        else:
+            result = transcribe_recorded(
+                provider, input_file, progress, config_file,
+                chunk_seconds=chunk_seconds, job_root=job_dir, resume=not no_resume,
+            )
+
+        fmt_step = StepProgress(progress, "Formatting output...", total=100)
+        fmt_step.advance_to(50)
+        if output is not None:
+            paths = output_paths(output, formats, input_file, result.provider, result.model)
+            render_outputs(result, paths)
+        else:
+            paths = {}
+            output_text = render(result, formats[0])
+        fmt_step.advance_to(100, "Done")
+
+    if paths:
+        for path in paths.values():
+            click.echo(f"Transcript saved to {path}", err=True)
+    else:
+        sys.stdout.write(output_text)
 
-    FormatterClass = get_formatter(fmt)
-    formatter = FormatterClass()
+    if auto_index_enabled(config_file):
+        _index_result(result, paths.get("json") or next(iter(paths.values()), None), config_file)
 
-    audio_path: Path | None = None
-    is_temp = False
 
+def _resolve_output(fmt: str, output: str | None, input_file: Path) -> tuple[list[str], str | None]:
+    """Parse -f and check -o; several formats default to a template next to the input."""
     try:
-        with make_progress() as progress:
-            if is_video(input_file):
-                extract_step = StepProgress(progress, "Extracting audio...", total=100)
-                extract_step.advance_to(0)
-                audio_path, is_temp = extract_audio(input_file)
-                extract_step.advance_to(100, "Audio extracted")
-            else:
-                audio_path = input_file
+        formats = parse_formats(fmt)
+        if output is None and len(formats) > 1:
+            parent = str(input_file.parent).replace("{", "{{").replace("}", "}}")
+            output = str(Path(parent) / "{stem}.{ext}")
+        if output is None and formats == ["stt"]:
+            raise ValueError("The binary stt format needs -o.")
+        if output is not None:
+            output_paths(output, formats, input_file)     # validate the template early
+    except ValueError as exc:
+        raise click.UsageError(str(exc)) from exc
+    return formats, output
+
+
+def _ensemble_providers(
+    ensemble_list: str,
+    language: str | None,
+    device: str,
+    config_file: Path | None,
+) -> list:
+    """Build one provider per "provider[:model]" spec in a comma-separated list."""
+    from sttcli.benchmark import ALL_PROVIDERS, parse_provider_spec
+
+    specs = [parse_provider_spec(s) for s in ensemble_list.split(",") if s.strip()]
+    invalid = [name for name, _ in specs if name not in ALL_PROVIDERS]
+    if invalid:
+        raise click.UsageError(f"Unknown provider(s): {', '.join(invalid)}")
+    if len(specs) < 2:
+        raise click.UsageError("--ensemble needs at least two providers.")
+
+    return [
+        get_provider(name)(
+            model=spec_model, language=language,
+            api_key=resolve_api_key(name, None, config_file), device=device,
+            base_url=resolve_base_url(name, None, config_file),
+        )
+        for name, spec_model in specs
+    ]
+
+
+def _index_result(result, output: Path | None, config_file: Path | None) -> None:
+    """Add a fresh run to the transcript store (enabled by [store] auto_index)."""
+    from sttcli.store import TranscriptStore, resolve_store_path
+
+    key = str(output.resolve()) if output else f"{result.source_file}#{result.provider}:{result.model}"
+    with TranscriptStore(resolve_store_path(None, config_file)) as store:
+        store.add_result(result, key)
+
+
+# ── batch ────────────────────────────────────────────────────────────────────
+
+@main.command("batch")
+@click.argument("input_files", nargs=-1, required=True,
+                type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("-p", "--provider", "provider_name",
+              type=click.Choice(["whisper", "openai", "gemini", "elevenlabs"]),
+              default="whisper", show_default=True, help="STT provider to use.")
+@click.option("-m", "--model", default=None, help="Provider model name.")
+@click.option("-l", "--language", default=None, help="Language code (e.g. ko, en, ja).")
+@click.option("-f", "--format", "fmt", default="markdown", show_default=True,
+              help="Output format, or several comma-separated: markdown, srt, json, text, stt.")
+@click.option("-o", "--output", default=None,
+              help="Output template such as out/{stem}.{ext} (default: next to each input).")
+@click.option("--api-key", default=None, help="API key (overrides env and config).")
+@click.option("--config", "config_file", type=click.Path(path_type=Path), default=None,
+              callback=_apply_config, help="Config file path (default: ~/.sttcli.toml).")
+@click.option("--device", type=click.Choice(["cpu", "cuda", "mps"]), default="cpu",
+              show_default=True, help="Compute device for Whisper.")
+@click.option("--diarize", is_flag=True, default=False, help="Enable speaker diarization.")
+@click.option("--num-speakers", type=int, default=None, help="Number of speakers hint.")
+@click.option("--engine", type=click.Choice(["openai-whisper", "faster-whisper"]),
+              default="openai-whisper", show_default=True,
+              help="Local inference engine for the whisper provider.")
+@click.option("--compute-type",
+              type=click.Choice(["default", "int8", "int8_float32", "int8_float16", "float16", "float32"]),
+              default="default", show_default=True,
+              help="CTranslate2 compute type (faster-whisper only).")
+@click.option("--threads", type=int, default=0,
+              help="CPU threads for local Whisper inference (default: backend default).")
+@click.option("--batch-size", type=int, default=16, show_default=True,
+              help="Clips of up to 30 s decoded together per Whisper forward pass.")
+@click.option("--dedup", is_flag=True, default=False,
+              help="Transcribe acoustically identical inputs once (index persists across runs).")
+@click.option("--metrics-file", type=click.Path(dir_okay=False, path_type=Path), default=None,
+              help="Write run metrics here in Prometheus text format "
+                   "(for node_exporter's textfile collector).")
+def batch(
+    input_files: tuple[Path, ...],
+    provider_name: str,
+    model: str | None,
+    language: str | None,
+    fmt: str,
+    output: str | None,
+    api_key: str | None,
+    config_file: Path | None,
+    device: str,
+    diarize: bool,
+    num_speakers: int | None,
+    engine: str,
+    compute_type: str,
+    threads: int,
+    batch_size: int,
+    dedup: bool,
+    metrics_file: Path | None,
+):
+    """Transcribe many files; local Whisper batches short clips into one forward pass."""
+    import time
+    from contextlib import nullcontext
 
-            trans_step = StepProgress(progress, "Transcribing...", total=100)
-            result = provider.transcribe(audio_path, trans_step)
+    from sttcli.fingerprint import FingerprintIndex, resolve_index_path
+    from sttcli.scheduler import Scheduler
+    from sttcli.telemetry import REGISTRY
 
-            # Skip pitch-based detection if the provider already supplied gender
-            # (e.g. Gemini returns it directly from the transcription call).
-            already_detected = any(seg.gender for seg in result.segments)
-            if already_detected:
-                gender_step = StepProgress(progress, "Gender detected by provider", total=100)
-                gender_step.advance_to(100, "Done")
+    if batch_size < 1:
+        raise click.UsageError("--batch-size must be at least 1.")
+    local_tuning = engine != "openai-whisper" or compute_type != "default" or threads
+    if local_tuning and provider_name != "whisper":
+        raise click.UsageError("--engine, --compute-type and --threads apply to the whisper provider only.")
+    if compute_type != "default" and engine != "faster-whisper":
+        raise click.UsageError("--compute-type requires --engine faster-whisper.")
+
+    inputs = list(dict.fromkeys(input_files))
+    try:
+        formats = parse_formats(fmt)
+        templates = {}
+        for path in inputs:
+            if output is None:
+                parent = str(path.parent).replace("{", "{{").replace("}", "}}")
+                templates[path] = str(Path(parent) / "{stem}.{ext}")
             else:
-                gender_step = StepProgress(progress, "Detecting speaker gender...", total=100)
-                gender_step.advance_to(0)
-                has_speakers = any(seg.speaker for seg in result.segments)
-                if has_speakers:
-                    genders = detect_genders_per_speaker(str(audio_path), result.segments)
-                    for seg in result.segments:
-                        if seg.speaker and seg.speaker in genders:
-                            seg.gender = genders[seg.speaker]
-                else:
-                    detected = detect_gender(str(audio_path))
-                    for seg in result.segments:
-                        seg.gender = detected
-                gender_step.advance_to(100, "Done")
-
-            fmt_step = StepProgress(progress, "Formatting output...", total=100)
-            fmt_step.advance_to(50)
-            output_text = formatter.format(result)
-            fmt_step.advance_to(100, "Done")
+                templates[path] = output
+        planned = [p for path in inputs for p in output_paths(templates[path], formats, path).values()]
+    except ValueError as exc:
+        raise click.UsageError(str(exc)) from exc
+    if len(set(planned)) < len(planned):
+        raise click.UsageError("Output paths collide; use {stem} in the -o template.")
+    if set(planned) & set(inputs):
+        raise click.UsageError("The output template would overwrite an input file.")
+
+    engine_options = {}
+    if provider_name == "whisper":
+        engine_options = {"engine": engine, "compute_type": compute_type, "threads": threads}
+    provider = get_provider(provider_name)(
+        model=model, language=language, api_key=resolve_api_key(provider_name, api_key, config_file),
+        device=device, diarize=diarize, num_speakers=num_speakers,
+        base_url=resolve_base_url(provider_name, None, config_file),
+        **engine_options,
+    )
 
+    duplicates = []
+    failures: list[tuple[Path, Exception]] = []
+    start = time.perf_counter()
+    fingerprints = FingerprintIndex(resolve_index_path(config_file)) if dedup else nullcontext()
+    try:
+        with fingerprints, make_progress() as progress:
+            def announce(path: Path, source: str, offset: float) -> None:
+                duplicates.append(path)
+                progress.console.print(f"{path}: same audio as {source} (at {offset:+.1f}s)", style="dim")
+
+            def write(path: Path, result) -> None:
+                # Written as each file finishes, so a later failure loses nothing.
+                render_outputs(result, output_paths(templates[path], formats, path, result.provider, result.model))
+
+            def failed(path: Path, exc: Exception) -> None:
+                failures.append((path, exc))
+                progress.console.print(f"{path}: failed: {exc}", style="red")
+
+            results = transcribe_batch(
+                provider, inputs, progress, batch_size,
+                dedup=fingerprints if dedup else None, on_duplicate=announce, scheduler=Scheduler(),
+                on_result=write, on_error=failed,
+            )
     finally:
-        if is_temp and audio_path and audio_path.exists():
-            audio_path.unlink()
+        if metrics_file is not None:
+            REGISTRY.write_textfile(metrics_file)
+    elapsed = time.perf_counter() - start
 
-    if output:
-        output.write_text(output_text, encoding="utf-8")
-        click.echo(f"Transcript saved to {output}", err=True)
-    else:
-        sys.stdout.write(output_text)
+    results = [r for r in results if r is not None]
+    audio = sum(r.duration for r in results)
+    click.echo(
+        f"Transcribed {len(results)} file(s) ({audio:.0f}s of audio) in {elapsed:.1f}s "
+        f"— {len(results) / elapsed:.2f} files/s",
+        err=True,
+    )
+    if dedup:
+        click.echo(f"Reused {len(duplicates)} transcript(s) for duplicate audio.", err=True)
+    if failures:
+        for path, exc in failures:
+            click.echo(f"  {path}: {exc}", err=True)
+        raise click.ClickException(f"{len(failures)} of {len(inputs)} file(s) failed.")
+
+
+# ── route ────────────────────────────────────────────────────────────────────
+
+@main.command("route")
+@click.argument("input_file", type=click.Path(exists=True, dir_okay=False, path_type=Path), required=False)
+@click.option("--device", type=click.Choice(["cpu", "cuda", "mps"]), default="cpu",
+              show_default=True, help="Compute device for Whisper.")
+@click.option("--diarize", is_flag=True, default=False, help="Require diarization.")
+@click.option("--config", "config_file", type=click.Path(path_type=Path), default=None,
+              callback=_apply_config, help="Config file path (default: ~/.sttcli.toml).")
+@click.option("--json", "as_json", is_flag=True, default=False, help="Emit JSON.")
+def route(input_file: Path | None, device: str, diarize: bool, config_file: Path | None, as_json: bool):
+    """Show how --provider auto would rank providers for INPUT_FILE (or the recorded history)."""
+    import json
+
+    from sttcli.audio import get_duration
+    from sttcli.routing import MetricsStore, RoutingPolicy, plan_route, resolve_metrics_path
+
+    with MetricsStore(resolve_metrics_path(config_file)) as metrics:
+        if input_file is None:
+            rows = metrics.summary()
+            if as_json:
+                click.echo(json.dumps(rows, ensure_ascii=False, indent=2))
+                return
+            if not rows:
+                click.echo("No runs recorded yet.", err=True)
+            for r in rows:
+                label = f"{r['provider']}:{r['model']}" + (f"@{r['device']}" if r["device"] else "")
+                click.echo(
+                    f"{label:<36} runs {r['runs']:>4}  ok {r['ok']:>4}  "
+                    f"latency {r['latency']:>6.2f}s  rtf {r['rtf']:.4f}  failures {r['failure_rate']:.0%}"
+                )
+            return
+
+        audio_seconds = get_duration(input_file)
+        try:
+            plan = plan_route(
+                RoutingPolicy.from_config(config_file), metrics, audio_seconds,
+                input_file.stat().st_size, device=device, diarize=diarize, config_path=config_file,
+            )
+        except ValueError as exc:
+            raise click.ClickException(str(exc)) from exc
+
+    if as_json:
+        click.echo(json.dumps(
+            {"audio_seconds": audio_seconds, "options": [o.to_dict() for o in plan]},
+            ensure_ascii=False, indent=2,
+        ))
+        return
+    click.echo(f"{input_file.name}: {audio_seconds:.1f}s of audio", err=True)
+    for rank, o in enumerate(plan, 1):
+        if o.excluded:
+            click.echo(f"   -  {o.spec:<28} excluded: {o.excluded}")
+            continue
+        note = "  (failing, last resort)" if o.stats and o.stats.circuit_open else ""
+        click.echo(
+            f"  {rank:>2}. {o.spec:<28} ~{o.expected_seconds:>7.1f}s  ${o.cost:.4f}  "
+            f"failures {o.stats.failure_rate:.0%}  history {o.stats.runs}{note}"
+        )
+
+
+# ── engine-bench ─────────────────────────────────────────────────────────────
+
+@main.command("engine-bench")
+@click.argument("input_files", nargs=-1, required=True,
+                type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("-m", "--model", default="small", show_default=True, help="Whisper model name.")
+@click.option("--engines", "engine_list",
+              default="openai-whisper,faster-whisper:int8,faster-whisper:int8_float32", show_default=True,
+              help="Comma-separated engine[:compute_type] specs; the first is the reference for agreement.")
+@click.option("--device", type=click.Choice(["cpu", "cuda"]), default="cpu", show_default=True,
+              help="Compute device.")
+@click.option("--threads", type=int, default=0, help="CPU threads (default: backend default).")
+@click.option("-l", "--language", default=None, help="Language code (skips detection).")
+@click.option("--json", "as_json", is_flag=True, default=False, help="Emit JSON.")
+def engine_bench(
+    input_files: tuple[Path, ...],
+    model: str,
+    engine_list: str,
+    device: str,
+    threads: int,
+    language: str | None,
+    as_json: bool,
+):
+    """Compare local Whisper engines side by side on the same files (speed and memory)."""
+    import json
+
+    from sttcli.engine_bench import parse_engine_spec, run_engine_benchmark
+    from sttcli.providers.whisper_local import COMPUTE_TYPES, ENGINES
+
+    specs = [s.strip() for s in engine_list.split(",") if s.strip()]
+    for spec in specs:
+        engine, compute_type = parse_engine_spec(spec)
+        if engine not in ENGINES or compute_type not in COMPUTE_TYPES:
+            raise click.UsageError(f"Invalid engine spec: {spec}")
+
+    click.echo(
+        f"Benchmarking {len(specs)} engine(s) on {len(input_files)} file(s) "
+        f"with model '{model}' on {device}...",
+        err=True,
+    )
+    reports = run_engine_benchmark(specs, list(input_files), model, device, threads, language)
+
+    if as_json:
+        click.echo(json.dumps([r.to_dict() for r in reports], ensure_ascii=False, indent=2))
+        return
+
+    click.echo(f"\n{'engine':<28} {'load':>7} {'transcribe':>11} {'RTF':>7} {'peak RSS':>10} {'agreement':>10}")
+    for r in reports:
+        if r.error:
+            click.echo(f"{r.spec:<28} error: {r.error}")
+            continue
+        rss = f"{r.peak_rss_mb:.0f} MB" if r.peak_rss_mb is not None else "-"
+        agreement = f"{r.agreement:.1%}" if r.agreement is not None else "reference"
+        click.echo(
+            f"{r.spec:<28} {r.load_seconds:>6.1f}s {r.total_seconds:>10.1f}s "
+            f"{r.rtf:>7.3f} {rss:>10} {agreement:>10}"
+        )
+
+
+# ── convert ──────────────────────────────────────────────────────────────────
+
+@main.command("convert")
+@click.argument("input_file", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("-f", "--format", "fmt", default="markdown", show_default=True,
+              help="Output format, or several comma-separated: markdown, srt, json, text, stt.")
+@click.option("-o", "--output", default=None,
+              help="Output file path or template such as out/{stem}.{ext} "
+                   "(default: stdout; next to the input for several formats).")
+def convert(input_file: Path, fmt: str, output: str | None):
+    """Re-render a saved transcript (.stt or JSON) in other formats without transcribing."""
+    formats, output = _resolve_output(fmt, output, input_file)
+    try:
+        result = load_transcript(input_file)
+    except ValueError as exc:
+        raise click.ClickException(f"Cannot read {input_file}: {exc}") from exc
+    paths = output_paths(output, formats, input_file, result.provider, result.model) if output else {}
+
+    if not paths:
+        sys.stdout.write(render(result, formats[0]))
+        return
+    for fmt_name, path in paths.items():
+        if path.resolve() == input_file.resolve():
+            raise click.UsageError(f"Refusing to overwrite the input file {path} ({fmt_name}).")
+    render_outputs(result, paths)
+    for path in paths.values():
+        click.echo(f"Transcript saved to {path}", err=True)
 
 
 # ── benchmark ────────────────────────────────────────────────────────────────
@@ -164,9 +618,13 @@ def transcribe(
 @click.option("--device", type=click.Choice(["cpu", "cuda", "mps"]), default="cpu",
               show_default=True, help="Compute device for Whisper.")
 @click.option("--config", "config_file", type=click.Path(path_type=Path), default=None,
-              help="Config file path (default: ~/.sttcli.toml).")
+              callback=_apply_config, help="Config file path (default: ~/.sttcli.toml).")
 @click.option("--no-open", is_flag=True, default=False,
               help="Do not open the HTML result in the browser.")
+@click.option("--repeat", type=int, default=1, show_default=True,
+              help="Measured runs per provider, for latency percentiles and confidence intervals.")
+@click.option("--warmup", type=int, default=0, show_default=True,
+              help="Unmeasured runs per provider before --repeat (the first is reported as cold start).")
 def benchmark(
     input_file: Path,
     provider_list: str | None,
@@ -176,10 +634,20 @@ def benchmark(
     device: str,
     config_file: Path | None,
     no_open: bool,
+    repeat: int,
+    warmup: int,
 ):
     """Run all providers on INPUT_FILE and generate an HTML comparison report."""
+    import json
+
+    if repeat < 1:
+        raise click.UsageError("--repeat must be at least 1.")
+    if warmup < 0:
+        raise click.UsageError("--warmup must not be negative.")
+
+    from sttcli.align import agreement_ratio, find_disagreements
     from sttcli.benchmark import ALL_PROVIDERS, parse_provider_spec, run_benchmark
-    from sttcli.formatters.html_compare import generate_comparison_html
+    from sttcli.formatters.html_compare import write_comparison_html
     from sttcli.formatters.markdown import MarkdownFormatter
 
     # Resolve provider specs (supports "provider" or "provider:model")
@@ -201,6 +669,7 @@ def benchmark(
         f"\n🚀 Starting benchmark: {input_file.name}\n"
         f"   Providers : {', '.join(providers)}\n"
         f"   Diarize   : {'off (--no-diarize)' if no_diarize else 'on (where supported)'}\n"
+        f"   Runs      : {warmup} warm-up + {repeat} measured per provider\n"
         f"   Output    : {output_dir}\n",
         err=True,
     )
@@ -213,6 +682,8 @@ def benchmark(
         num_speakers=num_speakers,
         config_file=config_file,
         device=device,
+        repeat=repeat,
+        warmup=warmup,
     )
 
     # Save individual markdown files
@@ -226,10 +697,69 @@ def benchmark(
         out_path.write_text(formatter.format(entry.result), encoding="utf-8")
         click.echo(f"   {out_path.name}", err=True)
 
+    # Align providers on a shared timeline and save the disagreements
+    tracks = {e.label: e.result.segments for e in entries if e.result is not None}
+    spans = find_disagreements(tracks)
+    agreement = agreement_ratio(tracks, spans)
+    diff_path = output_dir / "diff.json"
+    diff_path.write_text(
+        json.dumps(
+            {
+                "providers": list(tracks),
+                "agreement": round(agreement, 4),
+                "spans": [s.to_dict() for s in spans],
+            },
+            ensure_ascii=False,
+        ),
+        encoding="utf-8",
+    )
+    click.echo(f"   {diff_path.name} ({len(spans)} disagreements, {agreement:.1%} agreed)", err=True)
+
+    # Save timing statistics
+    timings_path = output_dir / "benchmark.json"
+    timings_path.write_text(
+        json.dumps(
+            {
+                "input": str(input_file),
+                "repeat": repeat,
+                "warmup": warmup,
+                "providers": [
+                    {
+                        "label": e.label,
+                        "provider": e.provider,
+                        "model": e.result.model if e.result else None,
+                        "diarized": e.diarized,
+                        "error": e.error,
+                        "timings": e.timings.to_dict() if e.timings else None,
+                    }
+                    for e in entries
+                ],
+            },
+            ensure_ascii=False,
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    click.echo(f"   {timings_path.name}", err=True)
+    for e in entries:
+        if e.timings is None or not e.timings.seconds:
+            continue
+        latency, rtf = e.timings.latency, e.timings.rtf
+        interval = ""
+        if latency["ci_low"] is not None:
+            interval = f" [{latency['ci_low']:.2f}, {latency['ci_high']:.2f}]"
+        rtf_text = f", RTF {rtf['median']:.3f}" if rtf["median"] is not None else ""
+        cold = f", cold {e.timings.cold_seconds:.2f}s" if e.timings.cold_seconds is not None else ""
+        click.echo(
+            f"   {e.label}: median {latency['median']:.2f}s{interval}, p90 {latency['p90']:.2f}s, "
+            f"p99 {latency['p99']:.2f}s{rtf_text}{cold}",
+            err=True,
+        )
+
     # Generate HTML comparison
     html_path = output_dir / "comparison.html"
-    html_content = generate_comparison_html(str(input_file), entries)
-    html_path.write_text(html_content, encoding="utf-8")
+    with open(html_path, "w", encoding="utf-8") as fh:
+        write_comparison_html(fh, str(input_file), entries, spans, agreement)
 
     click.echo(f"\n✅ HTML comparison saved to:\n   {html_path}\n", err=True)
 
@@ -238,5 +768,375 @@ def benchmark(
         webbrowser.open(html_path.as_uri())
 
 
+# ── stream ───────────────────────────────────────────────────────────────────
+
+@main.command("stream")
+@click.argument("source", type=click.File("rb"))
+@click.option("-m", "--model", default="turbo", show_default=True, help="Whisper model name.")
+@click.option("-l", "--language", default=None, help="Language code (detected once if omitted).")
+@click.option("--device", type=click.Choice(["cpu", "cuda", "mps"]), default="cpu",
+              show_default=True, help="Compute device for Whisper.")
+@click.option("--raw", is_flag=True, default=False,
+              help="Input is raw s16le mono 16 kHz PCM (skips ffmpeg decoding).")
+@click.option("--input-format", default=None,
+              help="Force the ffmpeg demuxer for containerized input (e.g. mpegts, ogg).")
+@click.option("--step", "step_seconds", type=float, default=2.0, show_default=True,
+              help="Seconds of new audio between decodes (provisional latency).")
+@click.option("--window", "window_seconds", type=float, default=30.0, show_default=True,
+              help="Maximum rolling window in seconds (finalization latency bound, max 30).")
+@click.option("-f", "--format", "fmt", type=click.Choice(["jsonl", "text"]), default="jsonl",
+              show_default=True, help="Output format.")
+@click.option("--no-provisional", is_flag=True, default=False,
+              help="Only emit finalized segments.")
+def stream(
+    source,
+    model: str,
+    language: str | None,
+    device: str,
+    raw: bool,
+    input_format: str | None,
+    step_seconds: float,
+    window_seconds: float,
+    fmt: str,
+    no_provisional: bool,
+):
+    """Transcribe live audio from SOURCE ('-' for stdin) with a rolling window.
+
+    \b
+    Example:
+      ffmpeg -i rtsp://camera/stream -f wav - | sttcli stream -
+    """
+    import json
+
+    from sttcli.providers.whisper_local import load_model
+    from sttcli.streaming import FINALIZE_LAG, StreamTranscriber, iter_pcm
+
+    if step_seconds <= 0 or window_seconds <= step_seconds:
+        raise click.UsageError("--window must be larger than --step, and both positive.")
+    if window_seconds <= FINALIZE_LAG:
+        raise click.UsageError(f"--window must be longer than the {FINALIZE_LAG:g}s finalization lag.")
+
+    click.echo(f"Loading Whisper model '{model}' on {device}...", err=True)
+    whisper_model, lock = load_model(model, device)
+    transcriber = StreamTranscriber(
+        whisper_model, lock,
+        language=language, device=device,
+        window_seconds=window_seconds, step_seconds=step_seconds,
+    )
+
+    def emit(events) -> None:
+        for event in events:
+            if no_provisional and event.kind != "final":
+                continue
+            if fmt == "jsonl":
+                line = json.dumps(event.to_dict(), ensure_ascii=False)
+            else:
+                marker = "" if event.kind == "final" else "… "
+                line = f"{marker}[{_fmt_clock(event.start)} → {_fmt_clock(event.end)}] {event.text}"
+            sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+    # Read in sub-step blocks so decodes fire promptly once a step has arrived.
+    block_seconds = min(0.5, step_seconds)
+    try:
+        for block in iter_pcm(source, block_seconds, raw=raw, input_format=input_format):
+            emit(transcriber.step(block))
+        emit(transcriber.flush())
+    except KeyboardInterrupt:
+        emit(transcriber.flush())
+
+
+def _fmt_clock(seconds: float) -> str:
+    total = int(seconds)
+    h, rem = divmod(total, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
+
+
+# ── index / search ───────────────────────────────────────────────────────────
+
+@main.command("index")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True, path_type=Path))
+@click.option("--db", "db_path", type=click.Path(path_type=Path), default=None,
+              help="Transcript store path (default: [store] path or ~/.sttcli/transcripts.db).")
+@click.option("--force", is_flag=True, default=False,
+              help="Re-index files even if they are unchanged.")
+@click.option("--config", "config_file", type=click.Path(path_type=Path), default=None,
+              callback=_apply_config, help="Config file path (default: ~/.sttcli.toml).")
+def index(paths: tuple[Path, ...], db_path: Path | None, force: bool, config_file: Path | None):
+    """Ingest transcript JSON files (or directories of them) into the search store."""
+    from sttcli.store import TranscriptStore, iter_transcript_files, resolve_store_path
+
+    db_path = resolve_store_path(db_path, config_file)
+    with TranscriptStore(db_path) as store:
+        stats = store.ingest_files(iter_transcript_files(paths), force=force)
+        if stats["indexed"]:
+            store.optimize()
+        totals = store.stats()
+
+    click.echo(
+        f"Indexed {stats['indexed']} file(s), {stats['unchanged']} unchanged, "
+        f"{stats['invalid']} skipped (not transcript JSON).\n"
+        f"Store {db_path}: {totals['transcripts']} transcripts, {totals['segments']} segments.",
+        err=True,
+    )
+
+
+@main.command("search")
+@click.argument("query")
+@click.option("--db", "db_path", type=click.Path(path_type=Path), default=None,
+              help="Transcript store path (default: [store] path or ~/.sttcli/transcripts.db).")
+@click.option("-n", "--limit", type=int, default=20, show_default=True, help="Maximum number of hits.")
+@click.option("--speaker", default=None, help="Only return segments from this speaker.")
+@click.option("--provider", default=None, help="Only return transcripts from this provider.")
+@click.option("--raw", is_flag=True, default=False,
+              help="Pass QUERY through as an FTS5 expression (phrases, OR, NEAR, prefix*).")
+@click.option("--json", "as_json", is_flag=True, default=False, help="Emit one JSON object per hit.")
+@click.option("--config", "config_file", type=click.Path(path_type=Path), default=None,
+              callback=_apply_config, help="Config file path (default: ~/.sttcli.toml).")
+def search(
+    query: str,
+    db_path: Path | None,
+    limit: int,
+    speaker: str | None,
+    provider: str | None,
+    raw: bool,
+    as_json: bool,
+    config_file: Path | None,
+):
+    """Full-text search over indexed transcripts, ranked by relevance."""
+    import json
+    import sqlite3
+
+    from sttcli.store import TranscriptStore, resolve_store_path
+
+    db_path = resolve_store_path(db_path, config_file)
+    if not db_path.exists():
+        raise click.UsageError(f"No transcript store at {db_path}. Run 'sttcli index' first.")
+
+    with TranscriptStore(db_path) as store:
+        try:
+            for hit in store.search(query, limit=limit, speaker=speaker, provider=provider, raw=raw):
+                if as_json:
+                    click.echo(json.dumps(hit.to_dict(), ensure_ascii=False))
+                    continue
+                speaker_str = f" {hit.speaker}" if hit.speaker else ""
+                click.echo(f"{hit.path}  [{hit.start_ms}–{hit.end_ms} ms]{speaker_str}  {hit.snippet}")
+        except sqlite3.OperationalError as exc:
+            raise click.UsageError(f"Invalid search query: {exc}") from exc
+
+
+# ── fake-server / loadtest ───────────────────────────────────────────────────
+
+def _fake_config(latency: str, rtf: float, rate: float, burst: int, max_concurrent: int,
+                 fail_rate: float, drop_rate: float, seed: int | None):
+    from sttcli.fakes import FakeConfig, LatencyModel
+
+    if not 0.0 <= fail_rate + drop_rate <= 1.0:
+        raise click.UsageError("--fail-rate plus --drop-rate must be between 0 and 1.")
+    try:
+        model = LatencyModel.parse(latency)
+    except ValueError as exc:
+        raise click.UsageError(str(exc)) from exc
+    return FakeConfig(
+        latency=model, rtf=rtf, rate=rate, burst=burst, max_concurrent=max_concurrent,
+        fail_rate=fail_rate, drop_rate=drop_rate, seed=seed,
+    )
+
+
+def _fake_options(f):
+    """Options shared by fake-server and loadtest --fake."""
+    for decorator in reversed([
+        click.option("--latency", default="lognormal:0.5,0.4", show_default=True,
+                     help="Latency distribution: fixed:S, uniform:LO,HI, normal:MEAN,STD, "
+                          "lognormal:MEDIAN,SIGMA or exp:MEAN (seconds)."),
+        click.option("--rtf", type=float, default=0.0, show_default=True,
+                     help="Extra latency per second of audio."),
+        click.option("--rate", type=float, default=0.0,
+                     help="Requests per second before answering 429 (default: unlimited)."),
+        click.option("--burst", type=int, default=1, show_default=True, help="Token-bucket size for --rate."),
+        click.option("--max-concurrent", type=int, default=0,
+                     help="In-flight requests before answering 429 (default: unlimited)."),
+        click.option("--fail-rate", type=float, default=0.0, show_default=True,
+                     help="Fraction of requests answered with HTTP 500."),
+        click.option("--drop-rate", type=float, default=0.0, show_default=True,
+                     help="Fraction of connections closed without a reply."),
+        click.option("--seed", type=int, default=None, help="Random seed for reproducible runs."),
+    ]):
+        f = decorator(f)
+    return f
+
+
+@main.command("fake-server")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address to bind.")
+@click.option("--port", type=int, default=8400, show_default=True, help="Port to listen on.")
+@_fake_options
+@click.option("-v", "--verbose", is_flag=True, default=False, help="Log every HTTP request.")
+def fake_server(host: str, port: int, verbose: bool, **fake):
+    """Serve offline stand-ins for the OpenAI, ElevenLabs and Gemini APIs."""
+    from sttcli.config import ENV_BASE_URLS
+    from sttcli.fakes import FakeProviderServer
+
+    httpd = FakeProviderServer((host, port), _fake_config(**fake), verbose=verbose)
+    exports = "\n".join(
+        f"   export {ENV_BASE_URLS[name]}={url}" for name, url in httpd.base_urls().items()
+    )
+    click.echo(f"\n🧪 sttcli fake provider server on {httpd.url}\n{exports}\n", err=True)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        click.echo(f"\nShutting down... {httpd.stats()}", err=True)
+    finally:
+        httpd.server_close()
+
+
+@main.command("loadtest")
+@click.argument("input_files", nargs=-1, required=True,
+                type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("-p", "--provider", "provider_name",
+              type=click.Choice(["openai", "gemini", "elevenlabs", "whisper"]),
+              default="openai", show_default=True, help="Provider to load.")
+@click.option("-m", "--model", default=None, help="Provider model name.")
+@click.option("-n", "--requests", "n_requests", type=int, default=None,
+              help="Total requests, cycling through the files (default: one per file).")
+@click.option("-c", "--concurrency", type=int, default=4, show_default=True,
+              help="Requests in flight at once.")
+@click.option("--api-key", default=None, help="API key (overrides env and config).")
+@click.option("--base-url", default=None, help="API endpoint override (e.g. a fake server).")
+@click.option("--config", "config_file", type=click.Path(path_type=Path), default=None,
+              callback=_apply_config, help="Config file path (default: ~/.sttcli.toml).")
+@click.option("--fake", is_flag=True, default=False,
+              help="Start an in-process fake provider server and load it instead of the real API.")
+@_fake_options
+@click.option("--json", "as_json", is_flag=True, default=False, help="Emit JSON.")
+def loadtest(
+    input_files: tuple[Path, ...],
+    provider_name: str,
+    model: str | None,
+    n_requests: int | None,
+    concurrency: int,
+    api_key: str | None,
+    base_url: str | None,
+    config_file: Path | None,
+    fake: bool,
+    as_json: bool,
+    **fake_options,
+):
+    """Drive N transcriptions at concurrency C and report throughput and latency percentiles."""
+    import json
+
+    from sttcli.loadtest import run_loadtest
+
+    n_requests = n_requests or len(input_files)
+    if n_requests < 1 or concurrency < 1:
+        raise click.UsageError("--requests and --concurrency must be at least 1.")
+    if fake and (base_url or provider_name == "whisper"):
+        raise click.UsageError("--fake replaces the API endpoint; drop --base-url and use an API provider.")
+
+    server = None
+    if fake:
+        from sttcli.fakes import start_fake_server
+
+        server = start_fake_server(_fake_config(**fake_options))
+        base_url = server.base_urls()[provider_name]
+        api_key = api_key or "fake-key"
+
+    provider = get_provider(provider_name)(
+        model=model,
+        api_key=resolve_api_key(provider_name, api_key, config_file),
+        base_url=resolve_base_url(provider_name, base_url, config_file),
+    )
+    click.echo(
+        f"Load testing {provider_name}:{provider.model} with {n_requests} request(s) "
+        f"at concurrency {concurrency}{' against a fake server' if fake else ''}...",
+        err=True,
+    )
+    try:
+        with make_progress() as progress:
+            step = StepProgress(progress, "Load test", total=100)
+            report = run_loadtest(provider, list(input_files), n_requests, concurrency, step)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    summary = report.to_dict()
+    if as_json:
+        click.echo(json.dumps(summary, ensure_ascii=False, indent=2))
+        return
+
+    lat = summary["latency_seconds"]
+
+    def fmt(value):
+        return f"{value:.3f}s" if value is not None else "-"
+
+    click.echo(
+        f"\n{summary['succeeded']}/{summary['requests']} succeeded in {summary['wall_seconds']:.1f}s "
+        f"— {summary['requests_per_second']:.2f} req/s, "
+        f"{summary['audio_seconds_per_second']:.1f} audio s/s"
+    )
+    click.echo("latency  " + "  ".join(f"{k} {fmt(v)}" for k, v in lat.items()))
+    for error, count in summary["errors"].items():
+        click.echo(f"  {count:>5} × {error}")
+
+
+# ── serve ────────────────────────────────────────────────────────────────────
+
+@main.command("serve")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address to bind.")
+@click.option("--port", type=int, default=8765, show_default=True, help="Port to listen on.")
+@click.option("-w", "--workers", type=int, default=0,
+              help="Worker threads (default: sized from CPU cores; jobs are admitted "
+                   "as memory and cores allow either way).")
+@click.option("--device", type=click.Choice(["cpu", "cuda", "mps"]), default="cpu",
+              show_default=True, help="Default compute device for Whisper.")
+@click.option("--preload", "preload_models", multiple=True,
+              help="Whisper model to load at startup (repeatable), e.g. --preload turbo.")
+@click.option("--config", "config_file", type=click.Path(path_type=Path), default=None,
+              callback=_apply_config, help="Config file path (default: ~/.sttcli.toml).")
+@click.option("-v", "--verbose", is_flag=True, default=False, help="Log every HTTP request.")
+def serve(
+    host: str,
+    port: int,
+    workers: int,
+    device: str,
+    preload_models: tuple[str, ...],
+    config_file: Path | None,
+    verbose: bool,
+):
+    """Run a local HTTP job server backed by a shared worker pool."""
+    from sttcli.server import JobManager, TranscriptionServer
+
+    if workers < 0:
+        raise click.UsageError("--workers must not be negative.")
+
+    manager = JobManager(workers=workers, device=device, config_file=config_file)
+
+    if preload_models:
+        from sttcli.providers.whisper_local import DEFAULT_ENGINE, load_model
+
+        # Load with the thread count jobs will ask for, so they reuse these models.
+        threads = manager.scheduler.whisper_threads if device == "cpu" else 0
+        for name in preload_models:
+            click.echo(f"Loading Whisper model '{name}' on {device}...", err=True)
+            load_model(name, device, DEFAULT_ENGINE, "default", threads)
+    httpd = TranscriptionServer((host, port), manager, verbose=verbose)
+
+    click.echo(
+        f"\n🛰  sttcli server listening on http://{host}:{port}\n"
+        f"   Workers : {manager.workers} ({manager.scheduler.resources.cpus} CPUs, "
+        f"{manager.scheduler.memory_budget / 1024**3:.1f} GB budget)\n"
+        f"   Device  : {device}\n",
+        err=True,
+    )
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        click.echo("\nShutting down...", err=True)
+    finally:
+        httpd.server_close()
+        manager.shutdown()
+
+
 if __name__ == "__main__":
     main()
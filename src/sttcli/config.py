@@ -15,6 +15,13 @@ ENV_KEYS = {
     "elevenlabs": "ELEVENLABS_API_KEY",
 }
 
+# Endpoint overrides, e.g. to point a provider at `sttcli fake-server`
+ENV_BASE_URLS = {
+    "openai": "OPENAI_BASE_URL",
+    "gemini": "GEMINI_BASE_URL",
+    "elevenlabs": "ELEVENLABS_BASE_URL",
+}
+
 
 def load_config(config_path: Path | None = None) -> dict:
     path = config_path or DEFAULT_CONFIG_PATH
@@ -36,3 +43,18 @@ def resolve_api_key(provider: str, cli_key: str | None = None, config_path: Path
 
     config = load_config(config_path)
     return config.get(provider, {}).get("api_key")
+
+
+def resolve_base_url(provider: str, cli_url: str | None = None, config_path: Path | None = None) -> str | None:
+    """API endpoint for provider: CLI value, then env, then [<provider>] base_url; None is the SDK default."""
+    if cli_url:
+        return cli_url
+
+    env_var = ENV_BASE_URLS.get(provider)
+    if env_var:
+        env_val = os.environ.get(env_var)
+        if env_val:
+            return env_val
+
+    config = load_config(config_path)
+    return config.get(provider, {}).get("base_url")
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+import numpy as np
+
+from sttcli.models import Segment
+from sttcli.pcm import SAMPLE_RATE, open_pcm
+
+FRAME_LENGTH = 400      # 25 ms
+HOP_LENGTH = 160        # 10 ms
+N_FFT = 512
+N_MELS = 40
+N_MFCC = 20             # c0 (loudness) is dropped, leaving 19 coefficients
+
+# Frames quieter than this many dB below a segment's loudest frame are ignored
+SILENCE_DB = 35.0
+
+# Segments shorter than this are too noisy to cluster; they are labelled
+# with the nearest cluster afterwards.
+MIN_CLUSTER_SECONDS = 1.0
+MIN_FRAMES = 10
+
+# Average-linkage distance (in within-segment frame standard deviations) at
+# which clusters stop merging when the number of speakers is not given.
+DISTANCE_THRESHOLD = 0.6
+
+
+@lru_cache(maxsize=1)
+def _mel_dct() -> tuple[np.ndarray, np.ndarray]:
+    """Return the (N_FFT//2+1, N_MELS) mel filterbank and (N_MELS, N_MFCC-1) DCT matrix."""
+    def hz_to_mel(f):
+        return 2595.0 * np.log10(1.0 + f / 700.0)
+
+    def mel_to_hz(m):
+        return 700.0 * (10.0 ** (m / 2595.0) - 1.0)
+
+    n_bins = N_FFT // 2 + 1
+    freqs = np.linspace(0, SAMPLE_RATE / 2, n_bins)
+    edges = mel_to_hz(np.linspace(hz_to_mel(60.0), hz_to_mel(7600.0), N_MELS + 2))
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (freqs - lower) / (center - lower)
+    falling = (upper - freqs) / (upper - center)
+    fbank = np.maximum(0.0, np.minimum(rising, falling)).T.astype(np.float32)
+
+    n = np.arange(N_MELS)
+    k = np.arange(1, N_MFCC)
+    dct = np.cos(np.pi * k[None, :] * (2 * n[:, None] + 1) / (2 * N_MELS)).astype(np.float32)
+    return fbank, dct * np.sqrt(2.0 / N_MELS)
+
+
+def _mfcc(audio: np.ndarray) -> np.ndarray:
+    """Return MFCCs of the non-silent frames of audio, shape (frames, N_MFCC-1)."""
+    if len(audio) < FRAME_LENGTH:
+        return np.zeros((0, N_MFCC - 1), dtype=np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(audio, FRAME_LENGTH)[::HOP_LENGTH]
+    frames = frames * np.hamming(FRAME_LENGTH).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames, n=N_FFT)) ** 2
+
+    fbank, dct = _mel_dct()
+    log_mel = np.log10(power @ fbank + 1e-10)
+    energy = 10.0 * log_mel.max(axis=1)
+    voiced = log_mel[energy > energy.max() - SILENCE_DB]
+    return voiced @ dct
+
+
+def segment_features(audio_path: str, segments: list[Segment]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return per-segment MFCC means, variances and frame counts.
+
+    Segments with too little audio get a frame count of zero.
+    """
+    pcm = open_pcm(audio_path)
+    means = np.zeros((len(segments), N_MFCC - 1), dtype=np.float32)
+    variances = np.zeros_like(means)
+    frames = np.zeros(len(segments), dtype=np.int64)
+    for i, seg in enumerate(segments):
+        feats = _mfcc(pcm.slice(seg.start, seg.end))
+        if len(feats) < MIN_FRAMES:
+            continue
+        means[i] = feats.mean(axis=0)
+        variances[i] = feats.var(axis=0)
+        frames[i] = len(feats)
+    return means, variances, frames
+
+
+def _normalize(means: np.ndarray, variances: np.ndarray, frames: np.ndarray) -> np.ndarray:
+    """Center segment means and scale them by the pooled within-segment frame std.
+
+    Distances then measure how far apart two segments sound relative to how
+    much a single voice varies, which keeps one threshold usable across
+    recordings and still lets a single-speaker file stay one cluster.
+    """
+    w = frames[:, None].astype(np.float64)
+    center = (means * w).sum(axis=0) / w.sum()
+    pooled = np.sqrt((variances * w).sum(axis=0) / w.sum())
+    return ((means - center) / np.where(pooled > 0, pooled, 1.0)).astype(np.float32)
+
+
+def _distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """RMS (per-dimension) Euclidean distance between the rows of a and b."""
+    sq = (a * a).sum(axis=1)[:, None] + (b * b).sum(axis=1)[None, :] - 2.0 * (a @ b.T)
+    return np.sqrt(np.maximum(sq, 0.0) / a.shape[1])
+
+
+def cluster(
+    emb: np.ndarray,
+    num_clusters: int | None = None,
+    threshold: float = DISTANCE_THRESHOLD,
+) -> np.ndarray:
+    """Average-linkage agglomerative clustering of normalized segment features.
+
+    Merges until num_clusters remain or, if that is None, until the closest
+    pair is farther apart than threshold. Each row's nearest neighbour is
+    cached and only rows that pointed at a merged cluster are refreshed, so
+    a merge costs O(n) instead of a full O(n²) scan.
+    """
+    n = len(emb)
+    labels = np.arange(n)
+    if n < 2:
+        return labels
+
+    dist = _distances(emb, emb).astype(np.float32)
+    np.fill_diagonal(dist, np.inf)
+    sizes = np.ones(n, dtype=np.float32)
+    active = np.ones(n, dtype=bool)
+    nn = dist.argmin(axis=1)
+    nn_dist = dist[np.arange(n), nn]
+
+    remaining = n
+    target = max(1, num_clusters or 1)
+    while remaining > target:
+        i = int(nn_dist.argmin())
+        if num_clusters is None and nn_dist[i] > threshold:
+            break
+        j = int(nn[i])
+
+        merged = (sizes[i] * dist[i] + sizes[j] * dist[j]) / (sizes[i] + sizes[j])
+        dist[i], dist[:, i] = merged, merged
+        dist[i, i] = np.inf
+        dist[j], dist[:, j] = np.inf, np.inf
+        sizes[i] += sizes[j]
+        active[j] = False
+        nn_dist[j] = np.inf
+        labels[labels == j] = i
+        remaining -= 1
+
+        stale = np.flatnonzero(active & ((nn == i) | (nn == j)))
+        stale = np.union1d(stale, [i])
+        nn[stale] = dist[stale].argmin(axis=1)
+        nn_dist[stale] = dist[stale, nn[stale]]
+
+    return labels
+
+
+def diarize_segments(
+    audio_path: str,
+    segments: list[Segment],
+    num_speakers: int | None = None,
+) -> int:
+    """Assign Segment.speaker ("speaker_0", ...) by clustering voice features.
+
+    Works on any provider's segments using the decoded PCM cache. Returns the
+    number of speakers found.
+    """
+    if not segments:
+        return 0
+    means, variances, frames = segment_features(audio_path, segments)
+    usable = frames > 0
+    if not usable.any():
+        for seg in segments:
+            seg.speaker = "speaker_0"
+        return 1
+
+    emb = np.zeros_like(means)
+    emb[usable] = _normalize(means[usable], variances[usable], frames[usable])
+    durations = np.array([s.end - s.start for s in segments])
+    core = usable & (durations >= MIN_CLUSTER_SECONDS)
+    if core.sum() < 2:
+        core = usable
+    core_idx = np.flatnonzero(core)
+    core_labels = cluster(emb[core_idx], num_speakers)
+
+    # Label the remaining usable segments with the nearest cluster centroid.
+    ids = np.unique(core_labels)
+    centroids = np.stack([emb[core_idx[core_labels == c]].mean(axis=0) for c in ids])
+    labels = np.full(len(segments), -1)
+    labels[core_idx] = np.searchsorted(ids, core_labels)
+    rest = np.flatnonzero(usable & ~core)
+    if len(rest):
+        labels[rest] = _distances(emb[rest], centroids).argmin(axis=1)
+
+    # Segments without usable audio inherit the previous (else next) label.
+    order = np.argsort([s.start for s in segments], kind="stable")
+    last = -1
+    for k in order:
+        if labels[k] >= 0:
+            last = labels[k]
+        elif last >= 0:
+            labels[k] = last
+    for k in order[::-1]:
+        if labels[k] >= 0:
+            last = labels[k]
+        else:
+            labels[k] = last
+
+    # Number speakers in order of first appearance.
+    names: dict[int, str] = {}
+    for k in order:
+        label = int(labels[k])
+        if label not in names:
+            names[label] = f"speaker_{len(names)}"
+        segments[k].speaker = names[label]
+    return len(names)
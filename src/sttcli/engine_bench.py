@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import multiprocessing
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from sttcli.align import normalize_word
+
+
+@dataclass
+class EngineRun:
+    file: str
+    audio_seconds: float
+    seconds: float
+    segments: int
+    text: str
+
+    @property
+    def rtf(self) -> float:
+        return self.seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+
+@dataclass
+class EngineReport:
+    spec: str                       # e.g. "faster-whisper:int8"
+    load_seconds: float = 0.0
+    peak_rss_mb: float | None = None
+    runs: list[EngineRun] = field(default_factory=list)
+    agreement: float | None = None  # word agreement with the first engine
+    error: str | None = None
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(r.seconds for r in self.runs)
+
+    @property
+    def rtf(self) -> float:
+        audio = sum(r.audio_seconds for r in self.runs)
+        return self.total_seconds / audio if audio else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "spec": self.spec,
+            "load_seconds": round(self.load_seconds, 3),
+            "transcribe_seconds": round(self.total_seconds, 3),
+            "rtf": round(self.rtf, 4),
+            "peak_rss_mb": round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+            "agreement": round(self.agreement, 4) if self.agreement is not None else None,
+            "error": self.error,
+            "runs": [
+                {k: v for k, v in asdict(r).items() if k != "text"} | {"rtf": round(r.rtf, 4)}
+                for r in self.runs
+            ],
+        }
+
+
+def parse_engine_spec(spec: str) -> tuple[str, str]:
+    """"faster-whisper:int8" → ("faster-whisper", "int8"); the compute type defaults to "default"."""
+    engine, _, compute_type = spec.partition(":")
+    return engine.strip(), compute_type.strip() or "default"
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024**2 if sys.platform == "darwin" else 1024)
+
+
+def _run_engine(spec: str, files: list[str], model: str, device: str, threads: int, language: str | None, conn) -> None:
+    """Child process body: one fresh process per engine keeps peak memory separate."""
+    from sttcli.pcm import open_pcm
+    from sttcli.progress import NullStepProgress
+    from sttcli.providers.whisper_local import WhisperProvider, load_model
+
+    report = EngineReport(spec)
+    try:
+        engine, compute_type = parse_engine_spec(spec)
+        start = time.perf_counter()
+        load_model(model, device, engine, compute_type, threads)
+        report.load_seconds = time.perf_counter() - start
+
+        provider = WhisperProvider(
+            model=model, language=language, device=device,
+            engine=engine, compute_type=compute_type, threads=threads,
+        )
+        for path in files:
+            audio_seconds = open_pcm(path).duration     # decode outside the timed region
+            start = time.perf_counter()
+            result = provider.transcribe(Path(path), NullStepProgress())
+            elapsed = time.perf_counter() - start
+            report.runs.append(EngineRun(
+                file=path,
+                audio_seconds=audio_seconds,
+                seconds=elapsed,
+                segments=len(result.segments),
+                text=" ".join(seg.text for seg in result.segments),
+            ))
+    except Exception as exc:
+        report.error = str(exc)
+    report.peak_rss_mb = _peak_rss_mb()
+    conn.send(report)
+    conn.close()
+
+
+def _agreement(reference: list[EngineRun], runs: list[EngineRun]) -> float | None:
+    """Fraction of matching words (difflib ratio) against the reference engine's text."""
+    ratios = []
+    for ref, run in zip(reference, runs):
+        a = [w for w in map(normalize_word, ref.text.split()) if w]
+        b = [w for w in map(normalize_word, run.text.split()) if w]
+        if a or b:
+            ratios.append(SequenceMatcher(None, a, b, autojunk=False).ratio())
+    return sum(ratios) / len(ratios) if ratios else None
+
+
+def run_engine_benchmark(
+    specs: list[str],
+    files: list[Path],
+    model: str,
+    device: str = "cpu",
+    threads: int = 0,
+    language: str | None = None,
+) -> list[EngineReport]:
+    """Transcribe the same files with each engine spec, one subprocess per engine."""
+    ctx = multiprocessing.get_context("spawn")
+    reports: list[EngineReport] = []
+    for spec in specs:
+        recv, send = ctx.Pipe(duplex=False)
+        proc = ctx.Process(
+            target=_run_engine,
+            args=(spec, [str(f) for f in files], model, device, threads, language, send),
+        )
+        proc.start()
+        send.close()
+        try:
+            report = recv.recv()
+        except EOFError:
+            proc.join()
+            report = EngineReport(spec, error=f"engine process exited with code {proc.exitcode}")
+        proc.join()
+        reports.append(report)
+
+    baseline = next((r for r in reports if r.error is None), None)
+    if baseline is not None:
+        for report in reports:
+            if report.error is None and report is not baseline:
+                report.agreement = _agreement(baseline.runs, report.runs)
+    return reports
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Callable
+
+from sttcli.align import TimedWord, bucket_words, sweep_windows, timed_words
+from sttcli.models import TranscriptResult, Word
+from sttcli.progress import StepProgress
+from sttcli.providers.base import BaseProvider
+from sttcli.segmenting import group_words
+
+# ROVER score: ALPHA * vote share + (1 - ALPHA) * mean confidence
+ALPHA = 0.6
+
+# Confidence of a "no word here" vote
+NULL_CONFIDENCE = 0.4
+
+# Confidence assumed for providers that do not report one
+DEFAULT_CONFIDENCE = 0.7
+
+
+@dataclass
+class _Slot:
+    # provider label → (vote key, words); key None means "no word"
+    votes: dict[str, tuple[str | None, list[TimedWord]]] = field(default_factory=dict)
+    pivot_word: TimedWord | None = None     # timing anchor for substitutions
+
+
+def _confidence(words: list[TimedWord]) -> float:
+    confs = [w.confidence for w in words if w.confidence is not None]
+    return sum(confs) / len(confs) if confs else DEFAULT_CONFIDENCE
+
+
+def _vote(slot: _Slot, weights: dict[str, float], pivot: str) -> list[Word]:
+    """Pick the best-scoring candidate for one slot of the word transition network."""
+    total_weight = sum(weights[label] for label in slot.votes) or 1.0
+    support: dict[str | None, float] = Counter()
+    confs: dict[str | None, list[float]] = {}
+    for label, (key, words) in slot.votes.items():
+        support[key] += weights[label]
+        confs.setdefault(key, []).append(_confidence(words) if key is not None else NULL_CONFIDENCE)
+
+    def score(key: str | None) -> tuple[float, bool]:
+        share = support[key] / total_weight
+        conf = sum(confs[key]) / len(confs[key])
+        # Ties go to the pivot's hypothesis
+        return ALPHA * share + (1 - ALPHA) * conf, slot.votes.get(pivot, (None,))[0] == key
+
+    best = max(support, key=score)
+    if best is None:
+        return []
+
+    voters = [(label, words) for label, (key, words) in slot.votes.items() if key == best]
+    # Prefer the pivot's spelling and timing, else the most confident voter's.
+    label, words = max(voters, key=lambda v: (v[0] == pivot, _confidence(v[1])))
+    if label != pivot and slot.pivot_word is not None and len(words) == 1:
+        anchor = slot.pivot_word
+        return [Word(anchor.start, anchor.end, words[0].text, words[0].confidence)]
+    return [Word(w.start, w.end, w.text, w.confidence) for w in words]
+
+
+def _window_slots(window: dict[str, list[TimedWord]], pivot: str) -> list[_Slot]:
+    """Align every hypothesis to the pivot and lay out slots in time order.
+
+    Slot 2i is an insertion slot before pivot word i; slot 2i+1 is pivot word i.
+    """
+    pivot_words = window[pivot]
+    n = len(pivot_words)
+    slots = [_Slot() for _ in range(2 * n + 1)]
+    for i, w in enumerate(pivot_words):
+        slots[2 * i + 1].votes[pivot] = (w.norm, [w])
+        slots[2 * i + 1].pivot_word = w
+
+    ref = [w.norm for w in pivot_words]
+    for label, words in window.items():
+        if label == pivot:
+            continue
+        aligned: list[TimedWord | None] = [None] * n
+        inserted: list[list[TimedWord]] = [[] for _ in range(n + 1)]
+        ops = SequenceMatcher(None, ref, [w.norm for w in words], autojunk=False).get_opcodes()
+        for tag, i1, i2, j1, j2 in ops:
+            if tag == "insert":
+                inserted[i1].extend(words[j1:j2])
+                continue
+            if tag == "delete":
+                continue
+            paired = min(i2 - i1, j2 - j1)
+            for t in range(paired):
+                aligned[i1 + t] = words[j1 + t]
+            inserted[i2].extend(words[j1 + paired:j2])
+
+        for i in range(n):
+            w = aligned[i]
+            slots[2 * i + 1].votes[label] = (w.norm, [w]) if w is not None else (None, [])
+        for i, extra in enumerate(inserted):
+            if extra:
+                slots[2 * i].votes[label] = (" ".join(w.norm for w in extra), extra)
+
+    # Providers that inserted nothing in an insertion slot vote "no word".
+    for i in range(0, len(slots), 2):
+        if slots[i].votes:
+            for label in window:
+                slots[i].votes.setdefault(label, (None, []))
+    return slots
+
+
+def rover_merge(
+    results: dict[str, TranscriptResult],
+    weights: dict[str, float] | None = None,
+    pivot: str | None = None,
+) -> list[Word]:
+    """Merge transcripts by ROVER-style confidence-weighted word voting.
+
+    Words from all providers are placed on a shared timeline (see
+    sttcli.align), aligned to a pivot provider inside each window and voted
+    slot by slot. The pivot should be a provider with real word timestamps:
+    every kept word takes its timing from the pivot where one exists.
+    """
+    labels = list(results)
+    weights = {label: (weights or {}).get(label, 1.0) for label in labels}
+    pivot = pivot or labels[0]
+
+    ends = sweep_windows([r.segments for r in results.values()])
+    if not ends:
+        return []
+    buckets = {label: bucket_words(timed_words(r.segments), ends) for label, r in results.items()}
+
+    merged: list[Word] = []
+    for w in range(len(ends)):
+        window = {label: b[w] for label, b in buckets.items()}
+        if not window[pivot]:
+            # Pivot heard nothing here: let the other providers vote among
+            # themselves, using the one with the most words as the pivot.
+            local_pivot = max(window, key=lambda label: len(window[label]))
+        else:
+            local_pivot = pivot
+        if not window[local_pivot]:
+            continue
+        for slot in _window_slots(window, local_pivot):
+            if slot.votes:
+                merged.extend(_vote(slot, weights, local_pivot))
+    return merged
+
+
+def _has_word_timing(result: TranscriptResult) -> bool:
+    return any(seg.words for seg in result.segments)
+
+
+def run_ensemble(
+    providers: list[BaseProvider],
+    audio_path: Path,
+    step_factory: Callable[[str], StepProgress],
+    weights: dict[str, float] | None = None,
+) -> TranscriptResult:
+    """Transcribe with every provider concurrently and merge the outputs.
+
+    Providers that fail are left out of the vote; the run fails only if all
+    of them do. The merge is linear in the number of words, so overall
+    latency is set by the slowest provider.
+    """
+    for provider in providers:
+        provider.word_timestamps = True
+
+    labels = [f"{p.provider_name}:{p.model}" for p in providers]
+    steps = {label: step_factory(label) for label in labels}
+
+    def run(item: tuple[str, BaseProvider]) -> TranscriptResult:
+        label, provider = item
+        return provider.transcribe(audio_path, steps[label])
+
+    results: dict[str, TranscriptResult] = {}
+    errors: dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=len(providers)) as pool:
+        futures = {label: pool.submit(run, (label, p)) for label, p in zip(labels, providers)}
+        for label, future in futures.items():
+            try:
+                results[label] = future.result()
+            except Exception as exc:
+                errors[label] = str(exc)
+                steps[label].advance_to(100, f"[{label}] failed: {exc}")
+
+    if not results:
+        raise RuntimeError(
+            "All ensemble providers failed: "
+            + "; ".join(f"{label}: {err}" for label, err in errors.items())
+        )
+
+    # Timing comes from the first listed provider with word-level timestamps.
+    pivot = next((label for label in results if _has_word_timing(results[label])), next(iter(results)))
+    words = rover_merge(results, weights, pivot=pivot)
+    segments = group_words(words, keep_words=True)
+
+    languages = Counter(r.language for r in results.values() if r.language)
+    return TranscriptResult(
+        segments=segments,
+        language=languages.most_common(1)[0][0] if languages else "",
+        duration=segments[-1].end if segments else 0.0,
+        provider="ensemble",
+        model="rover(" + ",".join(results) + ")",
+        source_file=str(audio_path),
+    )
@@ -0,0 +1,425 @@
+"""Local stand-ins for the OpenAI, ElevenLabs and Gemini transcription APIs.
+
+One server answers all three request shapes the providers use, so a run can
+be pointed at it through base-URL settings (see config.resolve_base_url):
+
+    OPENAI_BASE_URL=http://127.0.0.1:8400/v1
+    ELEVENLABS_BASE_URL=http://127.0.0.1:8400
+    GEMINI_BASE_URL=http://127.0.0.1:8400
+
+Transcripts are synthetic; their length follows the uploaded size as if it
+were 16 kHz mono PCM. Response latency, throttling and failures are drawn
+from a FakeConfig so load tests see realistic, reproducible behaviour.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Uploaded bytes per second of audio assumed for synthetic transcripts
+BYTES_PER_SECOND = 32000
+
+SEGMENT_SECONDS = 5.0
+WORDS_PER_SECOND = 2.0
+_VOCABULARY = (
+    "the quick brown fox jumps over a lazy dog while seven people "
+    "talk about weather plans coffee and the next meeting"
+).split()
+
+LATENCY_KINDS = ("fixed", "uniform", "normal", "lognormal", "exp")
+
+
+@dataclass
+class LatencyModel:
+    """A latency distribution in seconds, parsed from specs such as "lognormal:0.5,0.4".
+
+    fixed:S, uniform:LO,HI, normal:MEAN,STD, lognormal:MEDIAN,SIGMA, exp:MEAN.
+    """
+
+    kind: str = "fixed"
+    params: tuple[float, ...] = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, rest = spec.partition(":")
+        kind = kind.strip().lower()
+        if kind not in LATENCY_KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind} (choose from {', '.join(LATENCY_KINDS)})")
+        try:
+            params = tuple(float(p) for p in rest.split(",") if p.strip())
+        except ValueError as exc:
+            raise ValueError(f"Invalid latency spec: {spec}") from exc
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exp": 1}[kind]
+        if len(params) != expected or any(p < 0 for p in params):
+            raise ValueError(f"{kind} latency takes {expected} non-negative value(s): {spec}")
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            value = p[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            value = rng.gauss(p[0], p[1])
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(math.log(p[0]), p[1]) if p[0] > 0 else 0.0
+        else:
+            value = rng.expovariate(1.0 / p[0]) if p[0] > 0 else 0.0
+        return max(0.0, value)
+
+
+@dataclass
+class FakeConfig:
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    rtf: float = 0.0                # extra latency per second of (synthetic) audio
+    rate: float = 0.0               # transcription requests per second; 0 = unlimited
+    burst: int = 1                  # token-bucket size for rate
+    max_concurrent: int = 0         # in-flight transcriptions; 0 = unlimited
+    fail_rate: float = 0.0          # fraction answered with HTTP 500
+    drop_rate: float = 0.0          # fraction whose connection is closed without a reply
+    language: str = "en"
+    seed: int | None = None
+
+
+class _Throttle:
+    """Token bucket plus a concurrency cap; admit() never blocks."""
+
+    def __init__(self, rate: float, burst: int, max_concurrent: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_concurrent = max_concurrent
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def admit(self) -> float | None:
+        """Return None when admitted, else the seconds to suggest in Retry-After."""
+        with self._lock:
+            if self.max_concurrent and self._in_flight >= self.max_concurrent:
+                return 1.0
+            if self.rate > 0:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens < 1.0:
+                    return (1.0 - self._tokens) / self.rate
+                self._tokens -= 1.0
+            self._in_flight += 1
+            return None
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+
+def synthetic_words(duration: float, rng: random.Random) -> list[dict]:
+    """Evenly paced words covering duration seconds."""
+    n = max(1, int(duration * WORDS_PER_SECOND))
+    step = duration / n
+    return [
+        {
+            "text": rng.choice(_VOCABULARY),
+            "start": round(i * step, 3),
+            "end": round(i * step + step * 0.8, 3),
+            "logprob": round(-rng.random() * 0.3, 4),
+        }
+        for i in range(n)
+    ]
+
+
+def synthetic_segments(words: list[dict]) -> list[dict]:
+    segments: list[dict] = []
+    for w in words:
+        if not segments or w["start"] >= segments[-1]["start"] + SEGMENT_SECONDS:
+            segments.append({"start": w["start"], "end": w["end"], "words": []})
+        seg = segments[-1]
+        seg["end"] = w["end"]
+        seg["words"].append(w)
+    for seg in segments:
+        text = " ".join(w["text"] for w in seg["words"])
+        seg["text"] = text[:1].upper() + text[1:] + "."
+    return segments
+
+
+def _mmss(seconds: float) -> str:
+    return f"{int(seconds) // 60:02d}:{int(seconds) % 60:02d}"
+
+
+# ── HTTP layer ───────────────────────────────────────────────────────────────
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FakeProviderServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002 - signature from BaseHTTPRequestHandler
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # ── Helpers ──
+
+    def _read_body(self) -> bytes:
+        if "chunked" in (self.headers.get("Transfer-Encoding") or "").lower():
+            parts = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                parts.append(self.rfile.read(size))
+                self.rfile.readline()
+            return b"".join(parts)
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _send_json(self, status: int, payload: dict, headers: dict | None = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _provider_error(self, provider: str, status: int, message: str, headers: dict | None = None) -> None:
+        if provider == "elevenlabs":
+            payload = {"detail": {"status": HTTPStatus(status).phrase.lower().replace(" ", "_"), "message": message}}
+        elif provider == "gemini":
+            payload = {"error": {"code": status, "message": message, "status": HTTPStatus(status).name}}
+        else:
+            payload = {"error": {"message": message, "type": "server_error", "code": status}}
+        self._send_json(status, payload, headers)
+
+    def _transcribe(self, provider: str, audio_bytes: int, respond) -> None:
+        """Apply throttling, failure injection and latency around respond(duration)."""
+        fake = self.server
+        retry_after = fake.throttle.admit()
+        if retry_after is not None:
+            fake.count("throttled")
+            return self._provider_error(
+                provider, HTTPStatus.TOO_MANY_REQUESTS, "Rate limit exceeded (fake server)",
+                {"Retry-After": f"{max(1, math.ceil(retry_after))}"},
+            )
+        try:
+            roll, delay = fake.draw()
+            duration = max(1.0, audio_bytes / BYTES_PER_SECOND)
+            time.sleep(delay + fake.config.rtf * duration)
+            if roll < fake.config.drop_rate:
+                fake.count("dropped")
+                self.close_connection = True
+                return
+            if roll < fake.config.drop_rate + fake.config.fail_rate:
+                fake.count("failed")
+                return self._provider_error(provider, HTTPStatus.INTERNAL_SERVER_ERROR, "Injected failure (fake server)")
+            fake.count("ok")
+            respond(duration)
+        finally:
+            fake.throttle.release()
+
+    # ── Routing ──
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if parts == ["_fake", "stats"]:
+            return self._send_json(HTTPStatus.OK, self.server.stats())
+        if len(parts) == 3 and parts[:2] == ["v1beta", "files"]:
+            info = self.server.files.get(parts[2])
+            if info is None:
+                return self._provider_error("gemini", HTTPStatus.NOT_FOUND, f"File {parts[2]} not found")
+            return self._send_json(HTTPStatus.OK, info)
+        self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No route for GET {url.path}"})
+
+    def do_DELETE(self):
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        if len(parts) == 3 and parts[:2] == ["v1beta", "files"]:
+            self.server.files.pop(parts[2], None)
+            return self._send_json(HTTPStatus.OK, {})
+        self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No route for DELETE {self.path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        path = url.path.rstrip("/")
+        body = self._read_body()
+        self.server.count("requests")
+
+        if path == "/v1/audio/transcriptions":
+            return self._transcribe("openai", len(body), self._openai_response)
+        if path == "/v1/speech-to-text":
+            return self._transcribe("elevenlabs", len(body), self._elevenlabs_response)
+        if path == "/upload/v1beta/files":
+            return self._gemini_upload(url, body)
+        if path.startswith("/v1beta/models/") and path.endswith(":generateContent"):
+            return self._gemini_generate(body)
+        self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No route for POST {url.path}"})
+
+    # ── OpenAI ──
+
+    def _openai_response(self, duration: float) -> None:
+        words = synthetic_words(duration, self.server.rng())
+        segments = synthetic_segments(words)
+        self._send_json(HTTPStatus.OK, {
+            "task": "transcribe",
+            "language": self.server.config.language,
+            "duration": duration,
+            "text": " ".join(s["text"] for s in segments),
+            "segments": [
+                {
+                    "id": i, "seek": 0, "start": s["start"], "end": s["end"], "text": " " + s["text"],
+                    "tokens": [], "temperature": 0.0, "avg_logprob": -0.2,
+                    "compression_ratio": 1.2, "no_speech_prob": 0.01,
+                }
+                for i, s in enumerate(segments)
+            ],
+            "words": [{"word": w["text"], "start": w["start"], "end": w["end"]} for w in words],
+        })
+
+    # ── ElevenLabs ──
+
+    def _elevenlabs_response(self, duration: float) -> None:
+        words = synthetic_words(duration, self.server.rng())
+        for seg in synthetic_segments(words):
+            seg["words"][-1]["text"] += "."
+        self._send_json(HTTPStatus.OK, {
+            "language_code": self.server.config.language,
+            "language_probability": 0.99,
+            "text": " ".join(w["text"] for w in words),
+            "words": [
+                {
+                    "text": w["text"], "start": w["start"], "end": w["end"], "type": "word",
+                    "speaker_id": f"speaker_{int(w['start'] // 30) % 2}", "logprob": w["logprob"],
+                }
+                for w in words
+            ],
+        })
+
+    # ── Gemini (resumable upload, then generateContent on the file URI) ──
+
+    def _gemini_upload(self, url, body: bytes) -> None:
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        command = (self.headers.get("X-Goog-Upload-Command") or "").lower()
+        files = self.server.files
+        if "start" in command:
+            file_id = uuid.uuid4().hex[:12]
+            try:
+                meta = json.loads(body or b"{}").get("file", {})
+            except json.JSONDecodeError:
+                meta = {}
+            files[file_id] = {
+                "name": f"files/{file_id}",
+                "mimeType": meta.get("mimeType") or self.headers.get("X-Goog-Upload-Header-Content-Type") or "audio/wav",
+                "sizeBytes": "0",
+                "state": "PROCESSING",
+            }
+            host = self.headers.get("Host") or f"{self.server.server_address[0]}:{self.server.server_address[1]}"
+            return self._send_json(HTTPStatus.OK, {}, {
+                "X-Goog-Upload-URL": f"http://{host}/upload/v1beta/files?upload_id={file_id}",
+                "X-Goog-Upload-Status": "active",
+            })
+
+        info = files.get(query.get("upload_id", ""))
+        if info is None:
+            return self._provider_error("gemini", HTTPStatus.NOT_FOUND, "Unknown upload session")
+        info["sizeBytes"] = str(int(info["sizeBytes"]) + len(body))
+        if "finalize" not in command:
+            return self._send_json(HTTPStatus.OK, {}, {"X-Goog-Upload-Status": "active"})
+        host = self.headers.get("Host") or "localhost"
+        info["state"] = "ACTIVE"
+        info["uri"] = f"http://{host}/v1beta/{info['name']}"
+        self._send_json(HTTPStatus.OK, {"file": info}, {"X-Goog-Upload-Status": "final"})
+
+    def _gemini_generate(self, body: bytes) -> None:
+        try:
+            request = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            return self._provider_error("gemini", HTTPStatus.BAD_REQUEST, "Invalid JSON")
+        size = 0
+        for content in request.get("contents", []):
+            for part in content.get("parts", []):
+                uri = (part.get("fileData") or part.get("file_data") or {}).get("fileUri", "")
+                info = self.server.files.get(uri.rsplit("/", 1)[-1])
+                if info is not None:
+                    size += int(info["sizeBytes"])
+        schema = json.dumps(request.get("generationConfig", {}).get("responseSchema", {}))
+        diarize = "speaker" in schema
+
+        def respond(duration: float) -> None:
+            items = []
+            for i, seg in enumerate(synthetic_segments(synthetic_words(duration, self.server.rng()))):
+                item = {"start": _mmss(seg["start"]), "end": _mmss(seg["end"]), "text": seg["text"], "gender": "female"}
+                if diarize:
+                    item["speaker"] = f"SPEAKER_{i % 2:02d}"
+                    item["gender"] = ("female", "male")[i % 2]
+                items.append(item)
+            self._send_json(HTTPStatus.OK, {
+                "candidates": [{
+                    "content": {"role": "model", "parts": [{"text": json.dumps(items)}]},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }],
+                "usageMetadata": {"promptTokenCount": 0, "candidatesTokenCount": 0, "totalTokenCount": 0},
+            })
+
+        self._transcribe("gemini", size, respond)
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], config: FakeConfig | None = None, verbose: bool = False):
+        super().__init__(address, _Handler)
+        self.config = config or FakeConfig()
+        self.verbose = verbose
+        self.throttle = _Throttle(self.config.rate, self.config.burst, self.config.max_concurrent)
+        self.files: dict[str, dict] = {}
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._counts = {"requests": 0, "ok": 0, "throttled": 0, "failed": 0, "dropped": 0}
+
+    def rng(self) -> random.Random:
+        """A per-request generator seeded from the server's, so runs stay reproducible."""
+        with self._lock:
+            return random.Random(self._rng.random())
+
+    def draw(self) -> tuple[float, float]:
+        """Return (failure roll, base latency) for one transcription request."""
+        with self._lock:
+            return self._rng.random(), self.config.latency.sample(self._rng)
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def base_urls(self) -> dict[str, str]:
+        """Base URLs to configure for each provider."""
+        return {"openai": f"{self.url}/v1", "elevenlabs": self.url, "gemini": self.url}
+
+
+def start_fake_server(
+    config: FakeConfig | None = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> FakeProviderServer:
+    """Start a fake server on a background thread (port 0 picks a free port)."""
+    server = FakeProviderServer((host, port), config)
+    threading.Thread(target=server.serve_forever, name="sttcli-fake-server", daemon=True).start()
+    return server
@@ -0,0 +1,302 @@
+"""Acoustic fingerprints for spotting the same recording across re-encodes.
+
+Spectral peaks of the decoded 16 kHz PCM are paired into landmark hashes
+(anchor frequency, target frequency, time delta), as in Shazam-style audio
+identification. Two inputs match when many hashes agree at one constant
+time offset, which survives re-encoding, resampling, gain changes and
+trimming. The offset says where a trimmed copy starts inside the original,
+so its transcript can be cut out of the original's.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from sttcli.checkpoint import provider_spec
+from sttcli.config import load_config
+from sttcli.models import Segment, TranscriptResult, Word
+from sttcli.pcm import SAMPLE_RATE, open_pcm
+from sttcli.providers.base import BaseProvider
+
+DEFAULT_INDEX_PATH = Path.home() / ".cache" / "sttcli" / "fingerprints.db"
+
+N_FFT = 1024
+HOP = 512                       # 32 ms frames
+FRAME_SECONDS = HOP / SAMPLE_RATE
+# Frequency bins kept (≈ 60 Hz – 4 kHz): the band phone and low-bitrate
+# copies still carry.
+MIN_BIN = 4
+MAX_BIN = 256
+# Peak neighbourhood: a peak is the maximum within ±PEAK_FREQ bins and ±PEAK_TIME frames
+PEAK_FREQ = 10
+PEAK_TIME = 6
+# Peaks must stand this many dB above the median level of their frame and block
+PEAK_DB = 12.0
+# Each anchor pairs with the next FAN_OUT peaks up to MAX_DT frames later
+FAN_OUT = 6
+MAX_DT = 63
+BLOCK_FRAMES = 8192
+
+# A match needs this many hashes aligned at one offset and this fraction of
+# the query's hashes.
+MIN_MATCHES = 25
+MIN_SCORE = 0.01
+# Slack in seconds when deciding that a stored recording covers a query
+COVER_TOLERANCE = 1.0
+
+
+@dataclass
+class Fingerprint:
+    hashes: np.ndarray      # uint32 landmark hashes
+    times: np.ndarray       # int32 anchor frame of each hash
+    duration: float
+
+
+@dataclass
+class Match:
+    file_id: int
+    path: str
+    offset: float           # seconds: query time t is stored time t + offset
+    matches: int            # hashes aligned at that offset
+    score: float            # matches / query hashes
+    duration: float         # stored recording's duration
+
+    def covers(self, query_duration: float) -> bool:
+        """Whether the stored recording contains all of the query."""
+        return (
+            self.offset >= -COVER_TOLERANCE
+            and self.offset + query_duration <= self.duration + COVER_TOLERANCE
+        )
+
+
+def _peaks(samples: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return (frame, bin) of spectral peaks, ordered by frame."""
+    window = np.hanning(N_FFT).astype(np.float32)
+    frames_all: list[np.ndarray] = []
+    bins_all: list[np.ndarray] = []
+    n_frames = 1 + (len(samples) - N_FFT) // HOP
+    # Blocks overlap by PEAK_TIME frames so peaks at block edges see their full neighbourhood.
+    for first in range(0, n_frames, BLOCK_FRAMES):
+        lo = max(0, first - PEAK_TIME)
+        hi = min(n_frames, first + BLOCK_FRAMES + PEAK_TIME)
+        chunk = samples[lo * HOP:(hi - 1) * HOP + N_FFT]
+        frames = np.lib.stride_tricks.sliding_window_view(chunk, N_FFT)[::HOP] * window
+        spec = np.abs(np.fft.rfft(frames, axis=1))[:, MIN_BIN:MAX_BIN].astype(np.float32)
+        level = 20.0 * np.log10(spec + 1e-6)
+
+        padded = np.pad(level, ((0, 0), (PEAK_FREQ, PEAK_FREQ)), constant_values=-np.inf)
+        local = np.lib.stride_tricks.sliding_window_view(padded, 2 * PEAK_FREQ + 1, axis=1).max(axis=2)
+        padded = np.pad(local, ((PEAK_TIME, PEAK_TIME), (0, 0)), constant_values=-np.inf)
+        local = np.lib.stride_tricks.sliding_window_view(padded, 2 * PEAK_TIME + 1, axis=0).max(axis=2)
+
+        # Against the louder of the frame's own median and the block's, so
+        # quiet frames (pauses, room noise) contribute no peaks.
+        floor = np.maximum(np.median(level, axis=1, keepdims=True), np.median(level)) + PEAK_DB
+        is_peak = (level == local) & (level > floor)
+        f, b = np.nonzero(is_peak)
+        f += lo
+        keep = (f >= first) & (f < first + BLOCK_FRAMES)
+        frames_all.append(f[keep])
+        bins_all.append(b[keep])
+    if not frames_all:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(frames_all), np.concatenate(bins_all)
+
+
+def fingerprint(samples: np.ndarray) -> Fingerprint:
+    """Landmark hashes of mono 16 kHz float32 samples."""
+    duration = len(samples) / SAMPLE_RATE
+    if len(samples) < N_FFT:
+        return Fingerprint(np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.int32), duration)
+    t, f = _peaks(samples)
+    order = np.lexsort((f, t))
+    t, f = t[order], f[order]
+
+    hashes: list[np.ndarray] = []
+    times: list[np.ndarray] = []
+    for k in range(1, FAN_OUT + 1):
+        dt = t[k:] - t[:-k]
+        ok = (dt > 0) & (dt <= MAX_DT)
+        anchor_f, target_f = f[:-k][ok], f[k:][ok]
+        hashes.append(((anchor_f << 14) | (target_f << 6) | dt[ok]).astype(np.uint32))
+        times.append(t[:-k][ok].astype(np.int32))
+    return Fingerprint(np.concatenate(hashes), np.concatenate(times), duration)
+
+
+def fingerprint_file(path: Path | str) -> Fingerprint:
+    return fingerprint(open_pcm(path).samples())
+
+
+def best_offset(query_times: np.ndarray, stored_times: np.ndarray) -> tuple[int, int]:
+    """Most common (stored - query) frame offset among matching hashes, with ±1 frame slack."""
+    offsets = stored_times.astype(np.int64) - query_times.astype(np.int64)
+    values, counts = np.unique(offsets, return_counts=True)
+    # Re-encoding can shift a peak by one frame; pool each offset with its neighbours.
+    pooled = counts.copy()
+    pooled[1:] += np.where(np.diff(values) == 1, counts[:-1], 0)
+    pooled[:-1] += np.where(np.diff(values) == 1, counts[1:], 0)
+    i = int(pooled.argmax())
+    return int(values[i]), int(pooled[i])
+
+
+def shift_result(result: TranscriptResult, offset: float, duration: float, source_file: str) -> TranscriptResult:
+    """Cut [offset, offset + duration) out of result and move it to start at zero."""
+    end = offset + duration
+
+    def clip(start: float, stop: float) -> tuple[float, float]:
+        return max(0.0, start - offset), min(duration, stop - offset)
+
+    segments = []
+    for seg in result.segments:
+        if seg.end <= offset or seg.start >= end:
+            continue
+        start, stop = clip(seg.start, seg.end)
+        words = None
+        if seg.words is not None:
+            words = [
+                Word(*clip(w.start, w.end), w.text, w.confidence)
+                for w in seg.words if w.end > offset and w.start < end
+            ]
+        segments.append(Segment(start, stop, seg.text, seg.speaker, seg.gender, words))
+    return TranscriptResult(
+        segments=segments,
+        language=result.language,
+        duration=segments[-1].end if segments else 0.0,
+        provider=result.provider,
+        model=result.model,
+        source_file=source_file,
+    )
+
+
+def transcript_variant(provider: BaseProvider) -> str:
+    """Key for transcripts made with provider's options; others are never reused."""
+    return json.dumps(provider_spec(provider), sort_keys=True)
+
+
+def resolve_index_path(config_path: Path | None = None) -> Path:
+    configured = load_config(config_path).get("dedup", {}).get("path")
+    return Path(configured).expanduser() if configured else DEFAULT_INDEX_PATH
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id       INTEGER PRIMARY KEY,
+    key      TEXT NOT NULL UNIQUE,      -- content hash of the input bytes
+    path     TEXT NOT NULL,
+    duration REAL NOT NULL,
+    added    REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hashes (
+    hash    INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    t       INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hashes_by_hash ON hashes(hash);
+CREATE TABLE IF NOT EXISTS transcripts (
+    file_id INTEGER NOT NULL,
+    variant TEXT NOT NULL,              -- provider and options that shape the transcript
+    result  TEXT NOT NULL,              -- TranscriptResult JSON
+    PRIMARY KEY (file_id, variant)
+);
+"""
+
+
+class FingerprintIndex:
+    """Persisted fingerprints and the transcripts made from them, in SQLite."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "FingerprintIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def add(self, key: str, path: str, fp: Fingerprint) -> int:
+        """Store fp under key (a content hash); an existing key keeps its fingerprint."""
+        row = self.conn.execute("SELECT id FROM files WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            return row[0]
+        cur = self.conn.execute(
+            "INSERT INTO files (key, path, duration, added) VALUES (?, ?, ?, ?)",
+            (key, path, fp.duration, time.time()),
+        )
+        file_id = cur.lastrowid
+        self.conn.executemany(
+            "INSERT INTO hashes (hash, file_id, t) VALUES (?, ?, ?)",
+            zip(fp.hashes.tolist(), [file_id] * len(fp.hashes), fp.times.tolist()),
+        )
+        self.conn.commit()
+        return file_id
+
+    def file_id(self, key: str) -> int | None:
+        row = self.conn.execute("SELECT id FROM files WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _joined(self, fp: Fingerprint) -> np.ndarray:
+        """Rows of (file_id, stored t, query t) for every stored hash equal to one of fp's."""
+        if not len(fp.hashes):
+            return np.zeros((0, 3), dtype=np.int64)
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS query (hash INTEGER, t INTEGER)")
+        self.conn.execute("DELETE FROM query")
+        self.conn.executemany("INSERT INTO query VALUES (?, ?)", zip(fp.hashes.tolist(), fp.times.tolist()))
+        rows = self.conn.execute(
+            "SELECT h.file_id, h.t, q.t FROM query q JOIN hashes h ON h.hash = q.hash"
+        ).fetchall()
+        self.conn.execute("DELETE FROM query")
+        return np.array(rows, dtype=np.int64).reshape(-1, 3)
+
+    def lookup(self, fp: Fingerprint) -> list[Match]:
+        """Stored recordings sharing enough aligned hashes with fp, best first."""
+        data = self._joined(fp)
+        if not len(data):
+            return []
+
+        data = data[np.argsort(data[:, 0], kind="stable")]
+        ids, starts = np.unique(data[:, 0], return_index=True)
+        matches = []
+        for file_id, sel in zip(ids, np.split(data, starts[1:])):
+            if len(sel) < MIN_MATCHES:
+                continue
+            offset, count = best_offset(sel[:, 2], sel[:, 1])
+            score = count / len(fp.hashes)
+            if count < MIN_MATCHES or score < MIN_SCORE:
+                continue
+            path, duration = self.conn.execute(
+                "SELECT path, duration FROM files WHERE id = ?", (int(file_id),)
+            ).fetchone()
+            matches.append(Match(int(file_id), path, offset * FRAME_SECONDS, count, score, duration))
+        return sorted(matches, key=lambda m: m.matches, reverse=True)
+
+    def matched_times(self, fp: Fingerprint, file_id: int) -> tuple[np.ndarray, np.ndarray]:
+        """(query frames, stored frames) of every hash fp shares with one stored recording."""
+        data = self._joined(fp)
+        data = data[data[:, 0] == file_id]
+        return data[:, 2], data[:, 1]
+
+    def transcript(self, file_id: int, variant: str) -> TranscriptResult | None:
+        row = self.conn.execute(
+            "SELECT result FROM transcripts WHERE file_id = ? AND variant = ?", (file_id, variant)
+        ).fetchone()
+        return TranscriptResult.from_dict(json.loads(row[0])) if row else None
+
+    def put_transcript(self, file_id: int, variant: str, result: TranscriptResult) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO transcripts (file_id, variant, result) VALUES (?, ?, ?)",
+            (file_id, variant, json.dumps(result.to_dict(), ensure_ascii=False)),
+        )
+        self.conn.commit()
@@ -1,5 +1,10 @@
 from sttcli.formatters.base import BaseFormatter
 
+FORMATS = ("markdown", "srt", "json", "text")
+
+# File extension used for each format in output templates ({ext})
+EXTENSIONS = {"markdown": "md", "srt": "srt", "json": "json", "text": "txt"}
+
 
 def get_formatter(name: str) -> type[BaseFormatter]:
     if name == "markdown":
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 import html
+import io
+import json
 import re
 from datetime import datetime
 from pathlib import Path
+from typing import TextIO
 
-from sttcli.benchmark import BenchmarkEntry
+from sttcli.align import DisagreementSpan
+from sttcli.benchmark import CONFIDENCE, BenchmarkEntry
 
 # ── Speaker color palette ────────────────────────────────────────────────────
 _PALETTE = [
@@ -43,7 +47,13 @@ def _fmt_duration(seconds: float) -> str:
 
 # ── Card renderers ───────────────────────────────────────────────────────────
 
-def _render_success_card(entry: BenchmarkEntry) -> str:
+def _script_json(obj) -> str:
+    """Compact JSON that is safe to embed in a <script> block."""
+    # "</" inside a <script> block would end it early
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+
+
+def _render_success_card(entry: BenchmarkEntry, index: int) -> str:
     r = entry.result
     assert r is not None
 
@@ -53,33 +63,11 @@ def _render_success_card(entry: BenchmarkEntry) -> str:
         else '<span class="badge badge-plain">no diarize</span>'
     )
 
-    segments_html = []
-    for seg in r.segments:
-        time_str = html.escape(f"{_fmt_time(seg.start)} → {_fmt_time(seg.end)}")
-        text_str = html.escape(seg.text)
-
-        speaker_html = ""
-        if seg.speaker:
-            color = _speaker_color(seg.speaker)
-            label = html.escape(seg.speaker)
-            speaker_html = (
-                f'<span class="speaker-badge" style="background:{color}">{label}</span>'
-            )
-
-        segments_html.append(f"""
-        <div class="segment">
-          <div class="segment-meta">
-            <span class="time">{time_str}</span>
-            {speaker_html}
-          </div>
-          <p class="seg-text">{text_str}</p>
-        </div>""")
-
-    body = "\n".join(segments_html)
-
     # Card title: use label if it differs from bare provider name
     title = html.escape(entry.label)
 
+    # Segments are not rendered here: the body is filled from the card's JSON
+    # payload by the virtual list script, one page of rows at a time.
     return f"""
   <div class="card">
     <div class="card-header">
@@ -93,9 +81,109 @@ def _render_success_card(entry: BenchmarkEntry) -> str:
         <span class="stat">📝 {len(r.segments)} segs</span>
       </div>
     </div>
-    <div class="card-body">
-      {body}
+    <div class="card-body vlist" data-src="segs-{index}"></div>
+  </div>"""
+
+
+def _write_segment_data(out: TextIO, entry: BenchmarkEntry, index: int) -> None:
+    """Write one card's segments as compact JSON: [start, end, speaker_idx, text] rows."""
+    r = entry.result
+    assert r is not None
+
+    speakers: dict[str, int] = {}
+    for seg in r.segments:
+        if seg.speaker and seg.speaker not in speakers:
+            speakers[seg.speaker] = len(speakers)
+
+    dump = _script_json
+    speaker_list = [[name, _speaker_color(name)] for name in speakers]
+    out.write(f'<script type="application/json" id="segs-{index}">{{"speakers":{dump(speaker_list)},"rows":[')
+    for i, seg in enumerate(r.segments):
+        if i:
+            out.write(",")
+        spk = speakers[seg.speaker] if seg.speaker else -1
+        out.write(dump([round(seg.start, 2), round(seg.end, 2), spk, seg.text]))
+    out.write("]}</script>\n")
+
+
+def _render_diff_panel(spans: list[DisagreementSpan], agreement: float) -> str:
+    return f"""
+  <div class="card diff-panel">
+    <div class="card-header">
+      <div class="card-title">
+        <span class="provider-name">Disagreements</span>
+        <span class="badge badge-model">{len(spans)} spans</span>
+      </div>
+      <div class="card-stats">
+        <span class="stat">🤝 {agreement:.1%} words agreed</span>
+        <span class="stat">click a row to jump</span>
+      </div>
     </div>
+    <div class="card-body vlist" data-src="diff-data"></div>
+  </div>"""
+
+
+def _write_diff_data(out: TextIO, spans: list[DisagreementSpan], labels: list[str]) -> None:
+    """Write disagreement spans as compact JSON: [start, end, before, after, texts] rows."""
+    out.write(f'<script type="application/json" id="diff-data">{{"kind":"diff","labels":{_script_json(labels)},"rows":[')
+    for i, span in enumerate(spans):
+        if i:
+            out.write(",")
+        texts = [span.texts.get(label, "") for label in labels]
+        out.write(_script_json([round(span.start, 2), round(span.end, 2), span.before, span.after, texts]))
+    out.write("]}</script>\n")
+
+
+def _fmt_seconds(value: float | None, digits: int = 2) -> str:
+    return "—" if value is None else f"{value:.{digits}f}"
+
+
+def _fmt_interval(stats: dict, digits: int = 2) -> str:
+    if stats["ci_low"] is None:
+        return ""
+    return f' <span class="ci">[{stats["ci_low"]:.{digits}f}, {stats["ci_high"]:.{digits}f}]</span>'
+
+
+def _render_timing_panel(entries: list[BenchmarkEntry]) -> str:
+    """Latency and real-time factor per provider, steady state and cold start."""
+    rows = []
+    for e in entries:
+        t = e.timings
+        if t is None:
+            continue
+        latency, rtf = t.latency, t.rtf
+        rows.append(f"""
+        <tr>
+          <td class="label">{html.escape(e.label)}</td>
+          <td>{len(t.seconds)}{f' <span class="ci">+{t.warmup} warm-up</span>' if t.warmup else ''}</td>
+          <td>{_fmt_seconds(latency["median"])}{_fmt_interval(latency)}</td>
+          <td>{_fmt_seconds(latency["p90"])}</td>
+          <td>{_fmt_seconds(latency["p99"])}</td>
+          <td>{_fmt_seconds(rtf["median"], 3)}{_fmt_interval(rtf, 3)}</td>
+          <td>{_fmt_seconds(t.cold_seconds)}</td>
+          <td>{_fmt_seconds(t.cold_overhead)}</td>
+          <td class="{'fail' if t.errors else ''}">{len(t.errors)}</td>
+        </tr>""")
+    return f"""
+  <div class="card timing-panel">
+    <div class="card-header">
+      <div class="card-title">
+        <span class="provider-name">Timing</span>
+      </div>
+      <div class="card-stats">
+        <span class="stat">seconds per call; {CONFIDENCE:.0%} interval of the median in brackets</span>
+      </div>
+    </div>
+    <table class="timing">
+      <thead>
+        <tr>
+          <th>Provider</th><th>Runs</th><th>Median</th><th>p90</th><th>p99</th>
+          <th>RTF</th><th>Cold</th><th>Cold overhead</th><th>Failed</th>
+        </tr>
+      </thead>
+      <tbody>{"".join(rows)}
+      </tbody>
+    </table>
   </div>"""
 
 
@@ -142,6 +230,7 @@ header h1 { font-size: 1.4rem; font-weight: 700; margin-bottom: 10px; letter-spa
 header h1 span { color: #64748b; font-weight: 400; }
 .header-meta { display: flex; gap: 20px; font-size: 0.82rem; color: #94a3b8; flex-wrap: wrap; }
 .header-meta span { display: flex; align-items: center; gap: 5px; }
+.sync-toggle { display: flex; align-items: center; gap: 5px; cursor: pointer; }
 
 /* ── MAIN ── */
 main { padding: 24px 32px; }
@@ -194,12 +283,14 @@ main { padding: 24px 32px; }
   padding: 12px 18px;
   max-height: 560px;
   overflow-y: auto;
-  scroll-behavior: smooth;
+  overflow-anchor: none;
 }
 .card-body::-webkit-scrollbar { width: 4px; }
 .card-body::-webkit-scrollbar-track { background: #f8fafc; }
 .card-body::-webkit-scrollbar-thumb { background: #cbd5e1; border-radius: 2px; }
 
+.vlist { position: relative; }
+
 /* ── SEGMENTS ── */
 .segment {
   padding: 8px 0;
@@ -225,6 +316,30 @@ main { padding: 24px 32px; }
   word-break: break-word;
 }
 
+/* ── DISAGREEMENTS ── */
+.diff-panel { margin-bottom: 20px; }
+.diff-panel .card-body { max-height: 320px; }
+.diff-row { cursor: pointer; }
+.diff-row:hover { background: #f8fafc; }
+.diff-line { font-size: 0.84rem; line-height: 1.6; color: #334155; word-break: break-word; }
+.diff-label {
+  display: inline-block; min-width: 150px;
+  font-size: 0.72rem; font-weight: 700; color: #64748b;
+}
+.diff-line .ctx { color: #94a3b8; }
+.diff-line mark { background: #fef08a; color: #0f172a; padding: 0 2px; border-radius: 2px; }
+.diff-line mark.gap { background: #fee2e2; color: #b91c1c; }
+
+/* ── TIMING ── */
+.timing-panel { margin-bottom: 20px; }
+.timing { width: 100%; border-collapse: collapse; font-size: 0.82rem; }
+.timing th, .timing td { padding: 8px 18px; text-align: right; border-bottom: 1px solid #f1f5f9; white-space: nowrap; }
+.timing th { font-size: 0.72rem; font-weight: 700; color: #64748b; background: #f8fafc; }
+.timing th:first-child, .timing td.label { text-align: left; font-weight: 700; color: #0f172a; }
+.timing td { font-variant-numeric: tabular-nums; color: #334155; }
+.timing .ci { color: #94a3b8; font-size: 0.74rem; }
+.timing td.fail { color: #ef4444; font-weight: 700; }
+
 /* ── ERROR / SKIP STATE ── */
 .card-error, .card-skipped {
   padding: 32px 20px;
@@ -243,12 +358,227 @@ main { padding: 24px 32px; }
 """
 
 
+# ── Virtual list script ──────────────────────────────────────────────────────
+# Rows are grouped into fixed-size pages. Only pages near the viewport exist in
+# the DOM; the rest are replaced by spacers sized from measured (or estimated)
+# page heights, so page weight no longer grows with transcript length.
+
+_JS = r"""
+(function () {
+  const PAGE = 40, OVERSCAN = 1;
+  const columns = [];
+  // Programmatic scrolls of the other columns also fire scroll events;
+  // ignore those for a moment so columns do not chase each other.
+  let syncUntil = 0;
+
+  function fmt(t) {
+    t = Math.floor(t);
+    const m = Math.floor(t / 60), s = t % 60;
+    return String(m).padStart(2, "0") + ":" + String(s).padStart(2, "0");
+  }
+
+  function el(tag, cls, text) {
+    const node = document.createElement(tag);
+    if (cls) node.className = cls;
+    if (text !== undefined) node.textContent = text;
+    return node;
+  }
+
+  function lines(text, width) {
+    return Math.ceil(text.length / Math.max(20, Math.floor(width / 7.5)));
+  }
+
+  // Row kinds. Text always goes in via textContent: no HTML escaping needed.
+  const KINDS = {
+    // [start, end, speaker_idx, text]
+    segments: {
+      estimate: (r, w) => 34 + lines(r[3], w) * 22,
+      build(r, data) {
+        const row = el("div", "segment");
+        const meta = el("div", "segment-meta");
+        meta.appendChild(el("span", "time", fmt(r[0]) + " → " + fmt(r[1])));
+        if (r[2] >= 0) {
+          const badge = el("span", "speaker-badge", data.speakers[r[2]][0]);
+          badge.style.background = data.speakers[r[2]][1];
+          meta.appendChild(badge);
+        }
+        row.append(meta, el("p", "seg-text", r[3]));
+        return row;
+      },
+    },
+    // [start, end, before, after, [text per label]]
+    diff: {
+      estimate: (r, w) => 34 + r[4].reduce((h, t) => h + lines(t + r[2] + r[3], w) * 22, 0),
+      build(r, data) {
+        const row = el("div", "segment diff-row");
+        const meta = el("div", "segment-meta");
+        meta.appendChild(el("span", "time", fmt(r[0]) + " → " + fmt(r[1])));
+        row.appendChild(meta);
+        r[4].forEach((text, k) => {
+          const line = el("div", "diff-line");
+          line.append(
+            el("span", "diff-label", data.labels[k]),
+            el("span", "ctx", r[2] ? "… " + r[2] + " " : ""),
+            el("mark", text ? "" : "gap", text || "∅"),
+            el("span", "ctx", r[3] ? " " + r[3] + " …" : ""),
+          );
+          row.appendChild(line);
+        });
+        row.addEventListener("click", () => {
+          for (const c of columns) c.scrollToTime(r[0]);
+        });
+        return row;
+      },
+    },
+  };
+
+  function VList(node) {
+    this.data = JSON.parse(document.getElementById(node.dataset.src).textContent);
+    this.kind = KINDS[this.data.kind || "segments"];
+    this.el = node;
+    this.rows = this.data.rows;
+    this.nPages = Math.ceil(this.rows.length / PAGE);
+    this.heights = new Array(this.nPages);
+    this.measured = new Array(this.nPages).fill(false);
+    this.top = el("div");
+    this.mid = el("div");
+    this.bottom = el("div");
+    node.append(this.top, this.mid, this.bottom);
+    this.first = -1;
+    this.last = -1;
+    this.estimateAll();
+    node.addEventListener("scroll", () => this.onScroll(), { passive: true });
+    this.render();
+  }
+
+  VList.prototype.estimateAll = function () {
+    const w = this.el.clientWidth || 400;
+    for (let p = 0; p < this.nPages; p++) {
+      if (this.measured[p]) continue;
+      let h = 0;
+      const end = Math.min(this.rows.length, (p + 1) * PAGE);
+      for (let i = p * PAGE; i < end; i++) h += this.kind.estimate(this.rows[i], w);
+      this.heights[p] = h;
+    }
+  };
+
+  VList.prototype.offsetOf = function (page) {
+    let y = 0;
+    for (let p = 0; p < page; p++) y += this.heights[p];
+    return y;
+  };
+
+  VList.prototype.pageAt = function (y) {
+    let acc = 0;
+    for (let p = 0; p < this.nPages; p++) {
+      acc += this.heights[p];
+      if (acc > y) return p;
+    }
+    return Math.max(0, this.nPages - 1);
+  };
+
+  VList.prototype.renderPage = function (p) {
+    const page = el("div");
+    page.dataset.page = p;
+    const end = Math.min(this.rows.length, (p + 1) * PAGE);
+    for (let i = p * PAGE; i < end; i++) {
+      const row = this.kind.build(this.rows[i], this.data);
+      row.dataset.row = i;
+      page.appendChild(row);
+    }
+    return page;
+  };
+
+  VList.prototype.render = function () {
+    if (!this.nPages) return;
+    const st = this.el.scrollTop, vh = this.el.clientHeight || 560;
+    const first = Math.max(0, this.pageAt(st) - OVERSCAN);
+    const last = Math.min(this.nPages - 1, this.pageAt(st + vh) + OVERSCAN);
+    if (first === this.first && last === this.last) return;
+    this.first = first;
+    this.last = last;
+    this.mid.replaceChildren();
+    for (let p = first; p <= last; p++) this.mid.appendChild(this.renderPage(p));
+    for (const page of this.mid.children) {
+      const h = page.offsetHeight;
+      if (h) {
+        this.heights[+page.dataset.page] = h;
+        this.measured[+page.dataset.page] = true;
+      }
+    }
+    this.top.style.height = this.offsetOf(first) + "px";
+    let rest = 0;
+    for (let p = last + 1; p < this.nPages; p++) rest += this.heights[p];
+    this.bottom.style.height = rest + "px";
+  };
+
+  VList.prototype.timeAtTop = function () {
+    const st = this.el.scrollTop;
+    for (const row of this.mid.querySelectorAll("[data-row]")) {
+      if (row.offsetTop + row.offsetHeight > st) return this.rows[+row.dataset.row][0];
+    }
+    return 0;
+  };
+
+  VList.prototype.scrollToTime = function (t) {
+    let lo = 0, hi = this.rows.length - 1;
+    if (hi < 0) return;
+    while (lo < hi) {
+      const mid = (lo + hi + 1) >> 1;
+      if (this.rows[mid][0] <= t) lo = mid; else hi = mid - 1;
+    }
+    this.el.scrollTop = this.offsetOf(Math.floor(lo / PAGE));
+    this.render();
+    const row = this.mid.querySelector('[data-row="' + lo + '"]');
+    if (row) this.el.scrollTop = row.offsetTop;
+    this.render();
+    syncUntil = performance.now() + 150;
+  };
+
+  VList.prototype.onScroll = function () {
+    if (this.pending) return;
+    this.pending = true;
+    requestAnimationFrame(() => {
+      this.pending = false;
+      this.render();
+      if (!this.synced || performance.now() < syncUntil) return;
+      if (!document.getElementById("sync-scroll").checked) return;
+      const t = this.timeAtTop();
+      for (const other of columns) if (other !== this) other.scrollToTime(t);
+    });
+  };
+
+  const lists = [];
+  for (const node of document.querySelectorAll(".vlist")) {
+    const list = new VList(node);
+    list.synced = list.kind === KINDS.segments;
+    if (list.synced) columns.push(list);
+    lists.push(list);
+  }
+  window.addEventListener("resize", () => {
+    for (const l of lists) { l.estimateAll(); l.first = -1; l.render(); }
+  });
+})();
+"""
+
+
 # ── Public API ───────────────────────────────────────────────────────────────
 
-def generate_comparison_html(
+def write_comparison_html(
+    out: TextIO,
     source_file: str,
     entries: list[BenchmarkEntry],
-) -> str:
+    spans: list[DisagreementSpan] | None = None,
+    agreement: float | None = None,
+) -> None:
+    """Write the comparison report to `out` incrementally.
+
+    Segments are embedded as compact JSON and rendered client-side by a
+    virtual list, so neither generation nor page load builds one DOM node per
+    segment. Entries with timings get a latency table, and when `spans` is
+    given (see sttcli.align), a disagreement panel is added above the
+    provider columns.
+    """
     filename = Path(source_file).name
     now = datetime.now().strftime("%Y-%m-%d %H:%M")
 
@@ -262,12 +592,7 @@ def generate_comparison_html(
     n_ok = sum(1 for e in entries if e.result is not None)
     n_total = len(entries)
 
-    cards = "\n".join(
-        _render_success_card(e) if e.result else _render_error_card(e)
-        for e in entries
-    )
-
-    return f"""<!DOCTYPE html>
+    out.write(f"""<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8">
@@ -283,13 +608,42 @@ def generate_comparison_html(
       <span>⏱ {html.escape(duration_str)}</span>
       <span>🕐 {now}</span>
       <span>✅ {n_ok} / {n_total} providers</span>
+      <label class="sync-toggle"><input type="checkbox" id="sync-scroll" checked> sync scroll by time</label>
     </div>
   </header>
   <main>
+""")
+    diff_labels = [e.label for e in entries if e.result]
+    if any(e.timings for e in entries):
+        out.write(_render_timing_panel(entries))
+    if spans is not None:
+        out.write(_render_diff_panel(spans, agreement if agreement is not None else 1.0))
+    out.write("""
     <div class="grid">
-      {cards}
+""")
+    for i, e in enumerate(entries):
+        out.write(_render_success_card(e, i) if e.result else _render_error_card(e))
+    out.write("""
     </div>
   </main>
+""")
+    for i, e in enumerate(entries):
+        if e.result:
+            _write_segment_data(out, e, i)
+    if spans is not None:
+        _write_diff_data(out, spans, diff_labels)
+    out.write(f"""  <script>{_JS}</script>
 </body>
 </html>
-"""
+""")
+
+
+def generate_comparison_html(
+    source_file: str,
+    entries: list[BenchmarkEntry],
+    spans: list[DisagreementSpan] | None = None,
+    agreement: float | None = None,
+) -> str:
+    buf = io.StringIO()
+    write_comparison_html(buf, source_file, entries, spans, agreement)
+    return buf.getvalue()
@@ -1,28 +1,22 @@
 from __future__ import annotations
 
-import subprocess
-
 import numpy as np
 
+from sttcli.pcm import open_pcm
+
 
 def _extract_pcm(
     audio_path: str,
     start: float | None = None,
     duration: float | None = None,
 ) -> np.ndarray:
-    """Extract mono 16 kHz PCM from audio file using ffmpeg."""
-    cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
-    if start is not None and start > 0:
-        cmd += ["-ss", str(start)]
-    cmd += ["-i", audio_path]
-    if duration is not None and duration > 0:
-        cmd += ["-t", str(duration)]
-    cmd += ["-ar", "16000", "-ac", "1", "-f", "s16le", "-"]
-
-    result = subprocess.run(cmd, capture_output=True)
-    if not result.stdout:
+    """Return mono 16 kHz PCM for a time range, read from the shared decode cache."""
+    lo = start or 0.0
+    hi = lo + duration if duration is not None and duration > 0 else None
+    try:
+        return open_pcm(audio_path).slice(lo, hi)
+    except (OSError, RuntimeError):
         return np.array([], dtype=np.float32)
-    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
 
 
 def _estimate_f0(audio: np.ndarray, sr: int = 16000) -> float | None:
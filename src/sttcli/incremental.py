@@ -0,0 +1,215 @@
+"""Re-transcribe an edited recording by reusing the transcript of its previous version.
+
+The new version is aligned against the fingerprint index (sttcli.fingerprint):
+every landmark hash it shares with the stored recording votes for a time
+offset, and each 2-second block of the new file takes the offset most of its
+hashes agree on. Runs of blocks with one offset are unchanged material that
+moved by that offset; blocks without one are new or edited. Stored segments
+that lie inside unchanged material are kept (shifted); only the gaps around
+edits are sent to the provider.
+"""
+
+from __future__ import annotations
+
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from sttcli.fingerprint import FRAME_SECONDS, MIN_MATCHES, Fingerprint, best_offset
+from sttcli.models import Segment, TranscriptResult, Word
+from sttcli.pcm import open_pcm, write_wav
+from sttcli.progress import NullStepProgress, StepProgress, Throughput
+from sttcli.providers.base import BaseProvider
+
+BLOCK_SECONDS = 2.0
+# Hashes a block needs at one offset to count as unchanged
+BLOCK_MATCHES = 4
+# Distinct offsets considered (one per unchanged stretch that moved)
+MAX_OFFSETS = 32
+# A kept segment may reach this far past the first/last matching hash of its stretch
+EDGE_SLACK = 0.5
+# Gaps shorter than this are not worth a provider call
+MIN_GAP = 0.3
+
+
+@dataclass
+class Region:
+    start: float
+    end: float
+    offset: float | None        # stored time = new time + offset; None if changed
+
+
+@dataclass
+class EditPlan:
+    source: str                                 # previous version's path
+    regions: list[Region]
+    kept: list[Segment] = field(default_factory=list)
+    gaps: list[tuple[float, float]] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.regions[-1].end if self.regions else 0.0
+
+    @property
+    def transcribe_seconds(self) -> float:
+        return sum(end - start for start, end in self.gaps)
+
+
+def _candidate_offsets(offsets: np.ndarray) -> list[int]:
+    """Offsets (in frames) shared by at least MIN_MATCHES hashes, strongest first."""
+    found: list[int] = []
+    remaining = offsets
+    while len(remaining) >= MIN_MATCHES and len(found) < MAX_OFFSETS:
+        offset, count = best_offset(np.zeros_like(remaining), remaining)
+        if count < MIN_MATCHES:
+            break
+        found.append(offset)
+        remaining = remaining[np.abs(remaining - offset) > 1]
+    return found
+
+
+def align(fp: Fingerprint, query_t: np.ndarray, stored_t: np.ndarray) -> list[tuple[Region, float, float]]:
+    """Split the new recording into regions, each with the span its matching hashes verify.
+
+    Returns (region, first, last) where first/last are the earliest and latest
+    matching anchor times of an unchanged region (unused for changed ones).
+    """
+    block_frames = BLOCK_SECONDS / FRAME_SECONDS
+    n_blocks = max(1, int(np.ceil(fp.duration / BLOCK_SECONDS)))
+    offsets = stored_t - query_t
+    candidates = _candidate_offsets(offsets)
+
+    labels = np.full(n_blocks, -1)
+    if candidates:
+        cand = np.array(candidates)
+        distance = np.abs(offsets[:, None] - cand[None, :])
+        nearest = distance.argmin(axis=1)
+        ok = distance[np.arange(len(offsets)), nearest] <= 1
+        blocks = np.minimum((query_t / block_frames).astype(np.int64), n_blocks - 1)
+        counts = np.zeros((n_blocks, len(cand)), dtype=np.int64)
+        np.add.at(counts, (blocks[ok], nearest[ok]), 1)
+        best = counts.argmax(axis=1)
+        labels = np.where(counts.max(axis=1) >= BLOCK_MATCHES, best, -1)
+
+    # Blocks without any hashes (pauses) can't vote. They take the label of
+    # the nearest voting blocks when both sides agree or there is only one side.
+    has_hashes = np.bincount(
+        np.minimum((fp.times / block_frames).astype(np.int64), n_blocks - 1), minlength=n_blocks,
+    ) > 0
+    voting = np.nonzero(has_hashes)[0]
+    for i in np.nonzero(~has_hashes)[0]:
+        k = np.searchsorted(voting, i)
+        left = labels[voting[k - 1]] if k > 0 else None
+        right = labels[voting[k]] if k < len(voting) else None
+        if left is None:
+            labels[i] = -1 if right is None else right
+        elif right is None or left == right:
+            labels[i] = left
+
+    regions = []
+    start = 0
+    for i in range(1, n_blocks + 1):
+        if i < n_blocks and labels[i] == labels[start]:
+            continue
+        lo, hi = start * BLOCK_SECONDS, min(fp.duration, i * BLOCK_SECONDS)
+        label = int(labels[start])
+        if label < 0:
+            regions.append((Region(lo, hi, None), lo, hi))
+        else:
+            offset = candidates[label]
+            in_blocks = (query_t >= start * block_frames) & (query_t < i * block_frames)
+            times = query_t[in_blocks & (np.abs(offsets - offset) <= 1)] * FRAME_SECONDS
+            first, last = (float(times.min()), float(times.max())) if len(times) else (lo, hi)
+            # Stretches that reach the file's ends are verified up to the ends.
+            first = 0.0 if start == 0 else first
+            last = fp.duration if i == n_blocks else last
+            regions.append((Region(lo, hi, offset * FRAME_SECONDS), first, last))
+        start = i
+    return regions
+
+
+def _shifted(seg: Segment, delta: float) -> Segment:
+    words = None
+    if seg.words is not None:
+        words = [Word(w.start + delta, w.end + delta, w.text, w.confidence) for w in seg.words]
+    return Segment(seg.start + delta, seg.end + delta, seg.text, seg.speaker, seg.gender, words)
+
+
+def plan_edit(
+    fp: Fingerprint,
+    query_t: np.ndarray,
+    stored_t: np.ndarray,
+    previous: TranscriptResult,
+    source: str,
+) -> EditPlan:
+    """Decide which stored segments to keep and which gaps of the new file to transcribe."""
+    aligned = align(fp, query_t, stored_t)
+    plan = EditPlan(source=source, regions=[region for region, _, _ in aligned])
+
+    for region, first, last in aligned:
+        if region.offset is None:
+            continue
+        lo, hi = max(region.start, first - EDGE_SLACK), min(region.end, last + EDGE_SLACK)
+        for seg in previous.segments:
+            moved = _shifted(seg, -region.offset)
+            if moved.start >= lo and moved.end <= hi:
+                plan.kept.append(moved)
+    plan.kept.sort(key=lambda seg: seg.start)
+    # Material repeated in the new version could be kept twice; keep the first.
+    kept: list[Segment] = []
+    for seg in plan.kept:
+        if not kept or seg.start >= kept[-1].end:
+            kept.append(seg)
+    plan.kept = kept
+
+    # Gaps between kept segments need transcription if they touch anything the
+    # old transcript doesn't vouch for; gaps inside unchanged stretches are pauses.
+    verified = [
+        (max(region.start, first - EDGE_SLACK), min(region.end, last + EDGE_SLACK))
+        for region, first, last in aligned if region.offset is not None
+    ]
+    bounds = [0.0, *[t for seg in kept for t in (seg.start, seg.end)], fp.duration]
+    for start, end in zip(bounds[::2], bounds[1::2]):
+        if end - start < MIN_GAP:
+            continue
+        covered = sum(max(0.0, min(end, hi) - max(start, lo)) for lo, hi in verified)
+        if end - start - covered >= MIN_GAP:
+            plan.gaps.append((start, end))
+    return plan
+
+
+def transcribe_plan(
+    provider: BaseProvider,
+    audio_path: Path,
+    plan: EditPlan,
+    previous: TranscriptResult,
+    step: StepProgress | None = None,
+) -> TranscriptResult:
+    """Transcribe the plan's gaps and merge them with the kept segments."""
+    step = step or NullStepProgress()
+    pcm = open_pcm(audio_path)
+    segments = list(plan.kept)
+    language = previous.language
+    throughput = Throughput(len(plan.gaps), "regions")
+    step.advance_to(0, throughput.describe())
+    for start, end in plan.gaps:
+        with tempfile.TemporaryDirectory(prefix="sttcli-edit-") as tmp:
+            clip = Path(tmp) / "region.wav"
+            write_wav(clip, pcm.slice(start, end))
+            result = provider.transcribe(clip, NullStepProgress())
+        segments.extend(_shifted(seg, start) for seg in result.segments if seg.start < end - start)
+        language = language or result.language
+        throughput.add(1, end - start)
+        step.advance_to(throughput.percent, throughput.describe())
+
+    segments.sort(key=lambda seg: seg.start)
+    return TranscriptResult(
+        segments=segments,
+        language=language or provider.language or "",
+        duration=pcm.duration,
+        provider=provider.provider_name,
+        model=provider.model,
+        source_file=str(audio_path),
+    )
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from sttcli.progress import NullStepProgress, StepProgress, Throughput
+from sttcli.providers.base import BaseProvider
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+@dataclass
+class RequestSample:
+    file: str
+    started: float         # seconds since the run started
+    seconds: float
+    audio_seconds: float = 0.0
+    error: str | None = None
+
+
+@dataclass
+class LoadTestReport:
+    provider: str
+    model: str
+    concurrency: int
+    wall_seconds: float = 0.0
+    samples: list[RequestSample] = field(default_factory=list)
+
+    @property
+    def ok(self) -> list[RequestSample]:
+        return [s for s in self.samples if s.error is None]
+
+    def latency(self) -> dict[str, float | None]:
+        """Latency percentiles (nearest rank), mean and max of successful requests."""
+        values = sorted(s.seconds for s in self.ok)
+        if not values:
+            return {**{f"p{q}": None for q in PERCENTILES}, "mean": None, "max": None}
+        n = len(values)
+        stats = {f"p{q}": round(values[min(n - 1, max(0, -(-q * n // 100) - 1))], 3) for q in PERCENTILES}
+        stats["mean"] = round(sum(values) / n, 3)
+        stats["max"] = round(values[-1], 3)
+        return stats
+
+    def errors(self) -> dict[str, int]:
+        return dict(Counter(s.error for s in self.samples if s.error is not None).most_common())
+
+    def to_dict(self) -> dict:
+        ok = self.ok
+        wall = self.wall_seconds or 1e-9
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "requests": len(self.samples),
+            "succeeded": len(ok),
+            "failed": len(self.samples) - len(ok),
+            "concurrency": self.concurrency,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "requests_per_second": round(len(ok) / wall, 3),
+            "audio_seconds_per_second": round(sum(s.audio_seconds for s in ok) / wall, 2),
+            "latency_seconds": self.latency(),
+            "errors": self.errors(),
+        }
+
+
+def _error_label(exc: Exception) -> str:
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    label = type(exc).__name__
+    return f"{label} ({status})" if isinstance(status, int) else label
+
+
+def run_loadtest(
+    provider: BaseProvider,
+    input_paths: list[Path],
+    requests: int,
+    concurrency: int,
+    step: StepProgress | None = None,
+) -> LoadTestReport:
+    """Send requests transcriptions (cycling through input_paths) with concurrency in flight.
+
+    Audio is extracted from video inputs up front so only provider calls are
+    timed. Provider errors are recorded per request instead of aborting the run.
+    """
+    from sttcli.pipeline import prepared_audio
+
+    step = step or NullStepProgress()
+    report = LoadTestReport(provider.provider_name, provider.model, concurrency)
+    throughput = Throughput(requests, "requests")
+    lock = threading.Lock()
+
+    with ExitStack() as stack:
+        audio_paths = [stack.enter_context(prepared_audio(p)) for p in input_paths]
+        start = time.perf_counter()
+
+        def one(i: int) -> None:
+            path = audio_paths[i % len(audio_paths)]
+            t0 = time.perf_counter()
+            sample = RequestSample(file=str(input_paths[i % len(input_paths)]), started=t0 - start, seconds=0.0)
+            try:
+                result = provider.transcribe(path, NullStepProgress())
+                sample.audio_seconds = result.duration
+            except Exception as exc:
+                sample.error = _error_label(exc)
+            sample.seconds = time.perf_counter() - t0
+            with lock:
+                report.samples.append(sample)
+                throughput.add(1, sample.audio_seconds)
+                step.advance_to(throughput.percent, throughput.describe())
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="sttcli-load") as pool:
+            list(pool.map(one, range(requests)))
+        report.wall_seconds = time.perf_counter() - start
+
+    report.samples.sort(key=lambda s: s.started)
+    return report
@@ -1,6 +1,26 @@
 from dataclasses import dataclass, field
 
 
+@dataclass
+class Word:
+    start: float
+    end: float
+    text: str
+    confidence: float | None = field(default=None)   # 0..1 where the provider reports it
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Word":
+        return cls(
+            start=float(data["start"]),
+            end=float(data["end"]),
+            text=data.get("text", ""),
+            confidence=data.get("confidence"),
+        )
+
+    def to_dict(self) -> dict:
+        return {"start": self.start, "end": self.end, "text": self.text, "confidence": self.confidence}
+
+
 @dataclass
 class Segment:
     start: float
@@ -8,6 +28,31 @@ class Segment:
     text: str
     speaker: str | None = field(default=None)
     gender: str | None = field(default=None)
+    words: list[Word] | None = field(default=None)   # word-level timing, when available
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Segment":
+        words = data.get("words")
+        return cls(
+            start=float(data["start"]),
+            end=float(data["end"]),
+            text=data.get("text", ""),
+            speaker=data.get("speaker"),
+            gender=data.get("gender"),
+            words=[Word.from_dict(w) for w in words] if words is not None else None,
+        )
+
+    def to_dict(self) -> dict:
+        d = {
+            "start": self.start,
+            "end": self.end,
+            "text": self.text,
+            "speaker": self.speaker,
+            "gender": self.gender,
+        }
+        if self.words is not None:
+            d["words"] = [w.to_dict() for w in self.words]
+        return d
 
 
 @dataclass
@@ -18,3 +63,25 @@ class TranscriptResult:
     provider: str
     model: str
     source_file: str
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TranscriptResult":
+        """Build a result from JSONFormatter output (or any dict of the same shape)."""
+        return cls(
+            segments=[Segment.from_dict(s) for s in data.get("segments", [])],
+            language=data.get("language") or "",
+            duration=float(data.get("duration") or 0.0),
+            provider=data.get("provider") or "",
+            model=data.get("model") or "",
+            source_file=data.get("source_file") or "",
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "language": self.language,
+            "duration": self.duration,
+            "source_file": self.source_file,
+            "segments": [s.to_dict() for s in self.segments],
+        }
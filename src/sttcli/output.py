@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import io
+import json
+import multiprocessing
+import os
+import string
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from sttcli.formatters import EXTENSIONS, FORMATS, get_formatter
+from sttcli.models import TranscriptResult
+
+# Formats written as bytes rather than through a text formatter
+BINARY_FORMATS = {"stt": "stt"}
+
+# Placeholders accepted in -o templates
+TEMPLATE_FIELDS = {"stem", "ext", "format", "provider", "model"}
+
+# Transcripts with at least this many segments render their formats in
+# separate processes; below it, pickling the result costs more than it saves.
+PARALLEL_SEGMENTS = 20_000
+
+
+def parse_formats(spec: str) -> list[str]:
+    """Parse "srt,json,markdown" into a de-duplicated list of format names."""
+    formats: list[str] = []
+    for name in (part.strip() for part in spec.split(",")):
+        if not name:
+            continue
+        if name not in FORMATS and name not in BINARY_FORMATS:
+            choices = ", ".join((*FORMATS, *BINARY_FORMATS))
+            raise ValueError(f"Unknown format: {name} (choose from {choices})")
+        if name not in formats:
+            formats.append(name)
+    if not formats:
+        raise ValueError("No output format given.")
+    return formats
+
+
+def template_fields(template: str) -> set[str]:
+    """Return the placeholder names used in template, rejecting unknown ones."""
+    fields = {name for _, name, _, _ in string.Formatter().parse(template) if name is not None}
+    unknown = fields - TEMPLATE_FIELDS
+    if unknown:
+        raise ValueError(
+            f"Unknown placeholder(s) in output template: {', '.join(sorted(unknown))} "
+            f"(available: {', '.join(sorted(TEMPLATE_FIELDS))})"
+        )
+    return fields
+
+
+def output_paths(
+    template: str,
+    formats: list[str],
+    input_path: Path,
+    provider: str = "",
+    model: str = "",
+) -> dict[str, Path]:
+    """Expand an output template such as "out/{stem}.{ext}" once per format."""
+    fields = template_fields(template)
+    if len(formats) > 1 and not fields & {"ext", "format"}:
+        raise ValueError("With several formats the output template needs {ext} or {format}.")
+    return {
+        fmt: Path(template.format(
+            stem=input_path.stem,
+            ext=EXTENSIONS.get(fmt) or BINARY_FORMATS[fmt],
+            format=fmt,
+            provider=provider,
+            model=model.replace("/", "-"),
+        ))
+        for fmt in formats
+    }
+
+
+def write_atomic(path: Path, data: str | bytes) -> None:
+    """Write to path via a temporary file and rename, so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        if isinstance(data, bytes):
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def render(result: TranscriptResult, fmt: str) -> str | bytes:
+    """Render result in one format; binary formats return bytes."""
+    if fmt == "stt":
+        from sttcli.binary import dump_result
+
+        buf = io.BytesIO()
+        dump_result(result, buf)
+        return buf.getvalue()
+    return get_formatter(fmt)().format(result)
+
+
+def load_transcript(path: Path) -> TranscriptResult:
+    """Load a saved transcript: a .stt binary file or JSONFormatter output."""
+    from sttcli.binary import is_stt_file, read_result
+
+    if is_stt_file(path):
+        return read_result(path)
+    with open(path, encoding="utf-8") as f:
+        return TranscriptResult.from_dict(json.load(f))
+
+
+def _render_to(result: TranscriptResult, fmt: str, path: Path) -> None:
+    write_atomic(path, render(result, fmt))
+
+
+def render_outputs(result: TranscriptResult, paths: dict[str, Path]) -> None:
+    """Render every requested format from one result and write each file atomically.
+
+    Formatters are pure Python, so threads would not run them in parallel
+    under the GIL. Huge transcripts (PARALLEL_SEGMENTS or more) are rendered
+    in one process per format; everything else renders sequentially.
+    Worker processes are spawned, not forked: batch jobs call this from pool
+    threads, and a fork while another thread holds a lock (HTTP clients,
+    logging, SQLite) can deadlock the child.
+    """
+    workers = min(len(paths), os.cpu_count() or 1)
+    if workers < 2 or len(result.segments) < PARALLEL_SEGMENTS:
+        for fmt, path in paths.items():
+            _render_to(result, fmt, path)
+        return
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(_render_to, result, fmt, path) for fmt, path in paths.items()]
+        for future in futures:
+            # Re-raises the first formatter or write error
+            future.result()
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+import threading
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from sttcli.audio import content_hash
+from sttcli.config import load_config
+
+SAMPLE_RATE = 16000
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "sttcli" / "pcm"
+DEFAULT_MAX_BYTES = 4 * 1024**3   # 4 GB
+
+# Fixed .npy header length so data can be streamed before the length is known
+_NPY_HEADER_LEN = 128
+
+
+def _npy_header(n_samples: int) -> bytes:
+    """Return a 128-byte .npy v1.0 header for a 1-D little-endian float32 array."""
+    header = repr({"descr": "<f4", "fortran_order": False, "shape": (n_samples,)})
+    pad = _NPY_HEADER_LEN - 10 - len(header) - 1
+    body = (header + " " * pad + "\n").encode("latin1")
+    return b"\x93NUMPY\x01\x00" + (len(body)).to_bytes(2, "little") + body
+
+
+class PCMAudio:
+    """Mono 16 kHz float32 samples backed by a memory map.
+
+    Slicing only touches the requested pages, so per-segment consumers
+    (gender detection, chunking) never load the whole file.
+    """
+
+    def __init__(self, samples: np.ndarray, scale: float | None = None):
+        self._samples = samples
+        self._scale = scale     # int16 WAV data is scaled to float32 on access
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    @property
+    def duration(self) -> float:
+        return len(self._samples) / SAMPLE_RATE
+
+    def slice(self, start: float | None = None, end: float | None = None) -> np.ndarray:
+        """Return samples in [start, end) seconds as a float32 array."""
+        lo = 0 if start is None else max(0, int(start * SAMPLE_RATE))
+        hi = len(self._samples) if end is None else min(len(self._samples), int(end * SAMPLE_RATE))
+        data = self._samples[lo:max(lo, hi)]
+        if self._scale is not None:
+            return data.astype(np.float32) * self._scale
+        return np.array(data, dtype=np.float32)
+
+    def samples(self) -> np.ndarray:
+        """Return the whole signal (e.g. to feed Whisper an array instead of a path)."""
+        return self.slice()
+
+
+def _open_pcm_wav(path: Path) -> PCMAudio | None:
+    """Map a 16 kHz mono s16le WAV directly, or return None if it is not one."""
+    try:
+        with open(path, "rb") as f:
+            if f.read(4) != b"RIFF":
+                return None
+            f.read(4)
+            if f.read(4) != b"WAVE":
+                return None
+            fmt_ok = False
+            while header := f.read(8):
+                if len(header) < 8:
+                    return None
+                chunk_id, size = header[:4], int.from_bytes(header[4:], "little")
+                if chunk_id == b"fmt ":
+                    fmt = f.read(size + size % 2)
+                    tag, channels, rate = (
+                        int.from_bytes(fmt[0:2], "little"),
+                        int.from_bytes(fmt[2:4], "little"),
+                        int.from_bytes(fmt[4:8], "little"),
+                    )
+                    bits = int.from_bytes(fmt[14:16], "little")
+                    fmt_ok = (tag, channels, rate, bits) == (1, 1, SAMPLE_RATE, 16)
+                elif chunk_id == b"data":
+                    if not fmt_ok:
+                        return None
+                    offset = f.tell()
+                    file_size = os.fstat(f.fileno()).st_size
+                    # ffmpeg writes a placeholder size when streaming; trust the file length
+                    n_samples = (min(size, file_size - offset)) // 2
+                    break
+                else:
+                    f.seek(size + size % 2, os.SEEK_CUR)
+            else:
+                return None
+    except OSError:
+        return None
+    if n_samples <= 0:
+        return PCMAudio(np.zeros(0, dtype=np.float32))
+    data = np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(n_samples,))
+    return PCMAudio(data, scale=1.0 / 32768.0)
+
+
+class PCMCache:
+    """Content-addressed cache of decoded audio as memory-mapped .npy files.
+
+    Every input is decoded by ffmpeg at most once; Whisper, gender detection
+    and chunking all read the same artifact. Least-recently-used entries are
+    evicted once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._keys: dict[tuple[str, int, int], str] = {}
+        self._open: dict[str, PCMAudio] = {}
+        self._key_locks: dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, path: Path) -> str:
+        st = path.stat()
+        memo = (str(path.resolve()), st.st_size, st.st_mtime_ns)
+        key = self._keys.get(memo)
+        if key is None:
+            key = content_hash(path)
+            self._keys[memo] = key
+        return key
+
+    def open(self, path: Path) -> PCMAudio:
+        wav = _open_pcm_wav(path)
+        if wav is not None:
+            # Already 16 kHz mono PCM (e.g. audio extracted from video or a
+            # chunk clip): read it in place instead of caching a second copy.
+            return wav
+
+        key = self._key(path)
+        with self._lock:
+            cached = self._open.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Decode outside the cache-wide lock so different inputs decode in parallel.
+        with key_lock:
+            with self._lock:
+                cached = self._open.get(key)
+                if cached is not None:
+                    self.hits += 1
+                    return cached
+
+            npy = self.cache_dir / f"{key}.npy"
+            if npy.exists():
+                os.utime(npy)
+                hit = True
+            else:
+                self._decode(path, npy)
+                hit = False
+
+            audio = PCMAudio(np.load(npy, mmap_mode="r"))
+            with self._lock:
+                if hit:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                    self._evict(keep=npy)
+                self._open[key] = audio
+            return audio
+
+    def _decode(self, path: Path, npy: Path) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        cmd = [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-i", str(path), "-vn",
+            "-f", "s16le", "-ar", str(SAMPLE_RATE), "-ac", "1", "pipe:1",
+        ]
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=".decode-", suffix=".npy")
+        try:
+            n_samples = 0
+            with os.fdopen(fd, "wb") as out:
+                out.write(b"\0" * _NPY_HEADER_LEN)
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                pending = b""
+                while block := proc.stdout.read(1 << 20):
+                    block = pending + block
+                    usable = len(block) - len(block) % 2
+                    pending = block[usable:]
+                    samples = np.frombuffer(block[:usable], dtype="<i2").astype("<f4") / 32768.0
+                    out.write(samples.tobytes())
+                    n_samples += len(samples)
+                stderr = proc.stderr.read()
+                if proc.wait() != 0:
+                    raise RuntimeError(f"ffmpeg decoding failed: {stderr.decode(errors='replace')}")
+                out.seek(0)
+                out.write(_npy_header(n_samples))
+            os.replace(tmp, npy)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _evict(self, keep: Path) -> None:
+        entries = []
+        for p in self.cache_dir.glob("*.npy"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if p == keep:
+                continue
+            p.unlink(missing_ok=True)
+            self._open.pop(p.stem, None)
+            self._key_locks.pop(p.stem, None)
+            total -= size
+
+
+_default_cache: PCMCache | None = None
+_default_lock = threading.Lock()
+
+
+def _cache_from_config(config_path: Path | None) -> PCMCache:
+    section = load_config(config_path).get("cache", {})
+    cache_dir = Path(section["dir"]).expanduser() if section.get("dir") else DEFAULT_CACHE_DIR
+    max_bytes = int(float(section.get("max_gb", DEFAULT_MAX_BYTES / 1024**3)) * 1024**3)
+    return PCMCache(cache_dir, max_bytes)
+
+
+def default_cache(config_path: Path | None = None) -> PCMCache:
+    """Return the process-wide cache configured from the [cache] config section."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = _cache_from_config(config_path)
+        return _default_cache
+
+
+def configure_cache(config_path: Path | None) -> PCMCache:
+    """(Re)build the process-wide cache from config_path, e.g. a --config file."""
+    global _default_cache
+    with _default_lock:
+        _default_cache = _cache_from_config(config_path)
+        return _default_cache
+
+
+def open_pcm(path: Path | str) -> PCMAudio:
+    """Decoded mono 16 kHz float32 audio for path, via the shared cache."""
+    return default_cache().open(Path(path))
+
+
+def write_wav(path: Path, samples: np.ndarray) -> None:
+    """Write float32 samples as a 16 kHz mono s16le WAV file."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(pcm.tobytes())
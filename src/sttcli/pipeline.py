@@ -0,0 +1,481 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator
+
+from rich.progress import Progress
+
+from sttcli.audio import channel_count, extract_audio, extract_channel, get_duration, is_video
+from sttcli.benchmark import DIARIZE_SUPPORTED
+from sttcli.checkpoint import transcribe_chunked
+from sttcli.diarize import diarize_segments
+from sttcli.ensemble import run_ensemble
+from sttcli.gender import detect_gender, detect_genders_per_speaker
+from sttcli.models import Segment, TranscriptResult
+from sttcli.progress import NullStepProgress, StepProgress, Throughput
+from sttcli.providers.base import BaseProvider
+from sttcli.scheduler import AdmissionQueue, Scheduler
+from sttcli.telemetry import STAGE_SECONDS, record_job
+
+if TYPE_CHECKING:
+    from sttcli.fingerprint import FingerprintIndex
+    from sttcli.incremental import EditPlan
+
+
+def _step(progress: Progress | None, description: str) -> StepProgress:
+    if progress is None:
+        return NullStepProgress(description)
+    return StepProgress(progress, description, total=100)
+
+
+def apply_genders(result: TranscriptResult, audio_path: Path, progress: Progress | None = None) -> None:
+    """Fill in Segment.gender via pitch analysis unless the provider already did."""
+    # Skip pitch-based detection if the provider already supplied gender
+    # (e.g. Gemini returns it directly from the transcription call).
+    already_detected = any(seg.gender for seg in result.segments)
+    if already_detected:
+        gender_step = _step(progress, "Gender detected by provider")
+        gender_step.advance_to(100, "Done")
+        return
+
+    gender_step = _step(progress, "Detecting speaker gender...")
+    gender_step.advance_to(0)
+    has_speakers = any(seg.speaker for seg in result.segments)
+    with STAGE_SECONDS.time(stage="gender"):
+        if has_speakers:
+            genders = detect_genders_per_speaker(str(audio_path), result.segments)
+            for seg in result.segments:
+                if seg.speaker and seg.speaker in genders:
+                    seg.gender = genders[seg.speaker]
+        else:
+            detected = detect_gender(str(audio_path))
+            for seg in result.segments:
+                seg.gender = detected
+    gender_step.advance_to(100, "Done")
+
+
+def apply_diarization(
+    result: TranscriptResult,
+    audio_path: Path,
+    num_speakers: int | None = None,
+    progress: Progress | None = None,
+) -> None:
+    """Label Segment.speaker locally for providers without native diarization."""
+    diarize_step = _step(progress, "Diarizing speakers...")
+    diarize_step.advance_to(0)
+    with STAGE_SECONDS.time(stage="diarize"):
+        found = diarize_segments(str(audio_path), result.segments, num_speakers)
+    diarize_step.advance_to(100, f"{found} speaker(s) found")
+
+
+@contextmanager
+def prepared_audio(
+    input_path: Path,
+    progress: Progress | None = None,
+    provider: BaseProvider | None = None,
+) -> Iterator[Path]:
+    """Yield an audio path for input_path, extracting (and later removing) video audio.
+
+    A provider that decodes samples itself (local Whisper) gets the video as
+    is; the PCM cache decodes it once for the provider and the later stages.
+    For API providers the audio track is stream-copied when the provider
+    accepts its codec. Without a provider, audio is decoded to WAV.
+    """
+    if not is_video(input_path) or (provider is not None and not provider.upload_formats):
+        yield input_path
+        return
+
+    extract_step = _step(progress, "Extracting audio...")
+    extract_step.advance_to(0)
+    with STAGE_SECONDS.time(stage="extract"):
+        audio_path, is_temp = extract_audio(input_path, copy_formats=provider.upload_formats if provider else ())
+    extract_step.advance_to(100, "Audio extracted")
+    try:
+        yield audio_path
+    finally:
+        if is_temp and audio_path.exists():
+            audio_path.unlink()
+
+
+@contextmanager
+def channel_audio(input_path: Path, progress: Progress | None = None) -> Iterator[list[Path]]:
+    """Yield one temporary mono WAV per channel of input_path, removed afterwards."""
+    channels = channel_count(input_path)
+    if channels < 2:
+        raise ValueError(f"{input_path.name} has {channels} audio channel(s); splitting needs at least 2.")
+
+    split_step = _step(progress, f"Splitting {channels} channels...")
+    split_step.advance_to(0)
+    with ThreadPoolExecutor(max_workers=channels, thread_name_prefix="sttcli-split") as pool:
+        futures = [pool.submit(extract_channel, input_path, c) for c in range(channels)]
+    paths = [f.result() for f in futures if f.exception() is None]
+    try:
+        errors = [f.exception() for f in futures if f.exception() is not None]
+        if errors:
+            raise errors[0]
+        split_step.advance_to(100, f"{channels} channels")
+        yield paths
+    finally:
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+
+def merge_channels(results: list[TranscriptResult], source_file: str) -> TranscriptResult:
+    """Interleave per-channel results (speakers already labelled) into one time-ordered result."""
+    segments: list[Segment] = sorted(
+        (seg for result in results for seg in result.segments), key=lambda seg: (seg.start, seg.end),
+    )
+    return TranscriptResult(
+        segments=segments,
+        language=next((r.language for r in results if r.language), results[0].language),
+        duration=max(r.duration for r in results),
+        provider=results[0].provider,
+        model=results[0].model,
+        source_file=source_file,
+    )
+
+
+def transcribe_channels(
+    provider: BaseProvider,
+    input_path: Path,
+    progress: Progress | None = None,
+) -> TranscriptResult:
+    """Transcribe each channel of a multichannel recording in parallel.
+
+    Each channel is one party (e.g. call-center recordings), so segments are
+    labelled "channel_0", "channel_1", ... as their speaker and no
+    diarization runs. Gender is detected per channel.
+    """
+    with channel_audio(input_path, progress) as channel_paths:
+        def one(channel: int) -> TranscriptResult:
+            path = channel_paths[channel]
+            result = provider.transcribe(path, _step(progress, f"[channel {channel}] Transcribing..."))
+            for seg in result.segments:
+                seg.speaker = f"channel_{channel}"
+            apply_genders(result, path)
+            return result
+
+        with ThreadPoolExecutor(max_workers=len(channel_paths), thread_name_prefix="sttcli-channel") as pool:
+            results = list(pool.map(one, range(len(channel_paths))))
+    return merge_channels(results, str(input_path))
+
+
+def transcribe_file(
+    provider: BaseProvider,
+    input_path: Path,
+    progress: Progress | None = None,
+    chunk_seconds: float | None = None,
+    job_root: Path | None = None,
+    resume: bool = True,
+) -> TranscriptResult:
+    """Extract audio if needed, transcribe it and detect speaker gender.
+
+    Temporary audio extracted from video is removed before returning.
+    Pass progress=None to run without a progress UI (e.g. from the server).
+    With chunk_seconds set, audio is transcribed in checkpointed chunks that a
+    later run with the same input and options resumes from. Providers without
+    native diarization are diarized locally (see sttcli.diarize).
+    """
+    with prepared_audio(input_path, progress, provider) as audio_path:
+        trans_step = _step(progress, "Transcribing...")
+        with STAGE_SECONDS.time(stage="transcribe"):
+            if chunk_seconds:
+                result = transcribe_chunked(
+                    provider, audio_path, chunk_seconds, trans_step,
+                    job_root=job_root, resume=resume, source_path=input_path,
+                )
+            else:
+                result = provider.transcribe(audio_path, trans_step)
+
+        if provider.diarize and provider.provider_name not in DIARIZE_SUPPORTED:
+            apply_diarization(result, audio_path, provider.num_speakers, progress)
+        apply_genders(result, audio_path, progress)
+
+    return result
+
+
+def transcribe_incremental(
+    provider: BaseProvider,
+    input_path: Path,
+    index: FingerprintIndex,
+    progress: Progress | None = None,
+    on_plan: Callable[[EditPlan], None] | None = None,
+) -> TranscriptResult:
+    """Transcribe an edited recording, reusing an earlier version's transcript where the audio is unchanged.
+
+    The earlier version is found in the fingerprint index; only regions that
+    were added or changed are sent to the provider (see sttcli.incremental).
+    Without an earlier version the whole file is transcribed. Either way the
+    result is stored in the index for the next edit.
+    """
+    from sttcli.audio import content_hash
+    from sttcli.fingerprint import fingerprint_file, transcript_variant
+    from sttcli.incremental import plan_edit, transcribe_plan
+
+    variant = transcript_variant(provider)
+    with prepared_audio(input_path, progress, provider) as audio_path:
+        align_step = _step(progress, "Aligning with earlier versions...")
+        align_step.advance_to(0)
+        fp = fingerprint_file(audio_path)
+        plan = previous = None
+        for match in index.lookup(fp):
+            previous = index.transcript(match.file_id, variant)
+            if previous is not None:
+                plan = plan_edit(fp, *index.matched_times(fp, match.file_id), previous, match.path)
+                break
+        align_step.advance_to(100, "Earlier version found" if plan else "No earlier version")
+
+        trans_step = _step(progress, "Transcribing...")
+        if plan is None:
+            result = provider.transcribe(audio_path, trans_step)
+        else:
+            if on_plan is not None:
+                on_plan(plan)
+            result = transcribe_plan(provider, audio_path, plan, previous, trans_step)
+            if not all(seg.gender for seg in result.segments):
+                # Kept segments carry genders and new ones don't; detect them all afresh.
+                for seg in result.segments:
+                    seg.gender = None
+
+        if provider.diarize and provider.provider_name not in DIARIZE_SUPPORTED:
+            apply_diarization(result, audio_path, provider.num_speakers, progress)
+        apply_genders(result, audio_path, progress)
+
+    result.source_file = str(input_path)
+    index.put_transcript(index.add(content_hash(input_path), str(input_path), fp), variant, result)
+    return result
+
+
+def transcribe_ensemble(
+    providers: list[BaseProvider],
+    input_path: Path,
+    progress: Progress | None = None,
+    diarize: bool = False,
+    num_speakers: int | None = None,
+) -> TranscriptResult:
+    """Run several providers concurrently and merge them by word voting (see sttcli.ensemble)."""
+    with prepared_audio(input_path, progress) as audio_path:
+        result = run_ensemble(
+            providers, audio_path,
+            step_factory=lambda label: _step(progress, f"[{label}] Transcribing..."),
+        )
+        if diarize:
+            apply_diarization(result, audio_path, num_speakers, progress)
+        apply_genders(result, audio_path, progress)
+    return result
+
+
+def transcribe_batch(
+    provider: BaseProvider,
+    input_paths: list[Path],
+    progress: Progress | None = None,
+    batch_size: int = 16,
+    dedup: FingerprintIndex | None = None,
+    on_duplicate: Callable[[Path, str, float], None] | None = None,
+    scheduler: Scheduler | None = None,
+    on_result: Callable[[Path, TranscriptResult], None] | None = None,
+    on_error: Callable[[Path, Exception], None] | None = None,
+) -> list[TranscriptResult | None]:
+    """Transcribe many files with one provider, returning results in input order.
+
+    Providers with a transcribe_batch method (local Whisper) decode short
+    clips together; others transcribe files concurrently, as many at a time
+    as the scheduler admits (one at a time without one). With a dedup
+    index, inputs that are copies of another input or of an indexed
+    recording reuse its transcript; on_duplicate(path, source, offset) is
+    called for each.
+
+    A file that fails does not stop the batch: its result is None and
+    on_error(path, exc) is called. on_result(path, result) is called as soon
+    as each file is done (e.g. to write its outputs); an error it raises
+    counts as that file's failure.
+    """
+    if dedup is not None:
+        return _transcribe_deduplicated(
+            provider, input_paths, progress, batch_size, dedup, on_duplicate, scheduler, on_result, on_error,
+        )
+    results: list[TranscriptResult | None] = [None] * len(input_paths)
+
+    def fail(i: int, exc: Exception) -> None:
+        record_job(provider.provider_name, provider.model, "failed")
+        if on_error is not None:
+            on_error(input_paths[i], exc)
+
+    def finish(i: int, result: TranscriptResult, seconds: float = 0.0) -> None:
+        path = input_paths[i]
+        try:
+            result.source_file = str(path)
+            if provider.diarize and provider.provider_name not in DIARIZE_SUPPORTED:
+                apply_diarization(result, path, provider.num_speakers)
+            apply_genders(result, path)
+            if on_result is not None:
+                on_result(path, result)
+        except Exception as exc:
+            fail(i, exc)
+            return
+        record_job(provider.provider_name, provider.model, "done", result.duration, seconds)
+        results[i] = result
+
+    step = _step(progress, f"Transcribing {len(input_paths)} file(s)...")
+    step.advance_to(0)
+    batch = getattr(provider, "transcribe_batch", None)
+    if batch is not None:
+        def done(i: int, outcome: TranscriptResult | Exception) -> None:
+            if isinstance(outcome, Exception):
+                fail(i, outcome)
+                return
+            # Files are decoded together, so there is no per-file wall time to report.
+            finish(i, outcome)
+
+        batch(input_paths, step, batch_size, on_done=done)
+    else:
+        throughput = Throughput(len(input_paths))
+        lock = threading.Lock()
+
+        def one(i: int) -> None:
+            try:
+                start = time.monotonic()
+                with prepared_audio(input_paths[i], provider=provider) as audio_path:
+                    result = provider.transcribe(audio_path, NullStepProgress())
+                seconds = time.monotonic() - start
+            except Exception as exc:
+                fail(i, exc)
+                duration = 0.0
+            else:
+                finish(i, result, seconds)
+                duration = result.duration
+            with lock:
+                throughput.add(1, duration)
+                step.advance_to(throughput.percent, throughput.describe())
+
+        workers = min(len(input_paths), scheduler.workers) if scheduler else 1
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="sttcli-batch") as pool:
+            if scheduler is None:
+                list(pool.map(one, range(len(input_paths))))
+            else:
+                # Files wait for admission in the queue, not in pool workers.
+                queue = AdmissionQueue(scheduler, pool)
+
+                def duration_of(path: Path) -> float | Exception:
+                    try:
+                        return get_duration(path)
+                    except Exception as exc:
+                        return exc
+
+                futures = []
+                for i, duration in enumerate(pool.map(duration_of, input_paths)):
+                    if isinstance(duration, Exception):
+                        fail(i, duration)
+                        with lock:
+                            throughput.add(1, 0.0)
+                            step.advance_to(throughput.percent, throughput.describe())
+                    else:
+                        futures.append(queue.submit(scheduler.cost(provider, duration), one, i))
+                for future in futures:
+                    future.result()
+    return results
+
+
+def _transcribe_deduplicated(
+    provider: BaseProvider,
+    input_paths: list[Path],
+    progress: Progress | None,
+    batch_size: int,
+    dedup: FingerprintIndex,
+    on_duplicate: Callable[[Path, str, float], None] | None,
+    scheduler: Scheduler | None,
+    on_result: Callable[[Path, TranscriptResult], None] | None,
+    on_error: Callable[[Path, Exception], None] | None,
+) -> list[TranscriptResult | None]:
+    from sttcli.audio import content_hash
+    from sttcli.fingerprint import fingerprint_file, shift_result, transcript_variant
+
+    results: dict[int, TranscriptResult] = {}
+    errors: dict[int, Exception] = {}
+
+    def fail(i: int, exc: Exception) -> None:
+        errors[i] = exc
+        record_job(provider.provider_name, provider.model, "failed")
+        if on_error is not None:
+            on_error(input_paths[i], exc)
+
+    def reuse(i: int, result: TranscriptResult) -> None:
+        try:
+            if on_result is not None:
+                on_result(input_paths[i], result)
+        except Exception as exc:
+            fail(i, exc)
+            return
+        record_job(provider.provider_name, provider.model, "deduplicated")
+        results[i] = result
+
+    step = _step(progress, f"Fingerprinting {len(input_paths)} file(s)...")
+    fingerprints = {}
+    for i, path in enumerate(input_paths):
+        try:
+            with STAGE_SECONDS.time(stage="fingerprint"):
+                fingerprints[i] = fingerprint_file(path)
+        except Exception as exc:
+            fail(i, exc)
+        step.advance_to(100 * (i + 1) / len(input_paths))
+
+    variant = transcript_variant(provider)
+    copies: dict[int, tuple[int, float]] = {}       # input -> (representative input, offset)
+    representatives: dict[int, int] = {}            # index file id -> input
+    # Longest first, so a trimmed copy finds its full-length original already indexed.
+    for i in sorted(fingerprints, key=lambda i: fingerprints[i].duration, reverse=True):
+        path, fp = input_paths[i], fingerprints[i]
+        for match in dedup.lookup(fp):
+            if not match.covers(fp.duration):
+                continue
+            if match.file_id in representatives:
+                copies[i] = (representatives[match.file_id], match.offset)
+                source = str(input_paths[representatives[match.file_id]])
+            elif (stored := dedup.transcript(match.file_id, variant)) is not None:
+                reuse(i, shift_result(stored, match.offset, fp.duration, str(path)))
+                source = match.path
+            else:
+                continue
+            if on_duplicate is not None:
+                on_duplicate(path, source, match.offset)
+            break
+        else:
+            file_id = dedup.add(content_hash(path), str(path), fp)
+            if file_id not in representatives:
+                representatives[file_id] = i
+                continue
+            # Byte-identical to an earlier input whose audio had too few
+            # landmarks to match (e.g. silence): same file id, same transcript.
+            copies[i] = (representatives[file_id], 0.0)
+            if on_duplicate is not None:
+                on_duplicate(path, str(input_paths[representatives[file_id]]), 0.0)
+
+    unique = sorted(representatives.items(), key=lambda item: item[1])
+    positions = {input_paths[i]: i for _, i in unique}
+
+    def representative_failed(path: Path, exc: Exception) -> None:
+        # transcribe_batch already counted the failure.
+        errors[positions[path]] = exc
+        if on_error is not None:
+            on_error(path, exc)
+
+    transcribed = transcribe_batch(
+        provider, [input_paths[i] for _, i in unique], progress, batch_size, scheduler=scheduler,
+        on_result=on_result, on_error=representative_failed,
+    )
+    for (file_id, i), result in zip(unique, transcribed):
+        if result is None:
+            continue
+        dedup.put_transcript(file_id, variant, result)
+        results[i] = result
+    for i, (source, offset) in copies.items():
+        if source in results:
+            reuse(i, shift_result(results[source], offset, fingerprints[i].duration, str(input_paths[i])))
+        else:
+            # The copy fails with its representative.
+            fail(i, errors[source])
+    return [results.get(i) for i in range(len(input_paths))]
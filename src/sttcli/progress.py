@@ -1,8 +1,14 @@
+import io
+import os
+import re
+import time
 from contextlib import contextmanager
 
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TaskProgressColumn
 
+from sttcli.telemetry import UPLOAD_BYTES
+
 
 @contextmanager
 def make_progress():
@@ -18,16 +24,148 @@ def make_progress():
         yield progress
 
 
+# Minimum seconds between forwarded updates; inference and upload loops may
+# report far more often than the display refreshes (10 times a second).
+# Only updates that change numbers alone are throttled (including counters
+# inside the label, such as "3.2/40.0 MB"); a new label is always shown.
+MIN_UPDATE_INTERVAL = 0.1
+
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+def _label(description: str | None) -> str | None:
+    """description with its numbers blanked, so counter ticks compare equal."""
+    return None if description is None else _NUMBER_RE.sub("#", description)
+
+
 class StepProgress:
     def __init__(self, progress: Progress, description: str, total: int = 100):
         self.progress = progress
+        self.total = total
         self.task_id = progress.add_task(description, total=total)
+        self._last_update = 0.0
+        self._label = _label(description)
 
     def update(self, completed: int, description: str | None = None):
+        now = time.monotonic()
+        relabel = description is not None and _label(description) != self._label
+        if not relabel and completed < self.total and now - self._last_update < MIN_UPDATE_INTERVAL:
+            return
+        self._last_update = now
         kwargs = {"completed": completed}
         if description is not None:
             kwargs["description"] = description
+            self._label = _label(description)
         self.progress.update(self.task_id, **kwargs)
 
     def advance_to(self, pct: int, description: str | None = None):
         self.update(pct, description)
+
+
+class NullStepProgress(StepProgress):
+    """StepProgress that discards all updates (used when no progress UI is shown)."""
+
+    def __init__(self, description: str = "", total: int = 100):
+        self.progress = None
+        self.task_id = None
+
+    def update(self, completed: int, description: str | None = None):
+        pass
+
+
+def _clock(seconds: float) -> str:
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    return f"{h}:{rem // 60:02d}:{rem % 60:02d}" if h else f"{rem // 60}:{rem % 60:02d}"
+
+
+class Throughput:
+    """Combined rate and ETA for a run over many items (files, clips, providers)."""
+
+    def __init__(self, total: int, unit: str = "files"):
+        self.total = total
+        self.unit = unit
+        self.done = 0
+        self.audio_seconds = 0.0
+        self._start = time.monotonic()
+
+    def add(self, count: int = 1, audio_seconds: float = 0.0) -> None:
+        self.done += count
+        self.audio_seconds += audio_seconds
+
+    @property
+    def percent(self) -> int:
+        return int(100 * self.done / self.total) if self.total else 100
+
+    def describe(self) -> str:
+        """E.g. "12/100 files · 3.40 files/s · 41.2× realtime · ETA 0:26"."""
+        parts = [f"{self.done}/{self.total} {self.unit}"]
+        elapsed = time.monotonic() - self._start
+        if self.done and elapsed > 0:
+            rate = self.done / elapsed
+            parts.append(f"{rate:.2f} {self.unit}/s")
+            if self.audio_seconds:
+                parts.append(f"{self.audio_seconds / elapsed:.1f}× realtime")
+            if self.done < self.total:
+                parts.append(f"ETA {_clock((self.total - self.done) / rate)}")
+        return " · ".join(parts)
+
+
+class UploadReader(io.RawIOBase):
+    """Binary file wrapper that reports upload progress as the HTTP client reads it.
+
+    Read position is reported as bytes sent, mapped onto [start, end] percent
+    of step; a client that rewinds to retry simply moves the bar back.
+    """
+
+    def __init__(
+        self, fh, step: StepProgress, description: str, start: int = 10, end: int = 80, provider: str = "",
+    ):
+        super().__init__()
+        self._fh = fh
+        self._provider = provider
+        self._step = step
+        self._description = description
+        self._start = start
+        self._end = end
+        self._size = os.fstat(fh.fileno()).st_size
+        self.name = getattr(fh, "name", None)
+        self.mode = getattr(fh, "mode", "rb")
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return self._fh.seekable()
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._fh.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._fh.tell()
+
+    def fileno(self) -> int:
+        return self._fh.fileno()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._fh.read(size)
+        UPLOAD_BYTES.inc(len(data), provider=self._provider)
+        self._report()
+        return data
+
+    def readinto(self, buffer) -> int:
+        n = self._fh.readinto(buffer)
+        UPLOAD_BYTES.inc(n or 0, provider=self._provider)
+        self._report()
+        return n
+
+    def _report(self) -> None:
+        if not self._size:
+            return
+        sent = min(self._fh.tell(), self._size)
+        pct = self._start + (self._end - self._start) * sent // self._size
+        if sent < self._size:
+            self._step.advance_to(pct, f"{self._description} {sent / 1e6:.1f}/{self._size / 1e6:.1f} MB")
+        else:
+            # The response only arrives once the provider has transcribed everything
+            self._step.advance_to(pct, "Uploaded, waiting for transcript...")
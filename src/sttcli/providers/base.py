@@ -6,13 +6,22 @@ from sttcli.progress import StepProgress
 
 
 class BaseProvider(ABC):
-    def __init__(self, model: str | None = None, language: str | None = None, api_key: str | None = None, device: str = "cpu", diarize: bool = False, num_speakers: int | None = None):
+    # Containers the provider's API accepts as uploads. Audio in a video is
+    # stream-copied into one of them when its codec allows instead of being
+    # re-encoded; empty means the provider decodes samples itself (sttcli.pcm).
+    upload_formats: tuple[str, ...] = ()
+
+    def __init__(self, model: str | None = None, language: str | None = None, api_key: str | None = None, device: str = "cpu", diarize: bool = False, num_speakers: int | None = None, word_timestamps: bool = False, base_url: str | None = None):
         self.model = model or self.default_model
         self.language = language
         self.api_key = api_key
         self.device = device
         self.diarize = diarize
         self.num_speakers = num_speakers
+        # Request word-level timing (Segment.words) where the provider supports it
+        self.word_timestamps = word_timestamps
+        # API endpoint override (None keeps the SDK default)
+        self.base_url = base_url
 
     @property
     @abstractmethod
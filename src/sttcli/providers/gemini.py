@@ -1,9 +1,22 @@
+import mimetypes
 import time
+from functools import lru_cache
 from pathlib import Path
 
 from sttcli.models import Segment, TranscriptResult
-from sttcli.progress import StepProgress
+from sttcli.progress import StepProgress, UploadReader
 from sttcli.providers.base import BaseProvider
+from sttcli.telemetry import UPLOAD_BYTES
+
+
+@lru_cache(maxsize=8)
+def _client(api_key: str | None, base_url: str | None = None):
+    """Return a shared Gemini client per API key and endpoint (reuses HTTP connections)."""
+    from google import genai
+
+    if base_url:
+        return genai.Client(api_key=api_key, http_options={"base_url": base_url})
+    return genai.Client(api_key=api_key)
 
 
 def _mmss_to_seconds(ts: str) -> float:
@@ -47,6 +60,8 @@ _RESPONSE_SCHEMA_DIARIZE = {
 
 
 class GeminiProvider(BaseProvider):
+    upload_formats = ("aac", "mp3", "ogg", "flac", "wav")
+
     @property
     def default_model(self) -> str:
         return "gemini-2.5-flash"
@@ -56,13 +71,19 @@ class GeminiProvider(BaseProvider):
         return "gemini"
 
     def transcribe(self, audio_path: Path, step: StepProgress) -> TranscriptResult:
-        from google import genai
         from google.genai import types
 
-        client = genai.Client(api_key=self.api_key)
+        client = _client(self.api_key, self.base_url)
 
         step.advance_to(10, "Uploading audio to Gemini...")
-        uploaded = client.files.upload(file=audio_path)
+        mime_type, _ = mimetypes.guess_type(audio_path)
+        if mime_type:
+            with open(audio_path, "rb") as f:
+                reader = UploadReader(f, step, "Uploading audio to Gemini...", end=30, provider=self.provider_name)
+                uploaded = client.files.upload(file=reader, config={"mime_type": mime_type})
+        else:
+            uploaded = client.files.upload(file=audio_path)
+            UPLOAD_BYTES.inc(audio_path.stat().st_size, provider=self.provider_name)
 
         step.advance_to(30, "Waiting for file processing...")
         while uploaded.state and uploaded.state.name == "PROCESSING":
@@ -1,13 +1,24 @@
+from functools import lru_cache
 from pathlib import Path
 
-from sttcli.models import Segment, TranscriptResult
-from sttcli.progress import StepProgress
+from sttcli.models import Segment, TranscriptResult, Word
+from sttcli.progress import StepProgress, UploadReader
 from sttcli.providers.base import BaseProvider
 
 MAX_FILE_SIZE = 25 * 1024 * 1024  # 25 MB
 
 
+@lru_cache(maxsize=8)
+def _client(api_key: str | None, base_url: str | None = None):
+    """Return a shared OpenAI client per API key and endpoint (reuses HTTP connections)."""
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key, base_url=base_url)
+
+
 class OpenAIProvider(BaseProvider):
+    upload_formats = ("m4a", "mp3", "ogg", "flac", "wav")
+
     @property
     def default_model(self) -> str:
         return "whisper-1"
@@ -17,8 +28,6 @@ class OpenAIProvider(BaseProvider):
         return "openai"
 
     def transcribe(self, audio_path: Path, step: StepProgress) -> TranscriptResult:
-        from openai import OpenAI
-
         file_size = audio_path.stat().st_size
         if file_size > MAX_FILE_SIZE:
             raise ValueError(
@@ -26,15 +35,15 @@ class OpenAIProvider(BaseProvider):
                 "Please compress the audio or split it into smaller chunks."
             )
 
-        client = OpenAI(api_key=self.api_key)
+        client = _client(self.api_key, self.base_url)
 
         step.advance_to(10, "Uploading audio to OpenAI...")
         with open(audio_path, "rb") as f:
             kwargs = {
                 "model": self.model,
-                "file": f,
+                "file": UploadReader(f, step, "Uploading audio to OpenAI...", provider=self.provider_name),
                 "response_format": "verbose_json",
-                "timestamp_granularities": ["segment"],
+                "timestamp_granularities": ["segment", "word"] if self.word_timestamps else ["segment"],
             }
             if self.language:
                 kwargs["language"] = self.language
@@ -46,6 +55,8 @@ class OpenAIProvider(BaseProvider):
             Segment(start=s.start, end=s.end, text=s.text.strip())
             for s in (response.segments or [])
         ]
+        if self.word_timestamps:
+            _attach_words(segments, getattr(response, "words", None) or [])
         duration = segments[-1].end if segments else 0.0
 
         step.advance_to(100, "Done")
@@ -57,3 +68,15 @@ class OpenAIProvider(BaseProvider):
             model=self.model,
             source_file=str(audio_path),
         )
+
+
+def _attach_words(segments: list[Segment], words) -> None:
+    """Distribute the flat word list from verbose_json onto segments by start time."""
+    i = 0
+    for seg_idx, seg in enumerate(segments):
+        seg.words = []
+        next_start = segments[seg_idx + 1].start if seg_idx + 1 < len(segments) else float("inf")
+        while i < len(words) and words[i].start < next_start:
+            w = words[i]
+            seg.words.append(Word(start=w.start, end=w.end, text=w.word.strip()))
+            i += 1
@@ -1,11 +1,151 @@
+import threading
 from pathlib import Path
+from typing import Callable
 
-from sttcli.models import Segment, TranscriptResult
-from sttcli.progress import StepProgress
+import numpy as np
+
+from sttcli.models import Segment, TranscriptResult, Word
+from sttcli.pcm import SAMPLE_RATE, open_pcm
+from sttcli.progress import NullStepProgress, StepProgress, Throughput
 from sttcli.providers.base import BaseProvider
+from sttcli.telemetry import MODEL_LOAD_SECONDS
+
+# Loaded models are kept for the lifetime of the process so that long-running
+# callers (e.g. `sttcli serve`) only pay the load cost once per (model, device).
+_MODELS: dict[tuple, tuple[object, threading.Lock]] = {}
+_MODELS_LOCK = threading.Lock()
+
+# Local inference backends: the reference PyTorch implementation and
+# CTranslate2 via faster-whisper (much faster on CPU, supports int8).
+ENGINES = ("openai-whisper", "faster-whisper")
+DEFAULT_ENGINE = "openai-whisper"
+
+# CTranslate2 compute types; "default" keeps the converted model's own type
+COMPUTE_TYPES = ("default", "int8", "int8_float32", "int8_float16", "float16", "float32")
+
+# Whisper encodes fixed 30 s windows, so clips up to this long fit one batch row.
+BATCH_CLIP_SECONDS = 30.0
+DEFAULT_BATCH_SIZE = 16
+
+# The quality gates model.transcribe uses to retry a window at a higher
+# temperature; batched rows that fail them are re-run on their own.
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+# Seconds per Whisper timestamp token
+TIME_PRECISION = 0.02
+
+# Two-pass mode: draft segments failing any of these are re-decoded with the
+# refine model. Stricter than the fallback gates above, so the large model
+# also revisits segments the small one was merely unsure about.
+REFINE_LOGPROB_THRESHOLD = -0.6
+REFINE_COMPRESSION_RATIO_THRESHOLD = 2.0
+REFINE_NO_SPEECH_THRESHOLD = 0.5
+# Flagged segments closer than this are re-decoded as one region
+REFINE_MERGE_GAP = 1.0
+# Context added around a region, never reaching into unflagged neighbours
+REFINE_PAD_SECONDS = 0.3
+
+
+def load_model(
+    name: str,
+    device: str = "cpu",
+    engine: str = DEFAULT_ENGINE,
+    compute_type: str = "default",
+    threads: int = 0,
+) -> tuple[object, threading.Lock]:
+    """Return a cached (model, lock) pair, loading the model on first use.
+
+    Whisper installs per-call hooks on the model, so concurrent transcriptions
+    on the same model must hold the returned lock. threads=0 leaves the
+    backend's default thread count.
+    """
+    key = (engine, name, device, compute_type, threads)
+    with _MODELS_LOCK:
+        cached = _MODELS.get(key)
+        if cached is None:
+            if engine not in ENGINES:
+                raise ValueError(f"Unknown Whisper engine: {engine} (choose from {', '.join(ENGINES)})")
+            with MODEL_LOAD_SECONDS.time(engine=engine, model=name):
+                if engine == "faster-whisper":
+                    model = _load_faster_whisper(name, device, compute_type, threads)
+                else:
+                    import whisper
+
+                    if threads:
+                        import torch
+
+                        torch.set_num_threads(threads)
+                    model = whisper.load_model(name, device=device)
+            cached = (model, threading.Lock())
+            _MODELS[key] = cached
+    return cached
+
+
+def _load_faster_whisper(name: str, device: str, compute_type: str, threads: int):
+    try:
+        from faster_whisper import WhisperModel
+    except ImportError as exc:
+        raise RuntimeError(
+            "The faster-whisper engine needs the faster-whisper package (pip install faster-whisper)."
+        ) from exc
+    if device not in ("cpu", "cuda"):
+        raise ValueError(f"faster-whisper runs on cpu or cuda, not {device}.")
+    return WhisperModel(name, device=device, compute_type=compute_type, cpu_threads=threads)
+
+
+# Per-thread callback receiving (processed mel frames, total frames) from
+# model.transcribe's tqdm bar; frames are 10 ms each.
+_window_progress = threading.local()
+FRAMES_PER_SECOND = 100
+
+
+def _install_progress_hook() -> None:
+    """Route whisper.transcribe's per-window tqdm updates to _window_progress.
+
+    The bar is disabled unless verbose=False, but update() is still called
+    once per decoded 30 s window, which is all we need.
+    """
+    import whisper.transcribe as wt
+
+    if getattr(wt.tqdm.tqdm, "_sttcli_hook", False):
+        return
+    base = wt.tqdm.tqdm
+
+    class _WindowTqdm(base):
+        _sttcli_hook = True
+
+        def update(self, n=1):
+            callback = getattr(_window_progress, "callback", None)
+            if callback is not None:
+                self._sttcli_done = getattr(self, "_sttcli_done", 0) + n
+                callback(self._sttcli_done, self.total)
+            return super().update(n)
+
+    class _TqdmModule:
+        tqdm = _WindowTqdm
+
+    wt.tqdm = _TqdmModule
 
 
 class WhisperProvider(BaseProvider):
+    def __init__(
+        self,
+        *args,
+        engine: str = DEFAULT_ENGINE,
+        compute_type: str = "default",
+        threads: int = 0,
+        refine_model: str | None = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.engine = engine
+        self.compute_type = compute_type
+        self.threads = threads
+        # Two-pass mode: self.model drafts, refine_model re-decodes weak segments
+        self.refine_model = refine_model
+
     @property
     def default_model(self) -> str:
         return "turbo"
@@ -15,32 +155,343 @@ class WhisperProvider(BaseProvider):
         return "whisper"
 
     def transcribe(self, audio_path: Path, step: StepProgress) -> TranscriptResult:
-        import whisper
-
         step.advance_to(5, "Loading Whisper model...")
-        model = whisper.load_model(self.model, device=self.device)
+        model, lock = load_model(self.model, self.device, self.engine, self.compute_type, self.threads)
 
         step.advance_to(20, "Transcribing audio...")
-        fp16 = self.device != "cpu"
-        options = {"fp16": fp16}
-        if self.language:
-            options["language"] = self.language
-
-        result = model.transcribe(str(audio_path), **options)
-
-        step.advance_to(90, "Processing results...")
-        segments = [
-            Segment(start=s["start"], end=s["end"], text=s["text"].strip())
-            for s in result["segments"]
-        ]
+        # Feed Whisper the cached decode instead of letting it run ffmpeg again.
+        audio = open_pcm(audio_path).samples()
+        span = (20, 60) if self.refine_model else (20, 90)
+        segments, language, quality = self._decode(model, lock, audio, step, span)
+        model_name = self.model
+        if self.refine_model:
+            segments = self._refine(segments, quality, audio, language or self.language, step)
+            model_name = f"{self.model}+{self.refine_model}"
         duration = segments[-1].end if segments else 0.0
 
         step.advance_to(100, "Done")
         return TranscriptResult(
             segments=segments,
-            language=result.get("language", self.language or ""),
+            language=language or self.language or "",
             duration=duration,
             provider=self.provider_name,
-            model=self.model,
+            model=model_name,
             source_file=str(audio_path),
         )
+
+    def _decode(
+        self,
+        model,
+        lock,
+        audio,
+        step: StepProgress,
+        span: tuple[int, int] = (20, 90),
+        language: str | None = None,
+        prompt: str | None = None,
+    ) -> tuple[list[Segment], str | None, list[tuple[float, float, float]]]:
+        """Decode audio with the configured engine.
+
+        Returns segments, the detected language and per-segment
+        (avg_logprob, compression_ratio, no_speech_prob).
+        """
+        if self.engine == "faster-whisper":
+            return self._transcribe_ctranslate2(model, lock, audio, step, span, language, prompt)
+        return self._transcribe_torch(model, lock, audio, step, span, language, prompt)
+
+    def _transcribe_torch(
+        self,
+        model,
+        lock,
+        audio,
+        step: StepProgress,
+        span: tuple[int, int] = (20, 90),
+        language: str | None = None,
+        prompt: str | None = None,
+    ) -> tuple[list[Segment], str | None, list[tuple[float, float, float]]]:
+        fp16 = self.device != "cpu"
+        options = {"fp16": fp16}
+        if language or self.language:
+            options["language"] = language or self.language
+        if self.word_timestamps:
+            options["word_timestamps"] = True
+        if prompt:
+            options["initial_prompt"] = prompt
+
+        lo, hi = span
+
+        def on_window(done: int, total: int) -> None:
+            step.advance_to(
+                lo + (hi - lo) * done // max(total, 1),
+                f"Transcribing audio... {done // FRAMES_PER_SECOND}s / {total // FRAMES_PER_SECOND}s",
+            )
+
+        _install_progress_hook()
+        _window_progress.callback = on_window
+        try:
+            with lock:
+                result = model.transcribe(audio, **options)
+        finally:
+            _window_progress.callback = None
+
+        step.advance_to(hi, "Processing results...")
+        segments = [
+            Segment(
+                start=s["start"],
+                end=s["end"],
+                text=s["text"].strip(),
+                words=[
+                    Word(start=w["start"], end=w["end"], text=w["word"].strip(), confidence=w.get("probability"))
+                    for w in s["words"]
+                ] if "words" in s else None,
+            )
+            for s in result["segments"]
+        ]
+        quality = [(s["avg_logprob"], s["compression_ratio"], s["no_speech_prob"]) for s in result["segments"]]
+        return segments, result.get("language"), quality
+
+    def _transcribe_ctranslate2(
+        self,
+        model,
+        lock,
+        audio,
+        step: StepProgress,
+        span: tuple[int, int] = (20, 90),
+        language: str | None = None,
+        prompt: str | None = None,
+    ) -> tuple[list[Segment], str | None, list[tuple[float, float, float]]]:
+        total = len(audio) / SAMPLE_RATE
+        lo, hi = span
+        segments: list[Segment] = []
+        quality: list[tuple[float, float, float]] = []
+        with lock:
+            # Segments are decoded lazily as the generator is consumed.
+            decoded, info = model.transcribe(
+                audio, language=language or self.language, word_timestamps=self.word_timestamps,
+                initial_prompt=prompt,
+            )
+            for s in decoded:
+                segments.append(Segment(
+                    start=s.start,
+                    end=s.end,
+                    text=s.text.strip(),
+                    words=[
+                        Word(start=w.start, end=w.end, text=w.word.strip(), confidence=w.probability)
+                        for w in s.words
+                    ] if self.word_timestamps and s.words is not None else None,
+                ))
+                quality.append((s.avg_logprob, s.compression_ratio, s.no_speech_prob))
+                if total:
+                    step.advance_to(lo + int((hi - lo) * min(1.0, s.end / total)), "Transcribing audio...")
+        return segments, info.language, quality
+
+    # ── Two-pass refinement ──
+
+    def _refine(
+        self,
+        segments: list[Segment],
+        quality: list[tuple[float, float, float]],
+        audio: np.ndarray,
+        language: str | None,
+        step: StepProgress,
+    ) -> list[Segment]:
+        """Re-decode weak draft segments with the refine model and splice them in."""
+        regions = refine_regions(segments, [needs_refinement(*q) for q in quality])
+        flagged = sum(j - i for i, j in regions)
+        if not regions:
+            step.advance_to(95, "Draft accepted, no segments to refine")
+            return segments
+
+        step.advance_to(60, f"Loading {self.refine_model} to refine {flagged}/{len(segments)} segments...")
+        model, lock = load_model(self.refine_model, self.device, self.engine, self.compute_type, self.threads)
+        total_seconds = len(audio) / SAMPLE_RATE
+        out: list[Segment] = []
+        prev = 0
+        for n, (i, j) in enumerate(regions, 1):
+            out.extend(segments[prev:i])
+            # Pad for context, but never into audio an unflagged neighbour covers.
+            floor = segments[i - 1].end if i > 0 else 0.0
+            ceiling = segments[j].start if j < len(segments) else total_seconds
+            lo = max(floor, segments[i].start - REFINE_PAD_SECONDS)
+            hi = min(ceiling, segments[j - 1].end + REFINE_PAD_SECONDS)
+            clip = audio[int(lo * SAMPLE_RATE):int(hi * SAMPLE_RATE)]
+            prompt = segments[i - 1].text if i > 0 else None
+            refined, _, _ = self._decode(model, lock, clip, NullStepProgress(), language=language, prompt=prompt)
+            for seg in refined:
+                seg.start = min(hi, lo + seg.start)
+                seg.end = min(hi, lo + seg.end)
+                for w in seg.words or []:
+                    w.start = min(hi, lo + w.start)
+                    w.end = min(hi, lo + w.end)
+            out.extend(refined)
+            prev = j
+            step.advance_to(60 + 35 * n // len(regions), f"Refining with {self.refine_model}: region {n}/{len(regions)}")
+        out.extend(segments[prev:])
+        return out
+
+    # ── Batched decoding of short clips ──
+
+    def transcribe_batch(
+        self,
+        audio_paths: list[Path],
+        step: StepProgress | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        on_done: Callable[[int, TranscriptResult | Exception], None] | None = None,
+    ) -> list[TranscriptResult | Exception]:
+        """Transcribe many clips, one outcome per path, in input order.
+
+        With the openai-whisper engine, clips of up to 30 s are padded to one
+        window each and encoded and decoded together, batch_size at a time,
+        so the per-call overhead of model.transcribe is paid once per batch.
+        Longer clips, word timestamps and the faster-whisper engine go
+        through transcribe() one clip at a time.
+
+        A clip that fails yields its exception in place of a result (as with
+        asyncio.gather(return_exceptions=True)). on_done(index, outcome) is
+        called as each clip finishes. Samples are loaded one batch at a time,
+        so memory stays flat however many clips there are.
+        """
+        step = step or NullStepProgress()
+        outcomes: list[TranscriptResult | Exception | None] = [None] * len(audio_paths)
+        throughput = Throughput(len(audio_paths), "clips")
+
+        def finished(i: int, outcome: TranscriptResult | Exception, audio_seconds: float) -> None:
+            outcomes[i] = outcome
+            if on_done is not None:
+                on_done(i, outcome)
+            throughput.add(1, audio_seconds)
+            step.advance_to(throughput.percent, throughput.describe())
+
+        def one_by_one(i: int, duration: float) -> None:
+            try:
+                finished(i, self.transcribe(Path(audio_paths[i]), NullStepProgress()), duration)
+            except Exception as exc:
+                finished(i, exc, duration)
+
+        batched = self.engine == DEFAULT_ENGINE and not self.word_timestamps and not self.refine_model
+        batchable: list[tuple[int, float]] = []     # (input index, duration)
+        for i, path in enumerate(audio_paths):
+            try:
+                duration = open_pcm(path).duration
+            except Exception as exc:
+                finished(i, exc, 0.0)
+                continue
+            if batched and duration <= BATCH_CLIP_SECONDS:
+                batchable.append((i, duration))
+            else:
+                one_by_one(i, duration)
+
+        if batchable:
+            model, lock = load_model(self.model, self.device, self.engine, self.compute_type, self.threads)
+            for lo in range(0, len(batchable), batch_size):
+                chunk = []
+                for i, duration in batchable[lo:lo + batch_size]:
+                    try:
+                        chunk.append((i, duration, open_pcm(audio_paths[i]).samples()))
+                    except Exception as exc:
+                        finished(i, exc, 0.0)
+                if not chunk:
+                    continue
+                try:
+                    decoded = self._decode_batch(model, lock, [audio for _, _, audio in chunk])
+                except Exception:
+                    # Find the clip that broke the batch by running each on its own.
+                    for i, duration, _ in chunk:
+                        one_by_one(i, duration)
+                    continue
+                for (i, duration, _), (segments, language) in zip(chunk, decoded):
+                    finished(i, TranscriptResult(
+                        segments=segments,
+                        language=language or self.language or "",
+                        duration=segments[-1].end if segments else 0.0,
+                        provider=self.provider_name,
+                        model=self.model,
+                        source_file=str(audio_paths[i]),
+                    ), duration)
+        return outcomes
+
+    def _decode_batch(self, model, lock, clips: list[np.ndarray]) -> list[tuple[list[Segment], str | None]]:
+        import torch
+        import whisper
+        from whisper.tokenizer import get_tokenizer
+
+        # Mel per clip: log_mel_spectrogram normalizes against the loudest
+        # frame, which must not be shared across the batch.
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(clip), model.dims.n_mels)
+            for clip in clips
+        ]).to(model.device)
+        options = whisper.DecodingOptions(language=self.language, fp16=self.device != "cpu")
+        tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages, task="transcribe")
+
+        with lock:
+            decoded = whisper.decode(model, mel, options)
+
+        out = []
+        for clip, res in zip(clips, decoded):
+            duration = len(clip) / SAMPLE_RATE
+            if res.no_speech_prob > NO_SPEECH_THRESHOLD and res.avg_logprob < LOGPROB_THRESHOLD:
+                out.append(([], res.language))
+            elif res.compression_ratio > COMPRESSION_RATIO_THRESHOLD or res.avg_logprob < LOGPROB_THRESHOLD:
+                # Greedy decoding looped or was unsure: let model.transcribe
+                # retry this clip with its temperature fallback.
+                out.append(self._transcribe_torch(model, lock, clip, NullStepProgress())[:2])
+            else:
+                out.append((_segments_from_tokens(res.tokens, tokenizer, duration), res.language))
+        return out
+
+
+def _segments_from_tokens(tokens: list[int], tokenizer, duration: float) -> list[Segment]:
+    """Split one decoded window into segments at its timestamp tokens.
+
+    Whisper emits <|t0|> text <|t1|><|t1|> text <|t2|>; text left open at
+    the end of the window runs to the end of the clip.
+    """
+    segments: list[Segment] = []
+    start: float | None = None
+    text: list[int] = []
+
+    def emit(end: float) -> None:
+        body = tokenizer.decode(text).strip()
+        if body:
+            seg_start = min(start or 0.0, duration)
+            segments.append(Segment(start=seg_start, end=max(seg_start, min(end, duration)), text=body))
+
+    for token in tokens:
+        if token < tokenizer.timestamp_begin:
+            text.append(token)
+            continue
+        t = (token - tokenizer.timestamp_begin) * TIME_PRECISION
+        if start is not None and text:
+            emit(t)
+            start, text = None, []
+        else:
+            start = t
+    if text:
+        emit(duration)
+    return segments
+
+
+def needs_refinement(avg_logprob: float, compression_ratio: float, no_speech_prob: float) -> bool:
+    """Whether a draft segment looks unreliable enough to re-decode."""
+    return (
+        avg_logprob < REFINE_LOGPROB_THRESHOLD
+        or compression_ratio > REFINE_COMPRESSION_RATIO_THRESHOLD
+        or no_speech_prob > REFINE_NO_SPEECH_THRESHOLD
+    )
+
+
+def refine_regions(segments: list[Segment], flags: list[bool]) -> list[tuple[int, int]]:
+    """Group flagged segments into [i, j) index ranges.
+
+    Consecutive flagged segments less than REFINE_MERGE_GAP apart share a
+    region, so the refine model sees them with their context in one decode.
+    """
+    regions: list[tuple[int, int]] = []
+    for k, flagged in enumerate(flags):
+        if not flagged:
+            continue
+        if regions and regions[-1][1] == k and segments[k].start - segments[k - 1].end < REFINE_MERGE_GAP:
+            regions[-1] = (regions[-1][0], k + 1)
+        else:
+            regions.append((k, k + 1))
+    return regions
@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+import sqlite3
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from rich.progress import Progress
+
+from sttcli.audio import get_duration
+from sttcli.benchmark import ALL_PROVIDERS, API_KEY_REQUIRED, DIARIZE_SUPPORTED, parse_provider_spec
+from sttcli.config import load_config, resolve_api_key, resolve_base_url
+from sttcli.models import TranscriptResult
+from sttcli.pipeline import transcribe_file
+from sttcli.providers import get_provider
+from sttcli.providers.base import BaseProvider
+from sttcli.telemetry import record_job
+
+DEFAULT_METRICS_PATH = Path.home() / ".sttcli" / "metrics.db"
+
+# Recent successful runs per provider/model used to estimate speed
+HISTORY = 50
+
+# Recent runs used for the failure rate; a provider whose last
+# OPEN_AFTER runs all failed within COOLDOWN_SECONDS is skipped unless
+# nothing else is left.
+FAILURE_WINDOW = 10
+OPEN_AFTER = 3
+COOLDOWN_SECONDS = 600
+
+# Rough list prices in USD per audio hour; override in [routing.cost_per_hour]
+DEFAULT_COST_PER_HOUR = {"whisper": 0.0, "openai": 0.36, "elevenlabs": 0.40, "gemini": 0.10}
+
+# (fixed latency in seconds, real-time factor) assumed before any history
+PRIORS = {
+    "whisper": (5.0, 0.5),
+    "openai": (2.0, 0.08),
+    "elevenlabs": (2.0, 0.06),
+    "gemini": (4.0, 0.1),
+}
+
+# Hard request limits
+MAX_FILE_BYTES = {"openai": 25 * 1024**2}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id            INTEGER PRIMARY KEY,
+    ts            REAL NOT NULL,
+    provider      TEXT NOT NULL,
+    model         TEXT NOT NULL,
+    device        TEXT NOT NULL,
+    audio_seconds REAL,
+    file_bytes    INTEGER,
+    wall_seconds  REAL,
+    ok            INTEGER NOT NULL,
+    error         TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_provider ON runs(provider, model, device, ts);
+"""
+
+
+def resolve_metrics_path(config_path: Path | None = None) -> Path:
+    configured = load_config(config_path).get("routing", {}).get("metrics_path")
+    return Path(configured).expanduser() if configured else DEFAULT_METRICS_PATH
+
+
+@dataclass
+class ProviderStats:
+    latency: float          # fixed per-request seconds
+    rtf: float              # seconds of processing per second of audio
+    failure_rate: float     # over the last FAILURE_WINDOW runs
+    runs: int               # successful runs the estimate is based on
+    circuit_open: bool      # failing repeatedly right now
+
+    def expected_seconds(self, audio_seconds: float) -> float:
+        # A failed attempt costs roughly a full attempt before falling back.
+        success = max(0.1, 1.0 - self.failure_rate)
+        return (self.latency + self.rtf * audio_seconds) / success
+
+
+class MetricsStore:
+    """Per-run provider timings and outcomes in a small SQLite database."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "MetricsStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        device: str,
+        audio_seconds: float,
+        file_bytes: int,
+        wall_seconds: float,
+        ok: bool,
+        error: str | None = None,
+    ) -> None:
+        self.conn.execute(
+            "INSERT INTO runs (ts, provider, model, device, audio_seconds, file_bytes, wall_seconds, ok, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (time.time(), provider, model, _device_key(provider, device),
+             audio_seconds, file_bytes, wall_seconds, int(ok), error),
+        )
+        self.conn.commit()
+
+    def stats(self, provider: str, model: str, device: str) -> ProviderStats:
+        key = (provider, model, _device_key(provider, device))
+        recent = self.conn.execute(
+            "SELECT ts, ok FROM runs WHERE provider = ? AND model = ? AND device = ? "
+            "ORDER BY ts DESC LIMIT ?",
+            (*key, FAILURE_WINDOW),
+        ).fetchall()
+        timings = self.conn.execute(
+            "SELECT audio_seconds, wall_seconds FROM runs "
+            "WHERE provider = ? AND model = ? AND device = ? AND ok = 1 AND audio_seconds > 0 "
+            "ORDER BY ts DESC LIMIT ?",
+            (*key, HISTORY),
+        ).fetchall()
+
+        latency, rtf = _fit(timings, PRIORS.get(provider, (5.0, 0.5)))
+        failure_rate = sum(1 for _, ok in recent if not ok) / len(recent) if recent else 0.0
+        streak = recent[:OPEN_AFTER]
+        circuit_open = (
+            len(streak) == OPEN_AFTER
+            and not any(ok for _, ok in streak)
+            and time.time() - streak[0][0] < COOLDOWN_SECONDS
+        )
+        return ProviderStats(latency, rtf, failure_rate, len(timings), circuit_open)
+
+    def summary(self) -> list[dict]:
+        rows = self.conn.execute(
+            "SELECT provider, model, device, COUNT(*), SUM(ok), MAX(ts) FROM runs "
+            "GROUP BY provider, model, device ORDER BY provider, model, device"
+        ).fetchall()
+        out = []
+        for provider, model, device, count, ok, last in rows:
+            st = self.stats(provider, model, device or "cpu")
+            out.append({
+                "provider": provider,
+                "model": model,
+                "device": device,
+                "runs": count,
+                "ok": ok,
+                "latency": round(st.latency, 2),
+                "rtf": round(st.rtf, 4),
+                "failure_rate": round(st.failure_rate, 2),
+                "last_run": last,
+            })
+        return out
+
+
+def _device_key(provider: str, device: str) -> str:
+    # Only local inference speed depends on the device.
+    return device if provider == "whisper" else ""
+
+
+def _fit(timings: list[tuple[float, float]], prior: tuple[float, float]) -> tuple[float, float]:
+    """Fit wall = latency + rtf * audio over recent runs; fall back to the prior latency."""
+    prior_latency, prior_rtf = prior
+    if not timings:
+        return prior_latency, prior_rtf
+    audio = [a for a, _ in timings]
+    wall = [w for _, w in timings]
+    if len(timings) >= 3 and max(audio) - min(audio) > 1.0:
+        rtf, latency = statistics.linear_regression(audio, wall)
+        if rtf > 0 and latency >= 0:
+            return latency, rtf
+    # Too few or too similar durations to separate the two terms.
+    rtf = statistics.median(max(w - prior_latency, 0.0) / a for a, w in timings)
+    return prior_latency, max(rtf, 1e-3)
+
+
+# ── Route planning ──
+
+@dataclass
+class RouteOption:
+    spec: str               # "provider" or "provider:model"
+    provider: str
+    model: str
+    expected_seconds: float
+    cost: float             # USD for this file
+    stats: ProviderStats | None = None
+    excluded: str | None = None     # why this option cannot be used
+
+    def to_dict(self) -> dict:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "expected_seconds": round(self.expected_seconds, 1),
+            "cost": round(self.cost, 4),
+            "failure_rate": round(self.stats.failure_rate, 2) if self.stats else None,
+            "history": self.stats.runs if self.stats else 0,
+            "excluded": self.excluded,
+        }
+
+
+@dataclass
+class RoutingPolicy:
+    candidates: list[str]
+    max_cost_per_hour: float | None = None
+    native_diarization: bool = False
+    cost_per_hour: dict[str, float] | None = None
+
+    @classmethod
+    def from_config(cls, config_path: Path | None = None) -> "RoutingPolicy":
+        section = load_config(config_path).get("routing", {})
+        max_cost = section.get("max_cost_per_hour")
+        return cls(
+            candidates=list(section.get("providers") or ALL_PROVIDERS),
+            max_cost_per_hour=float(max_cost) if max_cost is not None else None,
+            native_diarization=bool(section.get("native_diarization", False)),
+            cost_per_hour={**DEFAULT_COST_PER_HOUR, **section.get("cost_per_hour", {})},
+        )
+
+    def price(self, provider: str, model: str) -> float:
+        prices = self.cost_per_hour or DEFAULT_COST_PER_HOUR
+        return float(prices.get(f"{provider}:{model}", prices.get(provider, 0.0)))
+
+
+def plan_route(
+    policy: RoutingPolicy,
+    metrics: MetricsStore,
+    audio_seconds: float,
+    file_bytes: int,
+    device: str = "cpu",
+    diarize: bool = False,
+    chunked: bool = False,
+    config_path: Path | None = None,
+) -> list[RouteOption]:
+    """Rank candidate providers by expected finish time for one file.
+
+    Options that violate a constraint come last with `excluded` set; options
+    whose circuit is open (failing right now) come after all healthy ones.
+    """
+    options: list[RouteOption] = []
+    for spec in policy.candidates:
+        name, model = parse_provider_spec(spec)
+        if name not in ALL_PROVIDERS:
+            raise ValueError(f"Unknown provider in [routing] providers: {spec}")
+        model = get_provider(name)(model=model).model     # resolves the default model
+        price = policy.price(name, model)
+        option = RouteOption(spec, name, model, 0.0, price * audio_seconds / 3600)
+
+        if name in API_KEY_REQUIRED and not resolve_api_key(name, None, config_path):
+            option.excluded = "no API key"
+        elif file_bytes > MAX_FILE_BYTES.get(name, file_bytes):
+            option.excluded = f"file larger than {MAX_FILE_BYTES[name] // 1024**2} MB"
+        elif policy.max_cost_per_hour is not None and price > policy.max_cost_per_hour:
+            option.excluded = f"${price:.2f}/h over the ${policy.max_cost_per_hour:.2f}/h limit"
+        elif diarize and policy.native_diarization and name not in DIARIZE_SUPPORTED:
+            option.excluded = "no native diarization"
+        elif diarize and chunked and name in DIARIZE_SUPPORTED:
+            option.excluded = "speaker labels would not match across chunks"
+        else:
+            option.stats = metrics.stats(name, model, device)
+            option.expected_seconds = option.stats.expected_seconds(audio_seconds)
+        options.append(option)
+
+    def rank(o: RouteOption):
+        return (o.excluded is not None, bool(o.stats and o.stats.circuit_open), o.expected_seconds, o.cost)
+
+    return sorted(options, key=rank)
+
+
+# ── Running ──
+
+def record_run(
+    config_path: Path | None,
+    provider: BaseProvider,
+    input_path: Path,
+    audio_seconds: float,
+    wall_seconds: float,
+    ok: bool,
+    error: str | None = None,
+) -> None:
+    """Add one run to the metrics store; metrics problems never fail a transcription."""
+    try:
+        file_bytes = input_path.stat().st_size
+        with MetricsStore(resolve_metrics_path(config_path)) as metrics:
+            metrics.record(
+                provider.provider_name, provider.model, provider.device,
+                audio_seconds, file_bytes, wall_seconds, ok, error,
+            )
+    except (OSError, sqlite3.Error):
+        pass
+
+
+def transcribe_recorded(
+    provider: BaseProvider,
+    input_path: Path,
+    progress: Progress | None = None,
+    config_path: Path | None = None,
+    audio_seconds: float | None = None,
+    **kwargs,
+) -> TranscriptResult:
+    """transcribe_file, timing the run and recording the outcome for routing and metrics."""
+    start = time.monotonic()
+    try:
+        result = transcribe_file(provider, input_path, progress, **kwargs)
+    except Exception as exc:
+        elapsed = time.monotonic() - start
+        if audio_seconds is None:
+            audio_seconds = get_duration(input_path)
+        record_job(provider.provider_name, provider.model, "failed")
+        record_run(config_path, provider, input_path, audio_seconds, elapsed, False, str(exc))
+        raise
+    elapsed = time.monotonic() - start
+    if result.duration > 0:
+        audio_seconds = result.duration
+    elif audio_seconds is None:
+        audio_seconds = get_duration(input_path)
+    record_job(provider.provider_name, provider.model, "done", audio_seconds, elapsed)
+    record_run(config_path, provider, input_path, audio_seconds, elapsed, True)
+    return result
+
+
+def transcribe_auto(
+    input_path: Path,
+    progress: Progress | None = None,
+    config_path: Path | None = None,
+    language: str | None = None,
+    device: str = "cpu",
+    diarize: bool = False,
+    num_speakers: int | None = None,
+    on_attempt: Callable[[RouteOption], None] | None = None,
+    **kwargs,
+) -> TranscriptResult:
+    """Transcribe with the provider expected to finish soonest, falling back down the ranking."""
+    audio_seconds = get_duration(input_path)
+    with MetricsStore(resolve_metrics_path(config_path)) as metrics:
+        plan = plan_route(
+            RoutingPolicy.from_config(config_path), metrics, audio_seconds,
+            input_path.stat().st_size, device=device, diarize=diarize,
+            chunked=bool(kwargs.get("chunk_seconds")), config_path=config_path,
+        )
+    usable = [o for o in plan if o.excluded is None]
+    if not usable:
+        raise RuntimeError(
+            "No provider satisfies the routing constraints: "
+            + "; ".join(f"{o.spec}: {o.excluded}" for o in plan)
+        )
+
+    errors: list[str] = []
+    for option in usable:
+        if on_attempt is not None:
+            on_attempt(option)
+        provider = get_provider(option.provider)(
+            model=option.model, language=language,
+            api_key=resolve_api_key(option.provider, None, config_path),
+            device=device, diarize=diarize, num_speakers=num_speakers,
+            base_url=resolve_base_url(option.provider, None, config_path),
+        )
+        try:
+            return transcribe_recorded(
+                provider, input_path, progress, config_path, audio_seconds=audio_seconds, **kwargs,
+            )
+        except Exception as exc:
+            errors.append(f"{option.spec}: {exc}")
+    raise RuntimeError("All routed providers failed: " + "; ".join(errors))
@@ -0,0 +1,350 @@
+"""Resource-aware admission for concurrent transcription jobs.
+
+Each job is charged an estimate of the memory and CPU threads it needs:
+local Whisper jobs pay for their model (once, since models stay loaded and
+are shared) and for decoding the whole file, API jobs mostly wait on the
+network and cost little. Jobs are admitted while the charges fit the
+machine's cores and the memory that was free at start-up, and admission
+pauses whenever free memory runs low, so a batch or server uses the whole
+machine without swapping or OOM kills.
+
+Jobs wait for admission in an AdmissionQueue, not in worker threads, so a
+backlog of Whisper jobs never ties up the workers that API jobs need.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from sttcli.providers.base import BaseProvider
+
+GB = 1024**3
+MB = 1024**2
+
+# Share of the memory free at start-up that admitted jobs may reserve
+MEMORY_FRACTION = 0.85
+# Admission pauses while free memory is below this share of the total
+PRESSURE_FLOOR = 0.05
+# Seconds between free-memory checks while admission is paused
+PRESSURE_POLL = 1.0
+
+# Times a job waiting for memory or threads may be overtaken by later, smaller
+# jobs before the queue holds everything behind it until it fits
+MAX_BYPASSES = 32
+
+# Fewest CPU threads worth giving one local Whisper job
+MIN_WHISPER_THREADS = 4
+# Concurrent API jobs per core (they mostly wait on the network), and overall
+API_JOBS_PER_CPU = 4
+MAX_API_JOBS = 32
+
+# Approximate resident size of a Whisper model on CPU with openai-whisper
+# (float32), matched by substring in this order.
+MODEL_MEMORY = {
+    "tiny": 1 * GB,
+    "base": 1 * GB,
+    "small": 2 * GB,
+    "medium": 5 * GB,
+    "turbo": 6 * GB,
+    "large": 10 * GB,
+}
+# Relative size under CTranslate2 compute types (faster-whisper)
+COMPUTE_TYPE_FACTOR = {"int8": 0.3, "int8_float32": 0.35, "int8_float16": 0.3, "float16": 0.5}
+FASTER_WHISPER_FACTOR = 0.6
+# Host memory a model needs when its weights live on a GPU
+GPU_MODEL_HOST_MEMORY = 1 * GB
+
+# Working memory per second of audio: local Whisper holds the samples, the
+# log-mel spectrogram and its STFT; API jobs only map decoded PCM for
+# gender detection and diarization.
+LOCAL_BYTES_PER_SECOND = 300_000
+API_BYTES_PER_SECOND = 20_000
+JOB_BASE_MEMORY = 64 * MB
+
+
+@dataclass
+class Resources:
+    cpus: int
+    total_memory: int
+    available_memory: int
+
+
+def _meminfo() -> dict[str, int]:
+    """/proc/meminfo in bytes (empty where unavailable, e.g. macOS)."""
+    try:
+        with open("/proc/meminfo", encoding="ascii") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return {}
+    info = {}
+    for line in lines:
+        name, _, value = line.partition(":")
+        parts = value.split()
+        if parts and parts[0].isdigit():
+            info[name] = int(parts[0]) * (1024 if parts[1:] == ["kB"] else 1)
+    return info
+
+
+def available_memory() -> int | None:
+    """Memory that can be allocated without swapping, or None if unknown."""
+    return _meminfo().get("MemAvailable")
+
+
+def system_resources() -> Resources:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    info = _meminfo()
+    total = info.get("MemTotal")
+    if total is None:
+        try:
+            total = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+        except (ValueError, OSError, AttributeError):
+            total = 8 * GB
+    return Resources(cpus=cpus, total_memory=total, available_memory=info.get("MemAvailable", total))
+
+
+@dataclass
+class JobCost:
+    memory: int                 # bytes the job itself needs while it runs
+    threads: int                # CPU threads it keeps busy
+    models: dict[tuple, int] = field(default_factory=dict)   # shared models it needs loaded
+    # The job holds its models' locks for its whole run (see load_model), so
+    # jobs on the same model run one at a time and its threads are charged once.
+    locks_models: bool = True
+
+
+def model_memory(name: str, engine: str = "openai-whisper", compute_type: str = "default") -> int:
+    base = next((size for key, size in MODEL_MEMORY.items() if key in name), MODEL_MEMORY["large"])
+    if engine != "faster-whisper":
+        return base
+    return int(base * COMPUTE_TYPE_FACTOR.get(compute_type, FASTER_WHISPER_FACTOR))
+
+
+def estimate_cost(provider: BaseProvider, duration: float, cpus: int = 1) -> JobCost:
+    """Charge for transcribing duration seconds of audio with provider.
+
+    Local Whisper without an explicit thread count uses every core (cpus).
+    """
+    if provider.provider_name != "whisper":
+        return JobCost(memory=JOB_BASE_MEMORY + int(duration * API_BYTES_PER_SECOND), threads=0)
+
+    engine = getattr(provider, "engine", "openai-whisper")
+    compute_type = getattr(provider, "compute_type", "default")
+    models = {}
+    for name in filter(None, (provider.model, getattr(provider, "refine_model", None))):
+        key = (engine, name, provider.device, compute_type)
+        on_cpu = provider.device == "cpu"
+        models[key] = model_memory(name, engine, compute_type) if on_cpu else GPU_MODEL_HOST_MEMORY
+    return JobCost(
+        memory=JOB_BASE_MEMORY + int(duration * LOCAL_BYTES_PER_SECOND),
+        threads=(getattr(provider, "threads", 0) or cpus) if provider.device == "cpu" else 1,
+        models=models,
+    )
+
+
+class Scheduler:
+    """Admits jobs while their estimated memory and threads fit the machine.
+
+    Loaded models are charged once and stay charged, since sttcli keeps them
+    cached for the life of the process. A job that fits nothing still runs
+    once no other job is running, so oversized jobs are slow rather than
+    stuck.
+    """
+
+    def __init__(self, resources: Resources | None = None, memory_fraction: float = MEMORY_FRACTION):
+        self.resources = resources or system_resources()
+        self.memory_budget = int(self.resources.available_memory * memory_fraction)
+        self._lock = threading.Lock()
+        self._memory = 0
+        self._threads = 0
+        self._running = 0
+        self._models: dict[tuple, int] = {}
+        self._busy_models: set[tuple] = set()
+        self.admitted = 0
+        self.throttled = 0
+
+    # ── Sizing ──
+
+    @property
+    def whisper_slots(self) -> int:
+        """Local Whisper jobs that can run at once without oversubscribing the cores."""
+        return max(1, self.resources.cpus // MIN_WHISPER_THREADS)
+
+    @property
+    def whisper_threads(self) -> int:
+        """CPU threads to give each local Whisper model."""
+        return max(1, self.resources.cpus // self.whisper_slots)
+
+    @property
+    def workers(self) -> int:
+        """Thread-pool size that lets admission, not the pool, bound concurrency."""
+        return self.whisper_slots + min(MAX_API_JOBS, API_JOBS_PER_CPU * self.resources.cpus)
+
+    # ── Admission ──
+
+    def cost(self, provider: BaseProvider, duration: float) -> JobCost:
+        return estimate_cost(provider, duration, self.resources.cpus)
+
+    def _blocker(self, cost: JobCost) -> str | None:
+        """Why cost cannot be admitted now ("model", "memory", "threads"), or None."""
+        if cost.locks_models and self._busy_models.intersection(cost.models):
+            return "model"
+        if self._running == 0:
+            return None
+        new_models = sum(size for key, size in cost.models.items() if key not in self._models)
+        reserved = self._memory + sum(self._models.values())
+        if reserved + cost.memory + new_models > self.memory_budget:
+            return "memory"
+        if cost.threads and self._threads + cost.threads > self.resources.cpus:
+            return "threads"
+        free = available_memory()
+        if free is not None and free < PRESSURE_FLOOR * self.resources.total_memory:
+            return "memory"
+        return None
+
+    def try_admit(self, cost: JobCost) -> str | None:
+        """Reserve cost if it fits; otherwise return what blocks it (see _blocker)."""
+        with self._lock:
+            blocker = self._blocker(cost)
+            if blocker is not None:
+                return blocker
+            self._running += 1
+            self._memory += cost.memory
+            self._threads += cost.threads
+            for key, size in cost.models.items():
+                self._models.setdefault(key, size)
+            if cost.locks_models:
+                self._busy_models.update(cost.models)
+            self.admitted += 1
+            return None
+
+    def release(self, cost: JobCost) -> None:
+        """Return the reservation of a job admitted by try_admit."""
+        with self._lock:
+            self._running -= 1
+            self._memory -= cost.memory
+            self._threads -= cost.threads
+            if cost.locks_models:
+                self._busy_models.difference_update(cost.models)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "cpus": self.resources.cpus,
+                "memory_budget_bytes": self.memory_budget,
+                "memory_reserved_bytes": self._memory + sum(self._models.values()),
+                "memory_available_bytes": available_memory(),
+                "threads_reserved": self._threads,
+                "running": self._running,
+                "admitted": self.admitted,
+                "throttled": self.throttled,
+                "models_loaded": len(self._models),
+            }
+
+
+@dataclass
+class _Pending:
+    cost: JobCost
+    fn: Callable[..., Any]
+    args: tuple
+    future: Future
+    throttled: bool = False
+    bypassed: int = 0
+
+
+class AdmissionQueue:
+    """Hands jobs to an executor only once the scheduler admits them.
+
+    Workers never block waiting for resources: jobs wait here instead, and
+    every job that fits is dispatched, so API jobs go ahead of Whisper jobs
+    waiting for a busy model or for memory. A job passed over MAX_BYPASSES
+    times while waiting for memory or threads holds back everything behind
+    it until it fits, so large jobs are not starved.
+    """
+
+    def __init__(self, scheduler: Scheduler, executor: Executor):
+        self.scheduler = scheduler
+        self.executor = executor
+        self._pending: list[_Pending] = []
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._closed = False
+
+    def submit(self, cost: JobCost, fn: Callable[..., Any], *args) -> Future:
+        """Queue fn(*args) to run once cost is admitted; the future holds its result."""
+        job = _Pending(cost, fn, args, Future())
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("AdmissionQueue is shut down")
+            self._pending.append(job)
+        self._pump()
+        return job.future
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _pump(self) -> None:
+        with self._lock:
+            waiting: list[_Pending] = []
+            held = False
+            for job in self._pending:
+                if not held:
+                    blocker = self.scheduler.try_admit(job.cost)
+                    if blocker is None:
+                        for earlier in waiting:
+                            earlier.bypassed += 1
+                        try:
+                            self.executor.submit(self._run, job)
+                        except RuntimeError:
+                            # The executor was shut down under us.
+                            self.scheduler.release(job.cost)
+                            job.future.cancel()
+                        continue
+                    if blocker != "model":
+                        if not job.throttled:
+                            job.throttled = True
+                            self.scheduler.throttled += 1
+                        held = job.bypassed >= MAX_BYPASSES
+                waiting.append(job)
+            self._pending = waiting
+            if waiting and self._timer is None and not self._closed:
+                # Free memory can recover without a job finishing; look again soon.
+                self._timer = threading.Timer(PRESSURE_POLL, self._tick)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _tick(self) -> None:
+        with self._lock:
+            self._timer = None
+        self._pump()
+
+    def _run(self, job: _Pending) -> None:
+        try:
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    result = job.fn(*job.args)
+                except BaseException as exc:
+                    job.future.set_exception(exc)
+                else:
+                    job.future.set_result(result)
+        finally:
+            self.scheduler.release(job.cost)
+            self._pump()
+
+    def shutdown(self) -> None:
+        """Cancel jobs still waiting for admission."""
+        with self._lock:
+            self._closed = True
+            pending, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        for job in pending:
+            job.future.cancel()
@@ -0,0 +1,73 @@
+"""Grouping of word-level timestamps into transcript segments."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Sequence
+
+from sttcli.models import Segment, Word
+
+SENTENCE_ENDINGS = set(".!?。！？")
+MAX_SILENCE_GAP = 1.0
+
+
+def group_words(
+    words: Sequence,
+    diarize: bool = False,
+    keep_words: bool = False,
+    to_word: Callable[[Any], Word] | None = None,
+) -> list[Segment]:
+    """Group timed words into sentence-like segments.
+
+    Words are any objects with start, end and text (and speaker_id when
+    diarize is set). A segment ends at sentence punctuation, a silence longer
+    than MAX_SILENCE_GAP or a speaker change. With keep_words, to_word turns
+    each word into a Word for Segment.words; without it words are kept as given.
+    """
+    if not words:
+        return []
+    convert = to_word or (lambda w: w)
+
+    segments: list[Segment] = []
+    group_start = words[0].start or 0.0
+    group_end = words[0].end or 0.0
+    group_texts: list[str] = [words[0].text or ""]
+    current_words: list = [words[0]]
+    current_speaker: str | None = getattr(words[0], "speaker_id", None) if diarize else None
+
+    for prev, curr in zip(words, words[1:]):
+        prev_end = prev.end or 0.0
+        curr_start = curr.start or 0.0
+        gap = curr_start - prev_end
+
+        sentence_break = any(group_texts[-1].rstrip().endswith(c) for c in SENTENCE_ENDINGS)
+        long_silence = gap > MAX_SILENCE_GAP
+        speaker_change = diarize and getattr(curr, "speaker_id", None) != current_speaker
+
+        if sentence_break or long_silence or speaker_change:
+            segments.append(Segment(
+                start=group_start,
+                end=group_end,
+                text=" ".join(group_texts).strip(),
+                speaker=current_speaker if diarize else None,
+                words=[convert(w) for w in current_words] if keep_words else None,
+            ))
+            group_start = curr_start
+            group_texts = []
+            current_words = []
+            if diarize:
+                current_speaker = getattr(curr, "speaker_id", None)
+
+        group_end = curr.end or group_end
+        group_texts.append(curr.text or "")
+        current_words.append(curr)
+
+    if group_texts:
+        segments.append(Segment(
+            start=group_start,
+            end=group_end,
+            text=" ".join(group_texts).strip(),
+            speaker=current_speaker if diarize else None,
+            words=[convert(w) for w in current_words] if keep_words else None,
+        ))
+
+    return segments
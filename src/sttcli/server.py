@@ -0,0 +1,429 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+from urllib.parse import parse_qs, urlparse
+
+from sttcli.benchmark import ALL_PROVIDERS
+from sttcli.config import resolve_api_key, resolve_base_url
+from sttcli.formatters import FORMATS, get_formatter
+from sttcli.models import TranscriptResult
+from sttcli.audio import get_duration
+from sttcli.routing import transcribe_auto, transcribe_recorded
+from sttcli.providers import get_provider
+from sttcli.scheduler import AdmissionQueue, JobCost, Scheduler
+from sttcli.telemetry import (
+    OPENMETRICS_CONTENT_TYPE, PROMETHEUS_CONTENT_TYPE, REGISTRY, STAGE_SECONDS, Counter, Gauge,
+)
+
+CONTENT_TYPES = {
+    "markdown": "text/markdown; charset=utf-8",
+    "srt": "application/x-subrip; charset=utf-8",
+    "json": "application/json; charset=utf-8",
+    "text": "text/plain; charset=utf-8",
+}
+
+# Upper bound for a single long-poll wait, in seconds
+MAX_WAIT = 300.0
+
+# Number of finished jobs kept in memory before the oldest are dropped
+MAX_FINISHED_JOBS = 1000
+
+# Number of recent jobs used for latency percentiles
+LATENCY_WINDOW = 1000
+
+
+@dataclass
+class Job:
+    id: str
+    input_path: Path
+    options: dict
+    is_upload: bool = False
+    status: str = "queued"      # queued | running | done | failed
+    result: TranscriptResult | None = None
+    error: str | None = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+    def to_dict(self) -> dict:
+        d: dict = {
+            "id": self.id,
+            "status": self.status,
+            "input": str(self.input_path) if not self.is_upload else None,
+            "options": {k: v for k, v in self.options.items() if k != "api_key"},
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error is not None:
+            d["error"] = self.error
+        if self.result is not None:
+            d["segments"] = len(self.result.segments)
+            d["language"] = self.result.language
+            d["duration"] = self.result.duration
+        return d
+
+
+def _percentiles(values) -> dict[str, float | None]:
+    if not values:
+        return {"p50": None, "p90": None, "p99": None}
+    ordered = sorted(values)
+    n = len(ordered)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(n - 1, int(q * n))], 3)
+
+    return {"p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99)}
+
+
+class JobManager:
+    """Queues transcription jobs onto a shared worker pool.
+
+    Workers share provider state across jobs: Whisper models stay loaded and
+    API clients keep their connection pools (see the provider modules). A
+    Scheduler admits jobs only while their estimated memory and CPU threads
+    fit the machine; jobs wait for admission in an AdmissionQueue, so every
+    pool worker is running a job. workers=0 sizes the pool from it.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        device: str = "cpu",
+        config_file: Path | None = None,
+        scheduler: Scheduler | None = None,
+    ):
+        self.scheduler = scheduler or Scheduler()
+        workers = workers or self.scheduler.workers
+        self.workers = workers
+        self.device = device
+        self.config_file = config_file
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sttcli-worker")
+        self._queue = AdmissionQueue(self.scheduler, self._executor)
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue_wait: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._run_time: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._counts = {"submitted": 0, "done": 0, "failed": 0}
+        self._register_metrics()
+
+    # ── Job lifecycle ──
+
+    def validate(self, options: dict) -> None:
+        provider = options.get("provider", "whisper")
+        if provider not in ALL_PROVIDERS and provider != "auto":
+            raise ValueError(f"Unknown provider: {provider}")
+
+    def submit(self, input_path: Path, options: dict, is_upload: bool = False) -> Job:
+        self.validate(options)
+        job = Job(id=uuid.uuid4().hex, input_path=input_path, options=options, is_upload=is_upload)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._counts["submitted"] += 1
+            self._trim_locked()
+        try:
+            cost, work = self._prepare(job)
+        except Exception as exc:
+            job.error = str(exc)
+            job.status = "failed"
+            self._finish(job)
+            return job
+        self._queue.submit(cost, self._run, job, work)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.done.is_set():
+                return False
+            del self._jobs[job_id]
+            return True
+
+    def _trim_locked(self) -> None:
+        finished = [j for j in self._jobs.values() if j.done.is_set()]
+        for job in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.id]
+
+    def _prepare(self, job: Job) -> tuple[JobCost, Callable[[], TranscriptResult]]:
+        """Build the job's provider and resource charge, before it is queued for admission."""
+        opts = job.options
+        provider_name = opts.get("provider", "whisper")
+        device = opts.get("device") or self.device
+        duration = get_duration(job.input_path)
+        if provider_name == "auto":
+            # The route is picked later; charge as local Whisper, the costliest
+            # option, but without holding the model, since most routes do not use it.
+            cost = self.scheduler.cost(get_provider("whisper")(device=device), duration)
+            cost.locks_models = False
+            return cost, lambda: transcribe_auto(
+                job.input_path, None, self.config_file,
+                language=opts.get("language"), device=device,
+                diarize=bool(opts.get("diarize")), num_speakers=opts.get("num_speakers"),
+            )
+
+        api_key = resolve_api_key(provider_name, opts.get("api_key"), self.config_file)
+        ProviderClass = get_provider(provider_name)
+        engine_options = {}
+        if provider_name == "whisper" and device == "cpu":
+            engine_options = {"threads": self.scheduler.whisper_threads}
+        provider = ProviderClass(
+            model=opts.get("model"),
+            language=opts.get("language"),
+            api_key=api_key,
+            device=device,
+            diarize=bool(opts.get("diarize")),
+            num_speakers=opts.get("num_speakers"),
+            base_url=resolve_base_url(provider_name, None, self.config_file),
+            **engine_options,
+        )
+        return self.scheduler.cost(provider, duration), lambda: transcribe_recorded(
+            provider, job.input_path, None, self.config_file,
+        )
+
+    def _run(self, job: Job, work: Callable[[], TranscriptResult]) -> None:
+        try:
+            self._start(job)
+            job.result = work()
+            job.status = "done"
+        except Exception as exc:
+            job.error = str(exc)
+            job.status = "failed"
+        finally:
+            self._finish(job)
+
+    def _finish(self, job: Job) -> None:
+        job.finished_at = time.time()
+        if job.started_at is None:
+            job.started_at = job.finished_at
+        if job.is_upload:
+            job.input_path.unlink(missing_ok=True)
+        with self._lock:
+            self._queue_wait.append(job.started_at - job.submitted_at)
+            self._run_time.append(job.finished_at - job.started_at)
+            self._counts[job.status] += 1
+        job.done.set()
+
+    # ── Metrics ──
+
+    def metrics(self) -> dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+            queue_wait = list(self._queue_wait)
+            run_time = list(self._run_time)
+            counts = dict(self._counts)
+        return {
+            "workers": self.workers,
+            "queue_depth": sum(1 for j in jobs if j.status == "queued"),
+            "running": sum(1 for j in jobs if j.status == "running"),
+            "jobs": counts,
+            "queue_wait_seconds": _percentiles(queue_wait),
+            "run_seconds": _percentiles(run_time),
+            "scheduler": self.scheduler.snapshot(),
+        }
+
+    def _count(self, status: str) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if j.status == status)
+
+    def _register_metrics(self) -> None:
+        """Export queue and scheduler state; read at scrape time, so free while idle."""
+        REGISTRY.register(Gauge("sttcli_queue_depth", "Jobs waiting for a worker or admission.",
+                                callback=lambda: self._count("queued")))
+        REGISTRY.register(Gauge("sttcli_jobs_running", "Jobs being transcribed.",
+                                callback=lambda: self._count("running")))
+        REGISTRY.register(Gauge("sttcli_workers", "Worker pool size.", callback=lambda: self.workers))
+        REGISTRY.register(Gauge("sttcli_scheduler_memory_reserved_bytes",
+                                "Memory reserved by admitted jobs and loaded models.",
+                                callback=lambda: self.scheduler.snapshot()["memory_reserved_bytes"]))
+        REGISTRY.register(Counter("sttcli_scheduler_throttled", "Jobs that had to wait for resources.",
+                                  callback=lambda: self.scheduler.throttled))
+
+    @staticmethod
+    def _start(job: Job) -> None:
+        job.started_at = time.time()
+        job.status = "running"
+        STAGE_SECONDS.observe(job.started_at - job.submitted_at, stage="queue")
+
+    def shutdown(self) -> None:
+        self._queue.shutdown()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ── HTTP layer ───────────────────────────────────────────────────────────────
+
+_OPTION_KEYS = ("provider", "model", "language", "device", "api_key", "diarize", "num_speakers")
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ("1", "true", "yes", "on")
+
+
+def _options_from(source: dict) -> dict:
+    opts = {k: source[k] for k in _OPTION_KEYS if source.get(k) not in (None, "")}
+    if "diarize" in opts:
+        opts["diarize"] = _parse_bool(opts["diarize"])
+    if "num_speakers" in opts:
+        value = opts["num_speakers"]
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError("num_speakers must be an integer")
+        opts["num_speakers"] = int(value)
+    return opts
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "TranscriptionServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002 - signature from BaseHTTPRequestHandler
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # ── Responses ──
+
+    def _send(self, status: int, body: str, content_type: str) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        self._send(status, json.dumps(payload, ensure_ascii=False), CONTENT_TYPES["json"])
+
+    def _error(self, status: int, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    # ── Routing ──
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+
+        if parts == ["healthz"]:
+            return self._send_json(HTTPStatus.OK, {"status": "ok"})
+        if parts == ["metrics"]:
+            return self._send_metrics(query.get("format"))
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.server.manager.get(parts[1])
+            if job is None:
+                return self._error(HTTPStatus.NOT_FOUND, f"Unknown job: {parts[1]}")
+            try:
+                wait = min(float(query.get("wait", 0)), MAX_WAIT)
+            except ValueError:
+                return self._error(HTTPStatus.BAD_REQUEST, "wait must be a number of seconds")
+            if wait > 0:
+                job.done.wait(wait)
+            if len(parts) == 2:
+                return self._send_json(HTTPStatus.OK, job.to_dict())
+            if parts[2] == "result":
+                return self._send_result(job, query.get("format", "json"))
+        self._error(HTTPStatus.NOT_FOUND, f"No route for GET {url.path}")
+
+    def _send_metrics(self, fmt: str | None) -> None:
+        """JSON summary by default; OpenMetrics or Prometheus text for scrapers."""
+        accept = self.headers.get("Accept") or ""
+        if fmt is None and "application/openmetrics-text" in accept:
+            fmt = "openmetrics"
+        elif fmt is None and "text/plain" in accept:
+            fmt = "prometheus"
+        if fmt == "openmetrics":
+            return self._send(HTTPStatus.OK, REGISTRY.render(openmetrics=True), OPENMETRICS_CONTENT_TYPE)
+        if fmt == "prometheus":
+            return self._send(HTTPStatus.OK, REGISTRY.render(openmetrics=False), PROMETHEUS_CONTENT_TYPE)
+        if fmt not in (None, "json"):
+            return self._error(HTTPStatus.BAD_REQUEST, f"Unknown metrics format: {fmt}")
+        self._send_json(HTTPStatus.OK, self.server.manager.metrics())
+
+    def _send_result(self, job: Job, fmt: str) -> None:
+        if fmt not in FORMATS:
+            return self._error(HTTPStatus.BAD_REQUEST, f"Unknown format: {fmt}")
+        if job.status == "failed":
+            return self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, job.to_dict())
+        if job.result is None:
+            return self._send_json(HTTPStatus.ACCEPTED, job.to_dict())
+        output_text = get_formatter(fmt)().format(job.result)
+        self._send(HTTPStatus.OK, output_text, CONTENT_TYPES[fmt])
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            return self._error(HTTPStatus.NOT_FOUND, f"No route for POST {url.path}")
+
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip()
+
+        try:
+            if content_type == "application/json":
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(body, dict):
+                    return self._error(HTTPStatus.BAD_REQUEST, "JSON body must be an object")
+                if not body.get("path") or not isinstance(body["path"], str):
+                    return self._error(HTTPStatus.BAD_REQUEST, "JSON body requires 'path'")
+                input_path = Path(body["path"]).expanduser()
+                if not input_path.is_file():
+                    return self._error(HTTPStatus.BAD_REQUEST, f"File not found: {input_path}")
+                job = self.server.manager.submit(input_path, _options_from(body))
+            else:
+                if length <= 0:
+                    return self._error(HTTPStatus.BAD_REQUEST, "Empty upload")
+                suffix = Path(query.get("filename", "upload.wav")).suffix or ".wav"
+                input_path = self._save_upload(length, suffix)
+                try:
+                    job = self.server.manager.submit(input_path, _options_from(query), is_upload=True)
+                except Exception:
+                    input_path.unlink(missing_ok=True)
+                    raise
+        except (ValueError, json.JSONDecodeError) as exc:
+            return self._error(HTTPStatus.BAD_REQUEST, str(exc))
+
+        self._send_json(HTTPStatus.ACCEPTED, job.to_dict())
+
+    def _save_upload(self, length: int, suffix: str) -> Path:
+        tmp = tempfile.NamedTemporaryFile(prefix="sttcli-upload-", suffix=suffix, delete=False)
+        with tmp:
+            remaining = length
+            while remaining > 0:
+                chunk = self.rfile.read(min(remaining, 1 << 20))
+                if not chunk:
+                    break
+                tmp.write(chunk)
+                remaining -= len(chunk)
+        return Path(tmp.name)
+
+    def do_DELETE(self):
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        if len(parts) == 2 and parts[0] == "jobs":
+            if self.server.manager.delete(parts[1]):
+                return self._send_json(HTTPStatus.OK, {"id": parts[1], "deleted": True})
+            return self._error(HTTPStatus.CONFLICT, "Job is unknown or still running")
+        self._error(HTTPStatus.NOT_FOUND, f"No route for DELETE {self.path}")
+
+
+class TranscriptionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], manager: JobManager, verbose: bool = False):
+        super().__init__(address, _Handler)
+        self.manager = manager
+        self.verbose = verbose
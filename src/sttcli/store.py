@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from sttcli.config import load_config
+from sttcli.models import TranscriptResult
+
+DEFAULT_STORE_PATH = Path.home() / ".sttcli" / "transcripts.db"
+
+# Files are committed in batches of this many during bulk ingestion
+INGEST_BATCH = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id          INTEGER PRIMARY KEY,
+    path        TEXT NOT NULL UNIQUE,
+    source_file TEXT,
+    provider    TEXT,
+    model       TEXT,
+    language    TEXT,
+    duration    REAL,
+    mtime       REAL,
+    size        INTEGER,
+    indexed_at  REAL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id            INTEGER PRIMARY KEY,
+    transcript_id INTEGER NOT NULL REFERENCES transcripts(id),
+    start_ms      INTEGER NOT NULL,
+    end_ms        INTEGER NOT NULL,
+    speaker       TEXT,
+    gender        TEXT,
+    text          TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_by_transcript ON segments(transcript_id, start_ms);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text,
+    content='segments',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+
+@dataclass
+class SearchHit:
+    path: str
+    source_file: str
+    start_ms: int
+    end_ms: int
+    speaker: str | None
+    gender: str | None
+    text: str
+    snippet: str
+    score: float
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "source_file": self.source_file,
+            "start_ms": self.start_ms,
+            "end_ms": self.end_ms,
+            "speaker": self.speaker,
+            "gender": self.gender,
+            "text": self.text,
+            "snippet": self.snippet,
+            "score": self.score,
+        }
+
+
+def resolve_store_path(cli_path: Path | None = None, config_path: Path | None = None) -> Path:
+    if cli_path:
+        return cli_path
+    configured = load_config(config_path).get("store", {}).get("path")
+    return Path(configured).expanduser() if configured else DEFAULT_STORE_PATH
+
+
+def auto_index_enabled(config_path: Path | None = None) -> bool:
+    return bool(load_config(config_path).get("store", {}).get("auto_index", False))
+
+
+def to_fts_query(query: str) -> str:
+    """Quote each whitespace-separated term so punctuation cannot break FTS5 syntax."""
+    terms = [t.replace('"', '""') for t in query.split()]
+    return " ".join(f'"{t}"' for t in terms if t)
+
+
+class TranscriptStore:
+    """SQLite transcript store with an FTS5 index over segment text.
+
+    Segment text lives once in `segments`; `segments_fts` is an external-content
+    index kept in sync explicitly on ingest so bulk loads avoid per-row triggers.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "TranscriptStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ── Ingestion ──
+
+    def _remove_locked(self, transcript_id: int) -> None:
+        self.conn.execute(
+            "INSERT INTO segments_fts(segments_fts, rowid, text) "
+            "SELECT 'delete', id, text FROM segments WHERE transcript_id = ?",
+            (transcript_id,),
+        )
+        self.conn.execute("DELETE FROM segments WHERE transcript_id = ?", (transcript_id,))
+        self.conn.execute("DELETE FROM transcripts WHERE id = ?", (transcript_id,))
+
+    def _insert_locked(
+        self,
+        key: str,
+        result: TranscriptResult,
+        mtime: float | None = None,
+        size: int | None = None,
+    ) -> None:
+        row = self.conn.execute("SELECT id FROM transcripts WHERE path = ?", (key,)).fetchone()
+        if row:
+            self._remove_locked(row[0])
+
+        cur = self.conn.execute(
+            "INSERT INTO transcripts"
+            "(path, source_file, provider, model, language, duration, mtime, size, indexed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, result.source_file, result.provider, result.model, result.language,
+             result.duration, mtime, size, time.time()),
+        )
+        transcript_id = cur.lastrowid
+        self.conn.executemany(
+            "INSERT INTO segments(transcript_id, start_ms, end_ms, speaker, gender, text) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (transcript_id, round(s.start * 1000), round(s.end * 1000), s.speaker, s.gender, s.text)
+                for s in result.segments
+            ),
+        )
+        self.conn.execute(
+            "INSERT INTO segments_fts(rowid, text) "
+            "SELECT id, text FROM segments WHERE transcript_id = ?",
+            (transcript_id,),
+        )
+
+    def add_result(self, result: TranscriptResult, key: str) -> None:
+        """Index a single in-memory result under `key` (replacing any previous one)."""
+        with self.conn:
+            self._insert_locked(key, result)
+
+    def _is_current(self, key: str, mtime: float, size: int) -> bool:
+        row = self.conn.execute(
+            "SELECT mtime, size FROM transcripts WHERE path = ?", (key,)
+        ).fetchone()
+        return row is not None and row[0] == mtime and row[1] == size
+
+    def ingest_files(self, paths: Iterable[Path], force: bool = False) -> dict[str, int]:
+        """Bulk-ingest TranscriptResult JSON files.
+
+        Unchanged files (same mtime and size) are skipped unless force=True.
+        Returns counts of indexed, unchanged and invalid files.
+        """
+        stats = {"indexed": 0, "unchanged": 0, "invalid": 0}
+        pending = 0
+        self.conn.execute("BEGIN")
+        try:
+            for path in paths:
+                st = path.stat()
+                key = str(path.resolve())
+                if not force and self._is_current(key, st.st_mtime, st.st_size):
+                    stats["unchanged"] += 1
+                    continue
+                try:
+                    data = json.loads(path.read_text(encoding="utf-8"))
+                    if not isinstance(data, dict) or "segments" not in data:
+                        raise ValueError("not a transcript")
+                    result = TranscriptResult.from_dict(data)
+                except (ValueError, KeyError, TypeError, UnicodeDecodeError):
+                    stats["invalid"] += 1
+                    continue
+
+                self._insert_locked(key, result, st.st_mtime, st.st_size)
+                stats["indexed"] += 1
+                pending += 1
+                if pending >= INGEST_BATCH:
+                    self.conn.execute("COMMIT")
+                    self.conn.execute("BEGIN")
+                    pending = 0
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return stats
+
+    def optimize(self) -> None:
+        """Merge FTS5 index segments; worthwhile after large bulk loads."""
+        with self.conn:
+            self.conn.execute("INSERT INTO segments_fts(segments_fts) VALUES ('optimize')")
+
+    # ── Queries ──
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        speaker: str | None = None,
+        provider: str | None = None,
+        raw: bool = False,
+    ) -> Iterator[SearchHit]:
+        """Yield hits ranked by BM25 (best first).
+
+        `query` is treated as a list of terms unless raw=True, in which case it
+        is passed through as an FTS5 query expression (phrases, OR, NEAR, prefix*).
+        """
+        match = query if raw else to_fts_query(query)
+        sql = (
+            "SELECT t.path, t.source_file, s.start_ms, s.end_ms, s.speaker, s.gender, s.text, "
+            "       snippet(segments_fts, 0, '[', ']', '…', 16), segments_fts.rank "
+            "FROM segments_fts "
+            "JOIN segments s ON s.id = segments_fts.rowid "
+            "JOIN transcripts t ON t.id = s.transcript_id "
+            "WHERE segments_fts MATCH ?"
+        )
+        params: list = [match]
+        if speaker:
+            sql += " AND s.speaker = ?"
+            params.append(speaker)
+        if provider:
+            sql += " AND t.provider = ?"
+            params.append(provider)
+        sql += " ORDER BY segments_fts.rank LIMIT ?"
+        params.append(limit)
+
+        for row in self.conn.execute(sql, params):
+            yield SearchHit(*row[:8], score=-row[8])
+
+    def stats(self) -> dict[str, int]:
+        n_transcripts = self.conn.execute("SELECT count(*) FROM transcripts").fetchone()[0]
+        n_segments = self.conn.execute("SELECT count(*) FROM segments").fetchone()[0]
+        return {"transcripts": n_transcripts, "segments": n_segments}
+
+
+def iter_transcript_files(paths: Iterable[Path]) -> Iterator[Path]:
+    """Expand files and directories (recursively) into candidate .json files."""
+    for path in paths:
+        if path.is_dir():
+            yield from sorted(path.rglob("*.json"))
+        elif path.is_file():
+            yield path
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import subprocess
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# Whisper decodes 30-second windows; a longer buffer would only be truncated.
+MAX_WINDOW_SECONDS = 30.0
+
+# Segments ending this many seconds before the window edge are final.
+FINALIZE_LAG = 2.0
+
+# Whisper segments that look like silence hallucinations are dropped.
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+
+@dataclass
+class StreamEvent:
+    kind: str       # "provisional" | "final"
+    start: float
+    end: float
+    text: str
+
+    def to_dict(self) -> dict:
+        return {"type": self.kind, "start": round(self.start, 3), "end": round(self.end, 3), "text": self.text}
+
+
+class PCMWindow:
+    """Fixed-capacity float32 buffer of the not-yet-finalized audio tail.
+
+    Memory is allocated once; committing audio shifts the tail to the front,
+    so usage stays constant however long the stream runs.
+    """
+
+    def __init__(self, seconds: float, sr: int = SAMPLE_RATE):
+        self.sr = sr
+        self.buf = np.zeros(int(seconds * sr), dtype=np.float32)
+        self.size = 0
+        self.start_time = 0.0   # stream time of buf[0], in seconds
+
+    @property
+    def capacity(self) -> int:
+        return len(self.buf)
+
+    @property
+    def end_time(self) -> float:
+        return self.start_time + self.size / self.sr
+
+    def append(self, samples: np.ndarray) -> np.ndarray:
+        """Append samples; returns whatever did not fit (caller must commit first)."""
+        room = self.capacity - self.size
+        taken = samples[:room]
+        self.buf[self.size : self.size + len(taken)] = taken
+        self.size += len(taken)
+        return samples[room:]
+
+    def view(self) -> np.ndarray:
+        return self.buf[: self.size]
+
+    def commit_until(self, t: float) -> None:
+        """Drop audio before stream time t."""
+        n = min(self.size, max(0, int(round((t - self.start_time) * self.sr))))
+        if n == 0:
+            return
+        remaining = self.size - n
+        self.buf[:remaining] = self.buf[n : self.size]
+        self.size = remaining
+        self.start_time += n / self.sr
+
+
+def iter_pcm(
+    source: BinaryIO,
+    block_seconds: float,
+    raw: bool = False,
+    input_format: str | None = None,
+) -> Iterator[np.ndarray]:
+    """Yield mono 16 kHz float32 blocks decoded from a byte stream.
+
+    raw=True expects s16le mono 16 kHz input; otherwise ffmpeg decodes whatever
+    container or codec arrives (input_format forces the demuxer, e.g. mpegts).
+    """
+    block_bytes = int(block_seconds * SAMPLE_RATE) * 2
+    proc: subprocess.Popen | None = None
+
+    if raw:
+        reader = source
+    else:
+        cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+        if input_format:
+            cmd += ["-f", input_format]
+        cmd += ["-i", "pipe:0", "-vn", "-f", "s16le", "-ar", str(SAMPLE_RATE), "-ac", "1", "pipe:1"]
+        proc = subprocess.Popen(cmd, stdin=source, stdout=subprocess.PIPE)
+        reader = proc.stdout
+
+    try:
+        pending = b""
+        while True:
+            data = reader.read(block_bytes - len(pending))
+            if not data:
+                break
+            pending += data
+            if len(pending) < block_bytes:
+                continue
+            yield np.frombuffer(pending, dtype=np.int16).astype(np.float32) / 32768.0
+            pending = b""
+        usable = len(pending) - len(pending) % 2
+        if usable:
+            yield np.frombuffer(pending[:usable], dtype=np.int16).astype(np.float32) / 32768.0
+    finally:
+        if proc is not None:
+            proc.stdout.close()
+            proc.kill()
+            proc.wait()
+
+
+class StreamTranscriber:
+    """Rolling-window transcription on a warm Whisper model.
+
+    Every `step_seconds` of new audio the current window is re-decoded.
+    Segments ending at least `finalize_lag` seconds before the window edge are
+    emitted as final and their audio is dropped; the rest are provisional and
+    may still change. When the window fills up without a natural cut, all but
+    the last segment are forced final, which bounds finalization latency to
+    the window length.
+    """
+
+    def __init__(
+        self,
+        model,
+        lock,
+        language: str | None = None,
+        device: str = "cpu",
+        window_seconds: float = MAX_WINDOW_SECONDS,
+        step_seconds: float = 2.0,
+        finalize_lag: float = FINALIZE_LAG,
+    ):
+        self.model = model
+        self.lock = lock
+        self.language = language
+        self.fp16 = device != "cpu"
+        self.window = PCMWindow(min(window_seconds, MAX_WINDOW_SECONDS))
+        self.step_seconds = step_seconds
+        self.finalize_lag = finalize_lag
+        self._since_decode = 0.0
+        self._prompt = ""
+
+    def _decode(self) -> list[StreamEvent]:
+        audio = self.window.view()
+        if len(audio) < SAMPLE_RATE // 2:
+            return []
+        options = {
+            "fp16": self.fp16,
+            "condition_on_previous_text": False,
+        }
+        if self.language:
+            options["language"] = self.language
+        if self._prompt:
+            options["initial_prompt"] = self._prompt
+        with self.lock:
+            result = self.model.transcribe(audio, **options)
+        # Detect the language once, then pin it to skip detection per window.
+        if not self.language:
+            self.language = result.get("language") or None
+
+        offset = self.window.start_time
+        events = []
+        for s in result["segments"]:
+            if s.get("no_speech_prob", 0.0) > NO_SPEECH_THRESHOLD and s.get("avg_logprob", 0.0) < LOGPROB_THRESHOLD:
+                continue
+            text = s["text"].strip()
+            if text:
+                events.append(StreamEvent("provisional", offset + s["start"], offset + s["end"], text))
+        return events
+
+    def _settle(self, events: list[StreamEvent], force: bool) -> list[StreamEvent]:
+        cutoff = self.window.end_time - self.finalize_lag
+        if force:
+            # A forced cut always frees at least one step, or a full window re-decodes forever.
+            cutoff = max(cutoff, self.window.start_time + self.step_seconds)
+        if not events:
+            # Silence: nothing to finalize, but the audio need not be kept.
+            self.window.commit_until(cutoff)
+            return []
+        finals = [e for e in events if e.end <= cutoff]
+        if force and not finals and len(events) > 1:
+            finals = events[:-1]
+        if force and not finals:
+            # A single segment spans the whole window: finalize it as is.
+            finals = events
+
+        out = [StreamEvent("final", e.start, e.end, e.text) for e in finals]
+        if finals:
+            self.window.commit_until(finals[-1].end)
+            self._prompt = finals[-1].text
+        if force and self.window.size == self.window.capacity:
+            # Guarantee progress even if decoded timestamps did not advance.
+            self.window.commit_until(cutoff)
+        out.extend(events[len(finals):])
+        return out
+
+    def step(self, samples: np.ndarray) -> list[StreamEvent]:
+        """Feed one block of audio and decode if a step's worth has arrived."""
+        out: list[StreamEvent] = []
+        self._since_decode += len(samples) / SAMPLE_RATE
+        while True:
+            samples = self.window.append(samples)
+            if len(samples) == 0:
+                break
+            # Window full with audio still pending: force a cut, then append the rest.
+            out.extend(self._settle(self._decode(), force=True))
+            self._since_decode = 0.0
+
+        full = self.window.size == self.window.capacity
+        if full or self._since_decode >= self.step_seconds:
+            out.extend(self._settle(self._decode(), force=full))
+            self._since_decode = 0.0
+        return out
+
+    def flush(self) -> list[StreamEvent]:
+        """Finalize everything left in the window at end of stream."""
+        events = self._decode()
+        self.window.commit_until(self.window.end_time)
+        return [StreamEvent("final", e.start, e.end, e.text) for e in events]
@@ -0,0 +1,247 @@
+"""Process-wide counters and histograms, exported in OpenMetrics text format.
+
+Recording is a dict update under a per-metric lock, cheap enough for the
+hot path; nothing is formatted until a scrape (`GET /metrics` on the server)
+or a textfile write (`--metrics-file`, for node_exporter's textfile
+collector). Values that already live elsewhere, like queue depth or PCM
+cache hits, are read through callbacks at export time.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+RTF_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):  # noqa: A002
+        self.name = name
+        self.help = help
+        self.labelnames = labels
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def _header(self, family: str) -> list[str]:
+        return [f"# HELP {family} {self.help}", f"# TYPE {family} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (),  # noqa: A002
+                 callback: Callable[[], float] | None = None):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple, float] = {}
+        self._callback = callback
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self, openmetrics: bool) -> list[str]:
+        # OpenMetrics names the family without _total; the Prometheus text format with it.
+        lines = self._header(self.name if openmetrics else f"{self.name}_total")
+        if self._callback is not None:
+            values = {(): self._callback()}
+        else:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}_total{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (),  # noqa: A002
+                 callback: Callable[[], float | None] | None = None):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self, openmetrics: bool) -> list[str]:
+        lines = self._header(self.name)
+        if self._callback is not None:
+            value = self._callback()
+            values = {} if value is None else {(): value}
+        else:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (),  # noqa: A002
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: dict[tuple, list] = {}     # key -> [bucket counts..., sum]
+
+    def observe(self, value: float, **labels) -> None:
+        if math.isnan(value):
+            return
+        key = self._key(labels)
+        i = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self, openmetrics: bool) -> list[str]:
+        lines = self._header(self.name)
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(values[-1])}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add metric, replacing any with the same name (callbacks are re-bound this way)."""
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self, openmetrics: bool = True) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = [line for metric in metrics for line in metric.render(openmetrics)]
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path) -> None:
+        """Write Prometheus text format atomically, as node_exporter's textfile collector expects."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render(openmetrics=False))
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+
+REGISTRY = Registry()
+
+JOBS = REGISTRY.register(Counter(
+    "sttcli_jobs", "Transcription jobs finished, by outcome.", ("provider", "model", "status"),
+))
+AUDIO_SECONDS = REGISTRY.register(Counter(
+    "sttcli_audio_seconds", "Seconds of audio transcribed successfully.", ("provider", "model"),
+))
+REALTIME_FACTOR = REGISTRY.register(Histogram(
+    "sttcli_realtime_factor", "Wall-clock seconds per second of audio, per job.", ("provider", "model"),
+    buckets=RTF_BUCKETS,
+))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "sttcli_stage_seconds", "Latency of pipeline stages.", ("stage",),
+))
+UPLOAD_BYTES = REGISTRY.register(Counter(
+    "sttcli_upload_bytes", "Audio bytes sent to API providers, retries included.", ("provider",),
+))
+MODEL_LOAD_SECONDS = REGISTRY.register(Histogram(
+    "sttcli_model_load_seconds", "Time to load a local model into memory.", ("engine", "model"),
+))
+
+
+def _pcm_cache():
+    from sttcli.pcm import default_cache
+
+    return default_cache()
+
+
+def _hit_ratio() -> float | None:
+    cache = _pcm_cache()
+    total = cache.hits + cache.misses
+    return cache.hits / total if total else None
+
+
+REGISTRY.register(Counter(
+    "sttcli_pcm_cache_hits", "Decoded-audio cache hits.", callback=lambda: _pcm_cache().hits,
+))
+REGISTRY.register(Counter(
+    "sttcli_pcm_cache_misses", "Decoded-audio cache misses (ffmpeg decodes).",
+    callback=lambda: _pcm_cache().misses,
+))
+REGISTRY.register(Gauge(
+    "sttcli_pcm_cache_hit_ratio", "Share of decoded-audio lookups served from the cache.", callback=_hit_ratio,
+))
+
+
+def record_job(provider: str, model: str, status: str, audio_seconds: float = 0.0, seconds: float = 0.0) -> None:
+    """Count one finished job; successful jobs also add audio seconds and a real-time factor."""
+    JOBS.inc(provider=provider, model=model, status=status)
+    if status == "done" and audio_seconds > 0:
+        AUDIO_SECONDS.inc(audio_seconds, provider=provider, model=model)
+        if seconds > 0:
+            REALTIME_FACTOR.observe(seconds / audio_seconds, provider=provider, model=model)